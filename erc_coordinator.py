@@ -0,0 +1,348 @@
+"""
+ERC Lease Coordinator
+Hands out grid pages to scraper agents on any number of machines. A page is leased to one
+agent at a time; the agent renews the lease while it works and reports the page's records
+when it is done. Leases of dead agents expire and the page goes back to the pool.
+
+State lives in one SQLite file, usable two ways:
+    LeaseStore(path)            - agents open the file directly (e.g. on a network mount)
+    CoordinatorServer + client  - one host owns the file and serves it over HTTP
+
+Both expose acquire / renew / complete / release / status, so run_agent works with either.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from erc_retry import create_breaker
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    page INTEGER PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'pending',     -- pending, leased, done, failed
+    agent TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    records INTEGER,
+    updated REAL
+);
+CREATE TABLE IF NOT EXISTS records (
+    page INTEGER NOT NULL,
+    row INTEGER NOT NULL,
+    agent TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (page, row)
+);
+"""
+
+
+class LeaseStore:
+    """Page leases and reported records in a SQLite file (one short transaction per call)"""
+
+    def __init__(self, path, max_attempts=3):
+        self.path = path
+        self.max_attempts = max_attempts
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA busy_timeout = 30000')
+        return _Transaction(conn)
+
+    def add_pages(self, pages):
+        """Register pages to scrape (already known pages keep their state)"""
+        with self._connect() as conn:
+            conn.executemany("INSERT OR IGNORE INTO pages (page, updated) VALUES (?, ?)",
+                             [(page, time.time()) for page in pages])
+
+    def acquire(self, agent, lease_s):
+        """Lease the lowest free page (pending, or leased with an expired lease); None if there is none"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT page FROM pages WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) "
+                "AND attempts < ? ORDER BY page LIMIT 1", (now, self.max_attempts)
+            ).fetchone()
+            if not row:
+                return None
+            conn.execute("UPDATE pages SET status = 'leased', agent = ?, lease_expires = ?, attempts = attempts + 1, "
+                         "updated = ? WHERE page = ?", (agent, now + lease_s, now, row[0]))
+            return row[0]
+
+    def renew(self, agent, page, lease_s):
+        """Extend an agent's lease; False if the lease was lost (expired and taken over)"""
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE pages SET lease_expires = ?, updated = ? "
+                                  "WHERE page = ? AND agent = ? AND status = 'leased'",
+                                  (time.time() + lease_s, time.time(), page, agent))
+            return cursor.rowcount == 1
+
+    def complete(self, agent, page, records):
+        """Store a page's records; the first completion wins, later ones return False"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT status FROM pages WHERE page = ?", (page,)).fetchone()
+            if not row or row[0] == 'done':
+                return False
+            self._store_records(conn, agent, page, records)
+            conn.execute("UPDATE pages SET status = 'done', agent = ?, lease_expires = NULL, records = ?, updated = ? "
+                         "WHERE page = ?", (agent, len(records), time.time(), page))
+            return True
+
+    def release(self, agent, page, failed=False, records=None):
+        """Give a page back; a failed page is retried until it has used max_attempts leases.
+
+        records of a partial page are kept row by row: a later attempt overwrites them, and a page
+        that runs out of attempts ends 'failed' with every row any attempt got.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE pages SET status = CASE WHEN ? AND attempts >= ? THEN 'failed' "
+                                  "ELSE 'pending' END, agent = NULL, lease_expires = NULL, updated = ? "
+                                  "WHERE page = ? AND agent = ?",
+                                  (failed, self.max_attempts, time.time(), page, agent))
+            if cursor.rowcount == 1 and records:
+                self._store_records(conn, agent, page, records)
+                conn.execute("UPDATE pages SET records = (SELECT COUNT(*) FROM records WHERE page = ?) WHERE page = ?",
+                             (page, page))
+
+    def _store_records(self, conn, agent, page, records):
+        """Insert or overwrite a page's records, keyed by their row on the page"""
+        conn.executemany(
+            "INSERT OR REPLACE INTO records (page, row, agent, data) VALUES (?, ?, ?, ?)",
+            [(page, record.get('_row_on_page') or i + 1, agent, json.dumps(record, ensure_ascii=False, default=str))
+             for i, record in enumerate(records)]
+        )
+
+    def status(self):
+        """Page counts by state (expired leases count as pending) and whether any work is left"""
+        now = time.time()
+        with self._connect() as conn:
+            counts = dict(conn.execute(
+                "SELECT CASE WHEN status = 'leased' AND lease_expires < ? THEN 'pending' ELSE status END, COUNT(*) "
+                "FROM pages GROUP BY 1", (now,)
+            ).fetchall())
+            # Pages that ran out of attempts without being marked failed are finished too
+            exhausted = conn.execute("SELECT COUNT(*) FROM pages WHERE status IN ('pending', 'leased') "
+                                     "AND attempts >= ? AND (status = 'pending' OR lease_expires < ?)",
+                                     (self.max_attempts, now)).fetchone()[0]
+            agents = [row[0] for row in conn.execute(
+                "SELECT DISTINCT agent FROM pages WHERE status = 'leased' AND lease_expires >= ?", (now,))]
+        counts = {state: counts.get(state, 0) for state in ('pending', 'leased', 'done', 'failed')}
+        counts['finished'] = counts['pending'] - exhausted == 0 and counts['leased'] == 0
+        counts['agents'] = agents
+        return counts
+
+    def records(self):
+        """Every reported record, in page/row order"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT data FROM records ORDER BY page, row").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+
+class _Transaction:
+    """Connection wrapper: BEGIN IMMEDIATE on enter, COMMIT/ROLLBACK and close on exit"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        finally:
+            self.conn.close()
+
+
+class CoordinatorHandler(BaseHTTPRequestHandler):
+    """JSON API over the server's LeaseStore: POST /<method> with the method's arguments"""
+
+    METHODS = {'acquire', 'renew', 'complete', 'release', 'status'}
+
+    def do_POST(self):
+        method = self.path.strip('/')
+        if method not in self.METHODS:
+            self.send_error(404)
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            kwargs = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError as e:
+            self.send_error(400, f"Bad JSON: {str(e)[:100]}")
+            return
+        try:
+            result = getattr(self.server.store, method)(**kwargs)
+        except (TypeError, sqlite3.Error) as e:
+            self.send_error(400, str(e)[:200])
+            return
+        body = json.dumps({'result': result}, ensure_ascii=False).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CoordinatorServer(ThreadingHTTPServer):
+    """HTTP front of a LeaseStore for agents on other machines"""
+
+    daemon_threads = True
+
+    def __init__(self, address, store):
+        super().__init__(address, CoordinatorHandler)
+        self.store = store
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{'127.0.0.1' if host in ('', '0.0.0.0') else host}:{port}"
+
+
+def start_coordinator(store, host='127.0.0.1', port=0):
+    """Serve store from a daemon thread; returns the server (see .url)"""
+    server = CoordinatorServer((host, port), store)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"[COORDINATOR] Serving {server.url}")
+    return server
+
+
+class CoordinatorClient:
+    """LeaseStore interface over a CoordinatorServer"""
+
+    def __init__(self, url, timeout=60):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def _call(self, method, **kwargs):
+        request = urllib.request.Request(f"{self.url}/{method}", data=json.dumps(kwargs, ensure_ascii=False,
+                                                                               default=str).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json'}, method='POST')
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())['result']
+
+    def acquire(self, agent, lease_s):
+        return self._call('acquire', agent=agent, lease_s=lease_s)
+
+    def renew(self, agent, page, lease_s):
+        return self._call('renew', agent=agent, page=page, lease_s=lease_s)
+
+    def complete(self, agent, page, records):
+        return self._call('complete', agent=agent, page=page, records=records)
+
+    def release(self, agent, page, failed=False, records=None):
+        return self._call('release', agent=agent, page=page, failed=failed, records=records)
+
+    def status(self):
+        return self._call('status')
+
+
+def open_coordinator(target):
+    """CoordinatorClient for an http(s):// URL, otherwise a LeaseStore on the SQLite file"""
+    if target.startswith(('http://', 'https://')):
+        return CoordinatorClient(target)
+    return LeaseStore(target)
+
+
+def agent_name():
+    """Default agent id: host and process, unique across machines"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def run_agent(module, coordinator, scraper_options, agent=None, worker_id=0, lease_s=600, idle_poll=5.0):
+    """Scrape leased pages with one browser (module's ERCLicenseScraper.scrape_page) until none are left.
+
+    A background thread renews the lease every lease_s/3 while a page is scraped. Only a page
+    with a record for every grid row is completed; any other is released as failed with the
+    rows it did get, so its missing rows are leased again (the rows are kept if it runs out of
+    attempts). If it came back empty the driver is replaced (by the warm spare with
+    spare_driver in scraper_options) before the next lease.
+    Returns the number of records reported.
+    """
+    agent = agent or agent_name()
+    # Agents share no process - each pauses on its own breaker when the site fails
+    scraper = module.ERCLicenseScraper(worker_id=worker_id, breaker=create_breaker(), **scraper_options)
+    records_sent = 0
+
+    try:
+        launched = scraper.launch_ready_driver()
+        if not launched:
+            print(f"[AGENT {agent}] Browser failed to start")
+            return 0
+        scraper.adopt_driver(launched)
+        scraper.events.emit('worker_ready', f"[AGENT {agent}] Ready to scrape!", agent=agent)
+        if scraper.spare:
+            scraper.spare.prepare()
+
+        while True:
+            page = coordinator.acquire(agent, lease_s)
+            if page is None:
+                if coordinator.status()['finished']:
+                    break
+                # Other agents still hold leases - one may die and its page come back
+                time.sleep(idle_poll)
+                continue
+
+            stop_renewing = threading.Event()
+
+            def renew_lease(page=page):
+                while not stop_renewing.wait(lease_s / 3):
+                    try:
+                        if not coordinator.renew(agent, page, lease_s):
+                            print(f"[AGENT {agent}] Lost the lease on page {page}")
+                            return
+                    except Exception as e:
+                        print(f"[AGENT {agent}] Lease renewal failed: {str(e)[:60]}")
+
+            renewer = threading.Thread(target=renew_lease, daemon=True)
+            renewer.start()
+            try:
+                page_data = scraper.scrape_page(page)
+                if scraper.resume_row is not None and scraper.replace_driver():
+                    # The browser could not be recycled mid-page - finish the page on a new one
+                    page_data += scraper.scrape_page(page, first_row=scraper.resume_row)
+            finally:
+                stop_renewing.set()
+                renewer.join()
+
+            if page_data and len(page_data) == scraper.last_page_rows:
+                if coordinator.complete(agent, page, page_data):
+                    records_sent += len(page_data)
+                else:
+                    print(f"[AGENT {agent}] Page {page} was already completed elsewhere")
+            elif page_data:
+                coordinator.release(agent, page, failed=True, records=page_data)
+                print(f"[AGENT {agent}] Page {page} incomplete ({len(page_data)} of {scraper.last_page_rows} rows) "
+                      f"- released for another attempt")
+                if scraper.resume_row is not None and not scraper.replace_driver():
+                    print(f"[AGENT {agent}] Browser failed to restart")
+                    break
+            else:
+                coordinator.release(agent, page, failed=True)
+                print(f"[AGENT {agent}] Page {page} failed - restarting the browser")
+                if not scraper.replace_driver():
+                    print(f"[AGENT {agent}] Browser failed to restart")
+                    break
+
+        scraper.events.emit('worker_finish', f"[AGENT {agent}] Finished! Reported {records_sent} records",
+                            records=records_sent)
+        return records_sent
+    finally:
+        scraper.events.close()
+        if scraper.spare:
+            scraper.spare.close()
+        scraper.close_driver()
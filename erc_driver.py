@@ -0,0 +1,329 @@
+"""
+ERC Chrome Driver Profiles
+Shared ChromeOptions for the scrapers, plus the performance-focused 'fast' profile
+(new headless mode, eager page loads, CDP blocking of static assets and analytics),
+per-worker Chrome user-data-dirs on tmpfs cloned from a pre-warmed template, a spare
+driver warmed in the background to replace a crashed one, and a memory watchdog that
+decides when a long-lived browser should be recycled
+"""
+
+import atexit
+import contextlib
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import threading
+from urllib.parse import urlsplit
+
+from selenium import webdriver
+
+
+DRIVER_PROFILES = ('default', 'fast')
+
+# URL patterns the 'fast' profile blocks through CDP Network.setBlockedURLs.
+# The grid, popup iframe and ASP.NET postbacks only need the HTML and scripts.
+BLOCKED_URL_PATTERNS = [
+    # Images
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.bmp', '*.svg', '*.ico', '*.webp',
+    # Fonts
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    # Stylesheets - element lookups are by id/class, not by layout
+    '*.css',
+    # Analytics / trackers
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*facebook.net*', '*hotjar.com*',
+]
+
+
+def build_chrome_options(profile='default'):
+    """Build ChromeOptions for the given driver profile"""
+    if profile not in DRIVER_PROFILES:
+        raise ValueError(f"Unknown driver profile: {profile} (expected one of {DRIVER_PROFILES})")
+
+    options = webdriver.ChromeOptions()
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+
+    if profile == 'fast':
+        options.add_argument('--headless=new')
+        options.add_argument('--window-size=1366,900')
+        options.add_argument('--disable-extensions')
+        options.add_argument('--disable-background-networking')
+        options.add_argument('--disable-component-update')
+        options.add_argument('--disable-sync')
+        options.add_argument('--disable-default-apps')
+        options.add_argument('--no-first-run')
+        options.add_argument('--mute-audio')
+        # Don't wait for images/subresources - the scrapers wait for the grid explicitly
+        options.page_load_strategy = 'eager'
+        # Belt and braces for images in case CDP blocking is unavailable
+        options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+
+    return options
+
+
+def apply_network_blocking(driver, patterns=None):
+    """Block static assets and analytics for every request this driver makes"""
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns or BLOCKED_URL_PATTERNS})
+        return True
+    except Exception as e:
+        print(f"[WARN] Could not enable network blocking: {str(e)[:50]}")
+        return False
+
+
+def chrome_tree_rss(driver):
+    """Total RSS in bytes of chromedriver and every Chrome process below it (None without psutil)"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except Exception:
+        return None
+
+    total = 0
+    for proc in processes:
+        try:
+            total += proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total
+
+
+class MemoryWatchdog:
+    """Tells a worker when to recycle its browser: Chrome tree RSS over max_rss_mb, or max_records rows scraped"""
+
+    def __init__(self, max_rss_mb=None, max_records=None):
+        self.max_rss = max_rss_mb * 1024 * 1024 if max_rss_mb else None
+        self.max_records = max_records
+        self.records = 0
+        self.last_rss = None
+        if self.max_rss:
+            try:
+                import psutil
+            except ImportError:
+                print("[WARN] psutil is not installed - recycling by Chrome RSS is disabled")
+                self.max_rss = None
+
+    def check(self, driver):
+        """Count a row about to be scraped; the reason to recycle the browser first ('rss'/'records') or None"""
+        self.records += 1
+        self.last_rss = chrome_tree_rss(driver) if self.max_rss else None
+        if self.max_records and self.records > self.max_records:
+            return 'records'
+        if self.last_rss and self.last_rss > self.max_rss:
+            return 'rss'
+        return None
+
+    def reset(self):
+        """Start the budget of a fresh browser - the row that triggered the recycle is its first"""
+        self.records = 1
+
+
+def driver_alive(driver):
+    """True if the browser still answers WebDriver commands"""
+    try:
+        driver.window_handles
+        return True
+    except Exception:
+        return False
+
+
+class SpareDriver:
+    """One driver launched in a background thread and kept ready for a worker.
+
+    launch() returns a driver already on the list grid (plus whatever discard() needs
+    to clean it up) or None; take() hands the ready spare over - without waiting if it
+    finished warming - and starts warming the next one. A gate (the workers' startup
+    semaphore) keeps spare launches within the same bound as worker start-ups.
+    """
+
+    def __init__(self, launch, discard, gate=None):
+        self.launch = launch
+        self.discard = discard
+        self.gate = gate
+        self._thread = None
+        self._spare = None
+
+    def prepare(self):
+        """Start warming a spare in the background unless one is ready or warming"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._warm, daemon=True)
+            self._thread.start()
+
+    def _warm(self):
+        try:
+            with self.gate or contextlib.nullcontext():
+                self._spare = self.launch()
+        except Exception as e:
+            print(f"[SPARE] Spare driver failed to start: {str(e)[:50]}")
+            self._spare = None
+
+    def take(self, timeout=None):
+        """The spare (waiting up to timeout for one still warming) or None; warming of the next one starts"""
+        if self._thread is None:
+            return None
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            return None
+        spare, self._spare, self._thread = self._spare, None, None
+        self.prepare()
+        return spare
+
+    def close(self):
+        """Wait for a warming spare and discard it"""
+        if self._thread is not None:
+            self._thread.join()
+            if self._spare is not None:
+                self.discard(self._spare)
+            self._spare, self._thread = None, None
+
+
+# ============================================================
+# PER-WORKER CHROME USER-DATA-DIRS
+# ============================================================
+
+# Chrome's per-instance lock files - never copy these out of the template
+PROFILE_LOCK_FILES = ('SingletonLock', 'SingletonSocket', 'SingletonCookie', 'lockfile')
+
+# A worker may hold two profiles at once (its driver and a spare warming up)
+_profile_ids = itertools.count()
+
+
+def portal_origin(url):
+    """scheme://host[:port] of a portal URL - what a warmed template's cache is good for"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}" if parts.netloc else url
+
+
+def default_profile_root():
+    """/dev/shm (tmpfs) where available, otherwise the system temp directory"""
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm/erc_chrome_profiles'
+    return os.path.join(tempfile.gettempdir(), 'erc_chrome_profiles')
+
+
+class ChromeProfileManager:
+    """Create, pre-warm and clean up Chrome user-data-dirs for scraper workers.
+
+    A template profile is warmed once by loading the ERC grid so the portal's
+    scripts and static assets sit in its disk cache. Each worker then gets a
+    copy of the template, so its first page load starts from a warm cache.
+    Worker copies are removed on release() or at interpreter exit; the template
+    is kept (on tmpfs it lasts until reboot) and reused by later runs.
+
+    The template's .warm marker records the portal and driver profile it was
+    warmed against; a template warmed for another portal (the mock portal vs the
+    live one) or profile is warmed again instead of being reused.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or default_profile_root()
+        self.template_dir = os.path.join(self.root, 'template')
+        self._created = []
+        atexit.register(self.cleanup)
+
+    def template_marker(self):
+        """{'portal', 'profile'} the template was warmed against, or None if it is not warm"""
+        try:
+            with open(os.path.join(self.template_dir, '.warm'), encoding='utf-8') as f:
+                text = f.read()
+        except OSError:
+            return None
+        try:
+            marker = json.loads(text)
+        except ValueError:
+            # Written before the marker recorded the profile - just the URL
+            marker = {'portal': portal_origin(text.strip()), 'profile': None}
+        return marker if isinstance(marker, dict) else None
+
+    def has_template(self, url=None, profile=None):
+        """Whether the template is warm - for url's portal and for profile, when given"""
+        marker = self.template_marker()
+        if marker is None:
+            return False
+        if url is not None and marker.get('portal') != portal_origin(url):
+            return False
+        return profile is None or marker.get('profile') == profile
+
+    def warm_template(self, url, profile='default', grid_id="ctl00_MasterContentPlaceHolder_RadGrid_ctl00"):
+        """Load url once in a headless Chrome of the given profile on the template dir
+        (no-op if already warm for url's portal and that profile)"""
+        if self.has_template(url, profile):
+            return True
+
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
+        message = f"[PROFILE] Warming template profile ({profile}) for {portal_origin(url)} in {self.template_dir}..."
+        shutil.rmtree(self.template_dir, ignore_errors=True)
+        os.makedirs(self.template_dir, exist_ok=True)
+
+        options = build_chrome_options(profile)
+        options.add_argument('--headless=new')
+        options.add_argument(f'--user-data-dir={self.template_dir}')
+
+        driver = None
+        try:
+            driver = webdriver.Chrome(options=options)
+            driver.set_page_load_timeout(30)
+            if profile == 'fast':
+                apply_network_blocking(driver)
+            driver.get(url)
+            WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.ID, grid_id)))
+        except Exception as e:
+            print(f"{message} FAILED ({str(e)[:50]})", flush=True)
+            return False
+        finally:
+            if driver:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+
+        with open(os.path.join(self.template_dir, '.warm'), 'w', encoding='utf-8') as f:
+            json.dump({'portal': portal_origin(url), 'profile': profile}, f)
+        print(f"{message} OK", flush=True)
+        return True
+
+    def create(self, worker_id, url=None, profile=None):
+        """Return a fresh user-data-dir for this worker, cloned from the template if it is warm
+        (for url's portal and profile, when given)"""
+        path = os.path.join(self.root, f"worker_{worker_id}_{os.getpid()}_{next(_profile_ids)}")
+        shutil.rmtree(path, ignore_errors=True)
+
+        if self.has_template(url, profile):
+            try:
+                shutil.copytree(self.template_dir, path, symlinks=True,
+                                ignore=shutil.ignore_patterns(*PROFILE_LOCK_FILES))
+            except (shutil.Error, OSError):
+                # Template changed under us - fall back to a cold profile
+                shutil.rmtree(path, ignore_errors=True)
+                os.makedirs(path, exist_ok=True)
+        else:
+            os.makedirs(path, exist_ok=True)
+
+        self._created.append(path)
+        return path
+
+    def release(self, path):
+        """Delete a worker profile (call after driver.quit())"""
+        shutil.rmtree(path, ignore_errors=True)
+        if path in self._created:
+            self._created.remove(path)
+
+    def cleanup(self):
+        """Delete every worker profile this manager created"""
+        for path in list(self._created):
+            self.release(path)
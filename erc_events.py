@@ -0,0 +1,85 @@
+"""
+ERC Structured Event Log
+One JSONL file per worker (<dir>/worker_<id>.jsonl), appended and flushed line by line,
+so concurrent workers never contend for a file or interleave half-written lines.
+
+Every line is a JSON object with ts, worker and event, plus event-specific fields:
+    navigate     attempt, status
+    page_start   page, rows
+    record       page, row, record_number, license_no, status, notes, timings, error, error_class
+    page_done    page, records, reused
+    page_failed  page, error, error_class (error 'rows': records, failed_rows - rows out of retries)
+    retry        target, error_class, attempt, delay_s, error
+    circuit_open cooldown_s, error_rate, calls
+    breaker_wait remaining_s (every 30 s while a worker waits on an open breaker)
+    driver_replaced  spare
+    driver_recycled  reason, rss_bytes, records, page, row
+    worker_ready (startup_s) / worker_finish (records)
+
+The main process writes worker_main.jsonl with run_start (total_pages, first_page, last_page,
+rows_per_page, workers) and run_finish (records, elapsed_s).
+"""
+
+import json
+import os
+import time
+
+
+class EventLog:
+    """Event writer of one worker; the console message of an event is printed as one whole line"""
+
+    def __init__(self, worker_id, events_dir=None):
+        self.worker_id = worker_id
+        self.path = os.path.join(events_dir, f"worker_{worker_id}.jsonl") if events_dir else None
+        self._file = None
+        if self.path:
+            os.makedirs(events_dir, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+
+    def emit(self, event, message=None, **fields):
+        """Print message (if any) and append the event to the worker's log"""
+        if message:
+            print(message, flush=True)
+        if self._file:
+            entry = {'ts': round(time.time(), 3), 'worker': self.worker_id, 'event': event}
+            entry.update(fields)
+            self._file.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+            self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class EventTailer:
+    """Reads only the bytes appended to an event log since the last poll"""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self._partial = b''
+
+    def poll(self):
+        """New complete events since the last call (a half-written last line waits for the next poll)"""
+        try:
+            with open(self.path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size < self.offset:
+                    # Truncated or replaced - start over
+                    self.offset, self._partial = 0, b''
+                f.seek(self.offset)
+                chunk = f.read()
+        except OSError:
+            return []
+        self.offset += len(chunk)
+
+        data = self._partial + chunk
+        lines = data.split(b'\n')
+        self._partial = lines.pop()
+        events = []
+        for line in lines:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+        return events
@@ -0,0 +1,111 @@
+"""
+ERC Fault Injection
+Configurable failure profiles for load-testing the scrapers: slow responses, dropped popups,
+HTTP 500s, session expiry and driver crashes. Faults are injected at two layers:
+    server  - erc_mock_portal with a FaultInjector (slow, 500, session expiry, dropped popup)
+    driver  - FaultyDriver around a WebDriver (slow command, dropped popup, crash)
+"""
+
+import random
+import threading
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from erc_radgrid import CLICK_BUTTON_SCRIPT
+
+
+# Rates are per request (server) or per WebDriver command (driver)
+FAULT_PROFILES = {
+    'none': {},
+    'slow': {'slow_rate': 0.3, 'slow_delay': 3.0},
+    'flaky': {'slow_rate': 0.1, 'slow_delay': 2.0, 'error_rate': 0.05, 'drop_popup_rate': 0.05},
+    'sessions': {'session_expiry_rate': 0.02},
+    'crashy': {'crash_rate': 0.0005},
+    'hostile': {'slow_rate': 0.2, 'slow_delay': 3.0, 'error_rate': 0.05, 'drop_popup_rate': 0.05,
+                'session_expiry_rate': 0.01, 'crash_rate': 0.0005},
+}
+
+FAULT_KINDS = ['slow', 'error', 'drop_popup', 'session_expiry', 'crash']
+
+SESSION_EXPIRED_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Session expired</title></head>
+<body><h2>Session expired</h2><p>Your session has timed out. Please reload the page.</p></body></html>"""
+
+
+class FaultInjector:
+    """Rolls the dice for each fault kind of a profile and counts what it injected"""
+
+    def __init__(self, profile, seed=None):
+        self.profile = FAULT_PROFILES[profile] if isinstance(profile, str) else dict(profile)
+        self.rng = random.Random(seed)
+        self.counts = {kind: 0 for kind in FAULT_KINDS}
+        self._lock = threading.Lock()
+
+    def rate(self, kind):
+        return self.profile.get(f'{kind}_rate', 0.0)
+
+    @property
+    def slow_delay(self):
+        return self.profile.get('slow_delay', 0.0)
+
+    def should(self, kind):
+        """True if this request/command gets the fault (counted)"""
+        rate = self.rate(kind)
+        if not rate:
+            return False
+        with self._lock:
+            hit = self.rng.random() < rate
+            if hit:
+                self.counts[kind] += 1
+        return hit
+
+
+class FaultyDriver:
+    """WebDriver proxy that slows commands, swallows detail-button clicks and crashes.
+
+    A crash is permanent, like a dead chromedriver: every later command or attribute
+    read raises WebDriverException until quit(). Everything else is delegated to the wrapped driver.
+    """
+
+    FAULTY_COMMANDS = {'get', 'execute_script', 'find_element', 'find_elements', 'refresh'}
+
+    def __init__(self, driver, injector):
+        self._driver = driver
+        self._injector = injector
+        self._crashed = False
+
+    def _before_command(self):
+        if self._crashed or self._injector.should('crash'):
+            self._crashed = True
+            raise WebDriverException("chrome not reachable (injected crash)")
+        if self._injector.should('slow'):
+            time.sleep(self._injector.slow_delay)
+
+    def __getattr__(self, name):
+        if self.__dict__.get('_crashed'):
+            # A dead browser answers nothing - window handles and the current URL included
+            raise WebDriverException("chrome not reachable (injected crash)")
+        attr = getattr(self._driver, name)
+        if name not in self.FAULTY_COMMANDS:
+            return attr
+
+        def command(*args, **kwargs):
+            self._before_command()
+            if name == 'execute_script' and args and args[0] == CLICK_BUTTON_SCRIPT \
+                    and self._injector.should('drop_popup'):
+                return True  # Reported as clicked, but no popup will open
+            return attr(*args, **kwargs)
+        return command
+
+    @property
+    def injector(self):
+        return self._injector
+
+    @property
+    def page_source(self):
+        self._before_command()
+        return self._driver.page_source
+
+    def quit(self):
+        return self._driver.quit()
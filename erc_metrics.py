@@ -0,0 +1,171 @@
+"""
+ERC Prometheus Metrics
+Per-worker counters, gauges and phase-latency histograms in the Prometheus text format.
+
+Every worker writes its own textfile (<dir>/erc_worker_<id>.prom, atomically replaced)
+so process workers never share state; point node-exporter's textfile collector at the
+directory, or run start_metrics_server() to serve all of them merged on /metrics:
+
+    curl -s localhost:9108/metrics | grep erc_records_scraped_total
+"""
+
+import glob
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from erc_timing import PHASES
+
+
+METRIC_PREFIX = 'erc_'
+
+# name -> (type, help); counters get the _total suffix when rendered
+METRICS = {
+    'records_scraped': ('counter', "Detail records extracted"),
+    'records_failed': ('counter', "Rows whose detail could not be extracted"),
+    'pages_completed': ('counter', "Grid pages finished (scraped or reused)"),
+    'pages_reused': ('counter', "Grid pages reused from the page cache"),
+    'pages_failed': ('counter', "Grid pages abandoned after a navigation or page error, or left with failed rows"),
+    'navigation_retries': ('counter', "Retried loads of the list grid"),
+    'retries': ('counter', "Row and page attempts retried after a classified error (see erc_retry)"),
+    'circuit_wait_seconds': ('counter', "Seconds spent paused by the shared circuit breaker"),
+    'driver_starts': ('counter', "Chrome drivers started"),
+    'driver_restarts': ('counter', "Chrome drivers that replaced a crashed or recycled one"),
+    'driver_recycles': ('counter', "Browsers replaced by the memory watchdog (RSS limit or row budget)"),
+    'chrome_rss_bytes': ('gauge', "RSS of chromedriver and its Chrome processes"),
+    'page_queue_depth': ('gauge', "Pages left on the shared queue when this worker last took one"),
+    'last_record_timestamp_seconds': ('gauge', "Unix time of the worker's last extracted record"),
+}
+
+PHASE_HISTOGRAM = 'phase_seconds'
+PHASE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def metric_name(name):
+    kind = METRICS[name][0] if name in METRICS else 'histogram'
+    return f"{METRIC_PREFIX}{name}_total" if kind == 'counter' else f"{METRIC_PREFIX}{name}"
+
+
+class WorkerMetrics:
+    """Metrics of one worker; flush() rewrites its textfile at most every flush_interval seconds"""
+
+    def __init__(self, worker_id, textfile_dir=None, flush_interval=5.0):
+        self.worker_id = worker_id
+        self.textfile_dir = textfile_dir
+        self.flush_interval = flush_interval
+        self.values = {name: 0 for name in METRICS}
+        self.buckets = {phase: [0] * len(PHASE_BUCKETS) for phase in PHASES}
+        self.sums = {phase: 0.0 for phase in PHASES}
+        self.counts = {phase: 0 for phase in PHASES}
+        self.last_flush = 0.0
+        if textfile_dir:
+            os.makedirs(textfile_dir, exist_ok=True)
+
+    def inc(self, name, amount=1):
+        self.values[name] += amount
+
+    def set(self, name, value):
+        if value is not None:
+            self.values[name] = value
+
+    def observe_record(self, record):
+        """Count an extracted record and add its _t_* phase timings (see erc_timing) to the histograms"""
+        self.inc('records_scraped')
+        self.set('last_record_timestamp_seconds', time.time())
+        for phase in PHASES:
+            seconds = record.get(f'_t_{phase}')
+            if seconds is None:
+                continue
+            self.sums[phase] += seconds
+            self.counts[phase] += 1
+            for i, bound in enumerate(PHASE_BUCKETS):
+                if seconds <= bound:
+                    self.buckets[phase][i] += 1
+
+    def render(self):
+        """Prometheus text exposition of this worker's metrics"""
+        worker = f'worker="{self.worker_id}"'
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            full_name = metric_name(name)
+            lines += [f"# HELP {full_name} {help_text}", f"# TYPE {full_name} {kind}",
+                      f"{full_name}{{{worker}}} {self.values[name]}"]
+
+        full_name = metric_name(PHASE_HISTOGRAM)
+        lines += [f"# HELP {full_name} Time spent per detail record in each scraping phase",
+                  f"# TYPE {full_name} histogram"]
+        for phase in PHASES:
+            labels = f'{worker},phase="{phase}"'
+            for bound, count in zip(PHASE_BUCKETS, self.buckets[phase]):
+                lines.append(f'{full_name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{full_name}_bucket{{{labels},le="+Inf"}} {self.counts[phase]}')
+            lines.append(f"{full_name}_sum{{{labels}}} {self.sums[phase]:.4f}")
+            lines.append(f"{full_name}_count{{{labels}}} {self.counts[phase]}")
+        return '\n'.join(lines) + '\n'
+
+    def flush(self, force=False):
+        """Rewrite the worker's textfile (no-op without a textfile_dir)"""
+        if not self.textfile_dir or (not force and time.time() - self.last_flush < self.flush_interval):
+            return
+        self.last_flush = time.time()
+        path = os.path.join(self.textfile_dir, f"erc_worker_{self.worker_id}.prom")
+        tmp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.render())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[Worker {self.worker_id}] Could not write metrics: {e}")
+
+
+def merge_textfiles(textfile_dir):
+    """All worker textfiles as one exposition, with each metric family's samples grouped together"""
+    families = {}
+    family = None
+    for path in sorted(glob.glob(os.path.join(textfile_dir, '*.prom'))):
+        try:
+            with open(path, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            continue
+        for line in lines:
+            if line.startswith('# HELP '):
+                family = line.split()[2]
+                families.setdefault(family, {'header': [], 'samples': []})
+                if not families[family]['header']:
+                    families[family]['header'].append(line)
+            elif line.startswith('# TYPE '):
+                if len(families[family]['header']) < 2:
+                    families[family]['header'].append(line)
+            elif line.strip() and family:
+                families[family]['samples'].append(line)
+    return ''.join('\n'.join(block['header'] + block['samples']) + '\n' for block in families.values())
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the merged worker textfiles on /metrics"""
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = merge_textfiles(self.server.textfile_dir).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(textfile_dir, port, host='127.0.0.1'):
+    """Serve textfile_dir on http://host:port/metrics from a daemon thread; returns the server"""
+    os.makedirs(textfile_dir, exist_ok=True)
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.textfile_dir = textfile_dir
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"[METRICS] Serving http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,406 @@
+"""
+ERC Mock Portal
+Local stand-in for app04.erc.or.th for reproducible benchmarks and offline runs:
+the 504_ListLicensing_Columns_New.aspx grid (paging textbox, RadGrid client API, page size),
+the RadWindow detail iframe with every span id and the five rgMasterTable grids,
+and the rooftop get_list_importdata.ashx JSON. Built on http.server (no extra dependency).
+Optional server-side faults come from an erc_faults profile.
+
+Usage:
+    python erc_mock_portal.py --port 8765 --licenses 300 --latency 0.2
+    python erc_mock_portal.py --fault-profile flaky
+    python scrape_erc_production_parallel_v2.py --portal-url http://127.0.0.1:8765
+"""
+
+import argparse
+import html
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from erc_faults import FAULT_PROFILES, FaultInjector, SESSION_EXPIRED_PAGE
+from erc_radgrid import LIST_PAGE_PATH, LIST_GRID_CLIENT_ID, LIST_GRID_TABLE_ID, DEFAULT_PAGE_SIZE
+from rooftop_scrape import ROOFTOP_API_PATH
+from scrape_erc_distribution_parallel_v2 import (
+    DETAIL_SPAN_FIELDS, PRODUCTION_PLAN_FIELDS, PRODUCTION_PROCESS_FIELDS, MACHINE_FIELDS,
+    ELECTRICITY_USER_FIELDS,
+)
+
+
+DETAIL_PAGE_PATH = LIST_PAGE_PATH.rsplit('/', 1)[0] + "/644_LicensingDetail.aspx"
+DETAIL_ID_PREFIX = "ctl00_ContentPlaceHolder1_"
+
+# The five nested grids, in the order distribution extraction counts rgMasterTables
+DETAIL_GRIDS = [
+    'RadGridPowerProductionPlan',
+    'RadGridPowerProductPorcess',
+    'RadGridMachine',
+    'RadGridElectricityUser',
+    'RadGridOperatingCost',
+]
+
+# A span id fragment that is part of a longer one must come first, so the
+# scrapers' "first span whose id contains" lookup picks the right span
+DETAIL_SPAN_ORDER = sorted(DETAIL_SPAN_FIELDS, key=lambda field: len(field[1]))
+
+PROVINCES = ['กรุงเทพมหานคร', 'ชลบุรี', 'ระยอง', 'นครราชสีมา', 'ขอนแก่น', 'เชียงใหม่', 'สงขลา']
+FUELS = ['ก๊าซธรรมชาติ', 'แสงอาทิตย์', 'ชีวมวล', 'ลม', 'ถ่านหิน', 'น้ำ']
+CAPACITY_UNITS = ['kW', 'kVA', 'MW', 'MVA', 't/h']
+
+
+def thai_date(rng):
+    return f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(2540, 2567)}"
+
+
+class MockDataset:
+    """Deterministic licences per licence type; every value derives from (seed, type, index)"""
+
+    def __init__(self, licenses=300, rooftop=500, seed=0):
+        self.licenses = licenses
+        self.rooftop = rooftop
+        self.seed = seed
+
+    def license(self, license_type, index):
+        """Licence index (0-based) as list-grid cells plus detail spans and nested grid rows"""
+        rng = random.Random(f"{self.seed}-{license_type}-{index}")
+        number = index + 1
+        license_no = f"{'กกพ' if license_type == 1 else 'จพ'}-{license_type}-{number:05d}"
+        name = f"บริษัท ทดสอบพลังงาน {number} จำกัด"
+        plant = f"โรงไฟฟ้าทดสอบ {number}"
+        province = rng.choice(PROVINCES)
+        fuel = rng.choice(FUELS)
+        mw = round(rng.uniform(0.1, 900), 3)
+
+        spans = {fragment: f"{column} {number}" for column, fragment in DETAIL_SPAN_FIELDS}
+        spans.update({
+            'lblLicensesNo_1': license_no,
+            'LicenseeName': name,
+            'PowerPlantName': plant,
+            'GenPower_MW': f"{mw:,.3f}",
+            'GenPower_kVA': f"{mw * 1250:,.2f}",
+        })
+        # Leave some optional fields empty, as the portal does
+        for column, fragment in DETAIL_SPAN_FIELDS:
+            if fragment.endswith(('_2', '_3')) and rng.random() < 0.7:
+                spans[fragment] = ''
+
+        def span_rows(fields, count):
+            return [{fragment: f"{column} {number}.{row + 1}" for column, fragment in fields}
+                    for row in range(count)]
+
+        return {
+            'cells': [
+                '', str(number), name, plant, province, f"สำนักงานเขต {rng.randint(1, 13)}", license_no,
+                thai_date(rng), fuel, rng.choice(FUELS + ['']), f"{mw:,.3f}", f"{mw * 1250:,.2f}", thai_date(rng),
+            ],
+            'spans': spans,
+            'plans': span_rows(PRODUCTION_PLAN_FIELDS, rng.randint(0, 3)),
+            'processes': span_rows(PRODUCTION_PROCESS_FIELDS, rng.randint(0, 4)),
+            'machines': [dict(row, lblRateCapacity=f"{rng.uniform(0.5, 5000):,.2f} {rng.choice(CAPACITY_UNITS)}")
+                         for row in span_rows(MACHINE_FIELDS, rng.randint(0, 5))],
+            'users': [
+                [str(row + 1), f"PEA-{number:05d}/{row + 1}"] +
+                [f"{column} {number}.{row + 1}" for column, _ in ELECTRICITY_USER_FIELDS[1:]]
+                for row in range(rng.randint(0, 3) if license_type == 4 else 0)
+            ],
+            'costs': [
+                [str(row + 1), f"การไฟฟ้า {row + 1}", f"{rng.choice([22, 33, 115])}", f"{rng.uniform(2, 5):.4f}"]
+                for row in range(rng.randint(0, 2) if license_type == 4 else 0)
+            ],
+        }
+
+    def rooftop_rows(self):
+        """Rows as returned by get_list_importdata.ashx"""
+        rows = []
+        for index in range(self.rooftop):
+            rng = random.Random(f"{self.seed}-rooftop-{index}")
+            rows.append({
+                'LicenseeName': f"ผู้ประกอบกิจการ {index + 1}",
+                'PowerPlantName': f"หลังคา {index + 1}",
+                'Prov_P': rng.choice(PROVINCES),
+                'District_P': f"อำเภอ {rng.randint(1, 20)}",
+                'SDistrict_P': f"ตำบล {rng.randint(1, 30)}",
+                'RBS_P': f"เขต {rng.randint(1, 13)}",
+                'BuildingType': rng.choice(['บ้านอยู่อาศัย', 'โรงงาน', 'อาคารพาณิชย์']),
+                'kW': round(rng.uniform(1, 999), 2),
+                'SellTo': rng.choice(['PEA', 'MEA', '']),
+                'sellV': rng.choice(['0.4', '22', '']),
+                'ContractDate': thai_date(rng),
+                'COD': thai_date(rng),
+                'FacDate': thai_date(rng) if rng.random() < 0.5 else None,
+                'ECDate': thai_date(rng) if rng.random() < 0.3 else None,
+                'AUDate': thai_date(rng) if rng.random() < 0.2 else None,
+                'txtReqDate': thai_date(rng),
+                'txtDocDate': thai_date(rng),
+                'txtUpdateDate': thai_date(rng),
+            })
+        return rows
+
+
+LIST_PAGE_SCRIPT = """
+var ERC_GRID = %(grid)s;
+function ercGo(page, pageSize) {
+    var query = new URLSearchParams(window.location.search);
+    query.set('page', page);
+    query.set('pageSize', pageSize);
+    window.location.search = query.toString();
+}
+var ercView = {
+    get_currentPageIndex: function () { return ERC_GRID.page - 1; },
+    get_pageSize: function () { return ERC_GRID.pageSize; },
+    get_pageCount: function () { return ERC_GRID.pageCount; },
+    page: function (n) { ercGo(n, ERC_GRID.pageSize); },
+    set_pageSize: function (n) { ercGo(1, n); }
+};
+window.$find = function (id) {
+    return id === ERC_GRID.clientId ? {get_masterTableView: function () { return ercView; }} : null;
+};
+function radopen(url, name) {
+    if (Math.random() < ERC_GRID.dropPopupRate) { return null; }
+    var wrapper = document.getElementById('RadWindowWrapper');
+    wrapper.innerHTML = '<a class="rwCloseButton" href="#" onclick="ercClosePopup(); return false;">ปิด</a>'
+        + '<iframe name="RadWindowManager" src="' + url + '" style="width:900px;height:600px"></iframe>';
+    wrapper.style.display = 'block';
+    return {close: ercClosePopup};
+}
+function ercClosePopup() {
+    var wrapper = document.getElementById('RadWindowWrapper');
+    wrapper.innerHTML = '';
+    wrapper.style.display = 'none';
+}
+"""
+
+
+def render_list_page(dataset, license_type, page, page_size, drop_popup_rate=0.0):
+    """HTML of one list-grid page (drop_popup_rate: share of detail clicks whose popup never opens)"""
+    page_count = max(1, math.ceil(dataset.licenses / page_size))
+    page = min(max(page, 1), page_count)
+    first = (page - 1) * page_size
+    last = min(first + page_size, dataset.licenses)
+
+    rows = []
+    for position, index in enumerate(range(first, last)):
+        cells = dataset.license(license_type, index)['cells']
+        row_id = f"{LIST_GRID_TABLE_ID}_ctl{4 + position * 2:02d}"
+        button = (
+            f'<input type="image" src="/images/icon_view.gif" id="{row_id}_btnView" '
+            f'name="{row_id.replace("_", "$")}$btnView" '
+            f'onclick="radopen(\'644_LicensingDetail.aspx?ID={license_type}-{index + 1}\', \'RadWindowManager\'); return false;">'
+        )
+        tds = [f'<td>{button}</td>'] + [f'<td>{html.escape(cell)}</td>' for cell in cells[1:]]
+        rows.append(f'<tr id="{LIST_GRID_TABLE_ID}__{position}" class="rgRow">{"".join(tds)}</tr>')
+
+    grid = json.dumps({'clientId': LIST_GRID_CLIENT_ID, 'page': page, 'pageSize': page_size,
+                       'pageCount': page_count, 'dropPopupRate': drop_popup_rate})
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>ERC Mock - LicenseType={license_type}</title>
+<script>{LIST_PAGE_SCRIPT % {'grid': grid}}</script></head>
+<body>
+<form id="aspnetForm" method="get" action="{LIST_PAGE_PATH}">
+<input type="hidden" name="LicenseType" value="{license_type}">
+<input type="hidden" name="pageSize" value="{page_size}">
+<div id="{LIST_GRID_CLIENT_ID}" class="RadGrid">
+<table id="{LIST_GRID_TABLE_ID}" class="rgMasterTable">
+<thead><tr>{''.join('<th>%d</th>' % i for i in range(13))}</tr></thead>
+<tbody>{''.join(rows)}</tbody>
+</table>
+<div class="rgWrap rgInfoPart">Displaying page {page} of {page_count}, items from {first + 1} to {last} of {dataset.licenses}.</div>
+<input type="text" class="rgPageText" name="page" value="{page}"
+       id="{LIST_GRID_TABLE_ID}_ctl03_ctl01_RadGridPagingTemplate2_RadNumericTextBox1">
+</div>
+</form>
+<div id="RadWindowWrapper" style="display:none"></div>
+</body></html>"""
+
+
+def render_detail_page(dataset, license_type, index):
+    """HTML of one licence detail page (the document inside the RadWindow iframe)"""
+    licence = dataset.license(license_type, index)
+    spans = ''.join(
+        f'<span id="{DETAIL_ID_PREFIX}{fragment}">{html.escape(licence["spans"][fragment])}</span>\n'
+        for _, fragment in DETAIL_SPAN_ORDER
+    )
+
+    def grid_table(name, body_rows):
+        table_id = f"{DETAIL_ID_PREFIX}{name}_ctl00"
+        if not body_rows:
+            body_rows = ['<tr class="rgNoRecords"><td colspan="10">ไม่มีข้อมูล</td></tr>']
+        return f'<table id="{table_id}" class="rgMasterTable"><thead><tr><th></th></tr></thead><tbody>{"".join(body_rows)}</tbody></table>\n'
+
+    def span_grid(name, rows, fields):
+        body = []
+        for position, row in enumerate(rows):
+            prefix = f"{DETAIL_ID_PREFIX}{name}_ctl00_ctl{4 + position * 2:02d}_"
+            tds = ''.join(f'<td><span id="{prefix}{fragment}">{html.escape(row[fragment])}</span></td>'
+                          for _, fragment in fields)
+            body.append(f'<tr id="{DETAIL_ID_PREFIX}{name}_ctl00__{position}" class="rgRow">{tds}</tr>')
+        return grid_table(name, body)
+
+    def cell_grid(name, rows):
+        return grid_table(name, ['<tr class="rgRow">' + ''.join(f'<td>{html.escape(cell)}</td>' for cell in row) + '</tr>'
+                                 for row in rows])
+
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>ERC Mock - Licence detail</title></head>
+<body>
+{spans}
+{span_grid(DETAIL_GRIDS[0], licence['plans'], PRODUCTION_PLAN_FIELDS)}
+{span_grid(DETAIL_GRIDS[1], licence['processes'], PRODUCTION_PROCESS_FIELDS)}
+{span_grid(DETAIL_GRIDS[2], licence['machines'], MACHINE_FIELDS)}
+{cell_grid(DETAIL_GRIDS[3], licence['users'])}
+{cell_grid(DETAIL_GRIDS[4], licence['costs'])}
+<input type="button" value="ปิด">
+</body></html>"""
+
+
+class MockPortalHandler(BaseHTTPRequestHandler):
+    """Routes the three portal endpoints; anything else is a 404.
+
+    With server.faults set, every request may be slowed, answered with a 500 or
+    with a session-expired page. Dropped popups happen in the browser (radopen
+    ignores a share of clicks), so they are not counted in server.faults.
+    """
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_body(self, body, content_type, status=200):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def delay(self):
+        latency = self.server.latency
+        if self.server.jitter:
+            latency += random.uniform(0, self.server.jitter)
+        if latency > 0:
+            time.sleep(latency)
+
+    def inject_faults(self):
+        """Apply the server's request faults; True if the response was already sent"""
+        faults = self.server.faults
+        if not faults:
+            return False
+        if faults.should('slow'):
+            time.sleep(faults.slow_delay)
+        if faults.should('error'):
+            self.send_body('Internal Server Error', 'text/plain', status=500)
+            return True
+        if faults.should('session_expiry'):
+            self.send_body(SESSION_EXPIRED_PAGE, 'text/html; charset=utf-8')
+            return True
+        return False
+
+    def do_GET(self):
+        if self.inject_faults():
+            return
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        dataset = self.server.dataset
+
+        if url.path == LIST_PAGE_PATH:
+            self.delay()
+            license_type = int(query.get('LicenseType', ['1'])[0])
+            page = int(query.get('page', ['1'])[0] or 1)
+            page_size = int(query.get('pageSize', [str(DEFAULT_PAGE_SIZE)])[0] or DEFAULT_PAGE_SIZE)
+            page_size = min(max(page_size, 1), self.server.max_page_size)
+            html_page = render_list_page(dataset, license_type, page, page_size, self.server.drop_popup_rate)
+            self.send_body(html_page, 'text/html; charset=utf-8')
+        elif url.path == DETAIL_PAGE_PATH:
+            self.delay()
+            try:
+                license_type, number = (int(part) for part in query['ID'][0].split('-'))
+            except (KeyError, ValueError):
+                self.send_body('Bad ID', 'text/plain', status=400)
+                return
+            if not 1 <= number <= dataset.licenses:
+                self.send_body('Not found', 'text/plain', status=404)
+                return
+            self.send_body(render_detail_page(dataset, license_type, number - 1), 'text/html; charset=utf-8')
+        else:
+            self.send_body('Not found', 'text/plain', status=404)
+
+    def do_POST(self):
+        if self.inject_faults():
+            return
+        if urlparse(self.path).path == ROOFTOP_API_PATH:
+            self.delay()
+            self.send_body(json.dumps(self.server.dataset.rooftop_rows(), ensure_ascii=False),
+                           'application/json; charset=utf-8')
+        else:
+            self.send_body('Not found', 'text/plain', status=404)
+
+
+class MockPortalServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the dataset and latency settings"""
+    daemon_threads = True
+
+    def __init__(self, address, dataset, latency=0.0, jitter=0.0, max_page_size=100, faults=None,
+                 verbose=False, handler_class=MockPortalHandler):
+        super().__init__(address, handler_class)
+        self.dataset = dataset
+        self.latency = latency
+        self.jitter = jitter
+        self.max_page_size = max_page_size
+        self.faults = faults
+        self.drop_popup_rate = faults.rate('drop_popup') if faults else 0.0
+        self.verbose = verbose
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_mock_portal(host='127.0.0.1', port=0, licenses=300, rooftop=500, seed=0, fault_profile=None,
+                      **server_options):
+    """Serve a mock portal from a daemon thread; returns the server (its .url is the portal URL).
+
+    fault_profile names an erc_faults profile; server.faults.counts then holds the injected faults.
+    """
+    faults = FaultInjector(fault_profile, seed=seed) if fault_profile else None
+    server = MockPortalServer((host, port), MockDataset(licenses, rooftop, seed), faults=faults, **server_options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the ERC licence portal")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--licenses', type=int, default=300, help="Licences per licence type")
+    parser.add_argument('--rooftop', type=int, default=500, help="Rows returned by the rooftop API")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument('--max-page-size', type=int, default=100, help="Largest grid page size the server accepts")
+    parser.add_argument('--fault-profile', choices=list(FAULT_PROFILES), default=None,
+                        help="Inject server-side faults from an erc_faults profile")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args()
+
+    server = MockPortalServer((args.host, args.port), MockDataset(args.licenses, args.rooftop, args.seed),
+                              latency=args.latency, jitter=args.jitter, max_page_size=args.max_page_size,
+                              faults=FaultInjector(args.fault_profile, seed=args.seed) if args.fault_profile else None,
+                              verbose=args.verbose)
+    print(f"[MOCK] ERC portal on {server.url} - {args.licenses} licences per type, "
+          f"{args.rooftop} rooftop rows, latency {args.latency}s")
+    print(f"[MOCK] Production list: {server.url}{LIST_PAGE_PATH}?LicenseType=1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[MOCK] Stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+ERC Page Cache
+Persistent page-hash index for repeat runs: the list grid of every page is hashed
+(licence numbers plus visible columns) and stored with that page's detail records,
+so a page whose hash has not changed reuses its records instead of opening popups.
+
+Layout (one pair of files per page, so concurrent workers never share a file):
+    <root>/page_00001.hash   - hash of the page's list grid
+    <root>/page_00001.jsonl  - detail records scraped for that grid
+
+Reused records come back without the worker and phase timings of the run that scraped
+them (_worker_id, _t_*), so they never mix into this run's timing summary.
+"""
+
+import hashlib
+import json
+import os
+
+
+def page_hash(grid_rows):
+    """Hash of a harvested grid page (see erc_radgrid.harvest_grid_rows)"""
+    content = [[row.get('license_no')] + list(row['cells']) for row in grid_rows]
+    return hashlib.sha256(json.dumps(content, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def _reusable(record):
+    """A stored record without the fields that belong to the run that scraped it"""
+    return {key: value for key, value in record.items() if key != '_worker_id' and not key.startswith('_t_')}
+
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class PageCache:
+    """Page-hash index plus the stored detail records of each page"""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, page_number, suffix):
+        return os.path.join(self.root, f"page_{page_number:05d}.{suffix}")
+
+    def stored_hash(self, page_number):
+        """Hash recorded for a page on the previous run, or None"""
+        try:
+            with open(self._path(page_number, 'hash'), encoding='utf-8') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def lookup(self, page_number, current_hash):
+        """Stored records if the page is unchanged since they were scraped, else None"""
+        if self.stored_hash(page_number) != current_hash:
+            return None
+        try:
+            with open(self._path(page_number, 'jsonl'), encoding='utf-8') as f:
+                return [_reusable(json.loads(line)) for line in f if line.strip()]
+        except (OSError, ValueError):
+            return None
+
+    def store(self, page_number, current_hash, records):
+        """Record a fully scraped page; records are written before the hash that vouches for them"""
+        lines = ''.join(json.dumps(record, ensure_ascii=False, default=str) + '\n' for record in records)
+        _write_atomic(self._path(page_number, 'jsonl'), lines)
+        _write_atomic(self._path(page_number, 'hash'), current_hash)
@@ -0,0 +1,1433 @@
+"""
+ERC Parallel Scraper - shared core of the PARALLEL V2 scrapers
+ERCScraperBase drives one browser (launch, recycle, retries, grid paging, detail extraction) and the
+module functions run the worker pool and the command line. Each V2 script subclasses ERCScraperBase
+with its license type's detail fields and nested tables and hands the class to main().
+"""
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+import pandas as pd
+import time
+from datetime import datetime
+from bs4 import BeautifulSoup
+from multiprocessing import Pool, Manager
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import queue
+import os
+import signal
+import threading
+from erc_result_sink import start_result_sink, start_thread_sink, stop_result_sink, load_records
+from erc_driver import (DRIVER_PROFILES, build_chrome_options, apply_network_blocking, chrome_tree_rss, driver_alive,
+                        ChromeProfileManager, MemoryWatchdog, SpareDriver)
+from erc_popup_js import run_popup_extract, first_span_text, find_grid
+from erc_radgrid import (PORTAL_URL, LIST_GRID_TABLE_ID, LIST_GRID_NUMERIC_COLUMNS, DEFAULT_PAGE_SIZE, harvest_grid_rows,
+                         click_grid_row, jump_to_page, grid_paging, set_page_size, maximize_page_size,
+                         summary_record, list_page_url)
+from erc_tabs import TabSchedulerState, run_tab_scheduler
+from erc_page_cache import PageCache, page_hash
+from erc_faults import FAULT_PROFILES, FaultInjector, FaultyDriver
+from erc_timing import TIMING_FIELDS, RecordTimer, save_timing_summary
+from erc_metrics import WorkerMetrics, start_metrics_server
+from erc_events import EventLog
+from erc_retry import RetryPolicy, StructureError, classify_error, create_breaker, error_page, raise_for_error_page
+
+
+# Bookkeeping fields added to every record by scrape_page
+RECORD_META_FIELDS = ['_record_number', '_page_number', '_row_on_page', '_worker_id'] + TIMING_FIELDS
+
+
+class ERCScraperBase:
+    """One browser working through list-grid pages; subclasses describe their license type"""
+
+    # Human-readable license type, e.g. 'Production' (banner, Excel sheet name)
+    LICENSE_TYPE = None
+    # Prefix of every output file (records, exports, caches, metrics)
+    OUTPUT_PREFIX = None
+    # Portal list page the license type is listed on (see erc_radgrid.list_page_url)
+    LIST_PAGE = 1
+    # (output column, span id fragment) for every single-value field in the detail popup
+    DETAIL_SPAN_FIELDS = []
+    # (record key, column prefix) of the nested tables flattened into numbered columns on export
+    NESTED_TABLES = []
+    # erc_records.RecordSchema the records are packed with before they cross the process boundary
+    RECORD_SCHEMA = None
+
+    def __init__(self, worker_id=0, driver_profile='default', profile_root=None, extract_mode='html',
+                 detail_mode='popup', tabs=1, page_size=None, cache_dir=None, portal_url=None,
+                 fault_profile=None, metrics_dir=None, events_dir=None, spare_driver=False,
+                 recycle_rss_mb=None, recycle_every=None, breaker=None):
+        """Initialize scraper with worker ID for debugging and a Chrome profile name (see erc_driver).
+
+        extract_mode: 'html' parses driver.page_source with BeautifulSoup,
+                      'js' collects the popup fields in-browser with one script (see erc_popup_js)
+        detail_mode:  'popup' clicks each row and works inside the RadWindow popup,
+                      'tab' keeps the grid in one tab and loads detail URLs directly in a second tab
+        tabs:         number of tabs one browser drives concurrently, each on its own page (see erc_tabs)
+        page_size:    grid rows per page - None keeps the portal default, 'max' asks for the largest
+                      size the server accepts; rows_per_page holds the size actually in effect
+        cache_dir:    page-hash cache from previous runs - unchanged pages reuse their stored records
+        portal_url:   portal host to scrape (default: the ERC portal; e.g. a local erc_mock_portal)
+        fault_profile: erc_faults profile injected at the WebDriver level (load testing only)
+        metrics_dir:  directory for this worker's Prometheus textfile (see erc_metrics)
+        events_dir:   directory for this worker's JSONL event log (see erc_events)
+        spare_driver: keep a second driver warming in the background so a crashed one is replaced at once
+        recycle_rss_mb / recycle_every: replace the browser between rows once its Chrome process tree
+                      uses more than this many MB, or after this many rows (see erc_driver.MemoryWatchdog;
+                      single-tab workers only - the tab scheduler keeps its browser)
+        breaker:      erc_retry.CircuitBreaker shared with the other workers of the run (None: no breaker)
+        """
+        self.worker_id = worker_id
+        self.driver_profile = driver_profile
+        self.extract_mode = extract_mode
+        self.detail_mode = detail_mode
+        self.tabs = tabs
+        self.page_size = page_size
+        self.rows_per_page = DEFAULT_PAGE_SIZE
+        # Rows the last scrape_page() found on its grid page (None if the page didn't load)
+        self.last_page_rows = None
+        # Row index the last scrape_page() stopped at because the browser could not be recycled
+        # (None if it ran to the end) - the caller finishes the page from there on a new browser
+        self.resume_row = None
+        # Grid page the list grid was last moved to by go_to_page() (None while unknown)
+        self.current_page = None
+        self.page_cache = PageCache(cache_dir) if cache_dir else None
+        self.pages_reused = 0
+        self.fault_profile = fault_profile
+        self.faults = None
+        self.grid_handle = None
+        self.detail_handle = None
+        # Window handles owned by the scraper (detail tab, other scheduler tabs) - never popups
+        self.tab_handles = set()
+        # Phase durations of the record being scraped (see erc_timing)
+        self.timer = RecordTimer()
+        self.metrics = WorkerMetrics(worker_id, metrics_dir)
+        self.events = EventLog(worker_id, events_dir)
+        # Console notes ('iframe', extraction errors) and failure reason of the current record
+        self.record_notes = []
+        self.record_failure = None
+        self.record_error = None
+        self.record_error_class = None
+        # Classified retries of rows and page loads (see erc_retry)
+        self.retry = RetryPolicy(seed=worker_id)
+        self.breaker = breaker
+        self.profile_manager = ChromeProfileManager(profile_root)
+        self.user_data_dir = None
+        self.spare = SpareDriver(self.launch_spare_driver, self.discard_driver) if spare_driver else None
+        self.watchdog = MemoryWatchdog(recycle_rss_mb, recycle_every) if recycle_rss_mb or recycle_every else None
+        self.base_url = list_page_url(self.LIST_PAGE, portal_url)
+        self.all_data = []
+        self.driver = None
+
+    def create_driver(self):
+        """Create a new WebDriver instance with retry logic"""
+        self.adopt_driver(self.start_chrome())
+        return self.driver
+
+    def adopt_driver(self, launched):
+        """Make a (driver, user-data-dir) pair from start_chrome() or launch_ready_driver() the scraper's own"""
+        self.driver, self.user_data_dir = launched
+        self.faults = self.driver.injector if isinstance(self.driver, FaultyDriver) else None
+        self.metrics.inc('driver_starts')
+
+    def start_chrome(self):
+        """(driver, user-data-dir) of a new Chrome; the caller owns both (no scraper state is touched)"""
+        for attempt in range(3):
+            user_data_dir = None
+            try:
+                options = build_chrome_options(self.driver_profile)
+                user_data_dir = self.profile_manager.create(self.worker_id, self.base_url, self.driver_profile)
+                options.add_argument(f'--user-data-dir={user_data_dir}')
+
+                driver = webdriver.Chrome(options=options)
+                driver.set_page_load_timeout(30)
+
+                if self.driver_profile == 'fast':
+                    apply_network_blocking(driver)
+
+                if self.fault_profile:
+                    driver = FaultyDriver(driver, FaultInjector(self.fault_profile, seed=self.worker_id))
+                return driver, user_data_dir
+            except Exception as e:
+                print(f"\n[Worker {self.worker_id}] Driver creation attempt {attempt+1} failed: {e}")
+                if user_data_dir:
+                    self.profile_manager.release(user_data_dir)
+                if attempt < 2:
+                    time.sleep(3)
+                else:
+                    raise
+        return None, None
+
+    def launch_ready_driver(self, quiet=False):
+        """(driver, user-data-dir) of a new Chrome already showing the list grid, or None"""
+        driver, user_data_dir = self.start_chrome()
+        if driver and self.navigate_to_url(driver, quiet=quiet):
+            return driver, user_data_dir
+        self.discard_driver((driver, user_data_dir))
+        return None
+
+    def launch_spare_driver(self):
+        """launch_ready_driver() for SpareDriver's background thread - no events, metrics or page-size updates"""
+        return self.launch_ready_driver(quiet=True)
+
+    def discard_driver(self, launched):
+        """Quit a driver from launch_ready_driver() and delete its user-data-dir"""
+        driver, user_data_dir = launched
+        try:
+            if driver:
+                driver.quit()
+        except:
+            pass
+        if user_data_dir:
+            self.profile_manager.release(user_data_dir)
+
+    def replace_driver(self):
+        """Swap the current driver for the warm spare (or a new one); True once the grid is up"""
+        self.close_driver()
+        launched = self.spare.take() if self.spare else None
+        if launched:
+            self.adopt_driver(launched)
+            self.metrics.inc('driver_restarts')
+            self.events.emit('driver_replaced', f"[Worker {self.worker_id}] Switched to the warm spare driver",
+                             spare=True)
+            return True
+        launched = self.launch_ready_driver()
+        if not launched:
+            return False
+        self.adopt_driver(launched)
+        self.metrics.inc('driver_restarts')
+        self.events.emit('driver_replaced', f"[Worker {self.worker_id}] Started a replacement driver", spare=False)
+        return True
+
+    def recycle_driver(self, page_number, row_index):
+        """Before a row: replace the browser if the watchdog asks and reload page_number; False if that failed"""
+        reason = self.watchdog.check(self.driver)
+        self.metrics.set('chrome_rss_bytes', self.watchdog.last_rss)
+        if not reason:
+            return True
+
+        rss = self.watchdog.last_rss
+        detail = f"{rss / 1024 / 1024:.0f} MB" if reason == 'rss' else f"{self.watchdog.records - 1} rows"
+        self.events.emit('driver_recycled', f"[Worker {self.worker_id}] Recycling browser ({detail}) - "
+                         f"resuming at page {page_number} row {row_index + 1}",
+                         reason=reason, rss_bytes=rss, records=self.watchdog.records - 1,
+                         page=page_number, row=row_index + 1)
+        self.metrics.inc('driver_recycles')
+        self.watchdog.reset()
+        # Rows are clicked by their harvested ids, so the reloaded page picks up at the same row
+        return self.replace_driver() and self.go_to_page(page_number)
+
+    def close_driver(self):
+        """Quit the driver and delete its per-worker user-data-dir"""
+        if self.driver:
+            try:
+                self.driver.quit()
+            except:
+                pass
+            self.driver = None
+        # Window handles die with the browser
+        self.grid_handle = self.detail_handle = None
+        self.tab_handles = set()
+        if self.user_data_dir:
+            self.profile_manager.release(self.user_data_dir)
+            self.user_data_dir = None
+
+    def navigate_to_url(self, driver, max_retries=3, quiet=False):
+        """Navigate to base URL with retry logic (quiet: no events, metrics or rows_per_page update)"""
+        emit = (lambda *args, **fields: None) if quiet else self.events.emit
+        for attempt in range(max_retries):
+            try:
+                if attempt and not quiet:
+                    self.metrics.inc('navigation_retries')
+                message = f"[Worker {self.worker_id}] Navigating to website (attempt {attempt+1})..."
+                driver.get(self.base_url)
+
+                # The grid being present is the ready signal - no fixed settle time
+                try:
+                    WebDriverWait(driver, 10).until(
+                        EC.presence_of_element_located((By.ID, "ctl00_MasterContentPlaceHolder_RadGrid_ctl00"))
+                    )
+                    emit('navigate', f"{message} OK", attempt=attempt + 1, status='OK')
+                    # A fresh grid is back at the default page size
+                    self.apply_page_size(driver, quiet=quiet)
+                    return True
+                except TimeoutException:
+                    emit('navigate', f"{message} TIMEOUT - page didn't load",
+                                     attempt=attempt + 1, status='TIMEOUT')
+                    if attempt < max_retries - 1:
+                        time.sleep(5)
+                        continue
+                    return False
+
+            except WebDriverException as e:
+                emit('navigate', f"{message} FAILED ({str(e)[:50]})",
+                                 attempt=attempt + 1, status='FAILED', error=str(e)[:200])
+                if attempt < max_retries - 1:
+                    time.sleep(5)
+                else:
+                    return False
+        return False
+
+    def clean_text(self, text):
+        """Clean cell text - remove &nbsp;, extra spaces, return None if empty"""
+        if not text:
+            return None
+        text = text.replace('\xa0', '').replace('&nbsp;', '').strip()
+        import re
+        text = re.sub(r'\s+', ' ', text).strip()
+        return text if text else None
+
+    def switch_to_popup(self, driver):
+        """Switch into the detail popup iframe (or popup window); False if still on the main page"""
+        context_switched = False
+
+        # Try to switch to popup iframe or window
+        try:
+            iframe = driver.find_element(By.CSS_SELECTOR, 'iframe[name="RadWindowManager"]')
+            driver.switch_to.frame(iframe)
+            context_switched = True
+            self.record_notes.append('[iframe]')
+        except Exception:
+            try:
+                iframes = driver.find_elements(By.TAG_NAME, "iframe")
+                for iframe in iframes:
+                    try:
+                        iframe_src = iframe.get_attribute('src') or ''
+                        if '644_Licensing' in iframe_src or 'LicensingDetail' in iframe_src:
+                            driver.switch_to.frame(iframe)
+                            context_switched = True
+                            self.record_notes.append('[iframe:src]')
+                            break
+                    except:
+                        continue
+            except:
+                pass
+
+        if not context_switched:
+            try:
+                main_window = driver.current_window_handle
+                if len(driver.window_handles) > 1:
+                    for handle in driver.window_handles:
+                        if handle != main_window and handle not in self.tab_handles:
+                            driver.switch_to.window(handle)
+                            context_switched = True
+                            self.record_notes.append('[window]')
+                            break
+                    time.sleep(1)
+            except:
+                pass
+
+        return context_switched
+
+    def extract_popup_data(self, driver, in_popup=True):
+        """Extract all data from the detail pop-up window using BeautifulSoup
+
+        in_popup=False skips the popup wait/switch when the detail page is the current document.
+        """
+        try:
+            if in_popup:
+                with self.timer.phase('popup_wait'):
+                    time.sleep(4)
+                    self.switch_to_popup(driver)
+
+            with self.timer.phase('page_source'):
+                html = driver.page_source
+
+            with self.timer.phase('parse'):
+                soup = BeautifulSoup(html, 'html.parser')
+                data = {}
+                for column, span_id in self.DETAIL_SPAN_FIELDS:
+                    data[column] = self.clean_text(self.get_span_text(soup, span_id))
+
+            with self.timer.phase('nested_tables'):
+                data.update(self.extract_nested_tables(soup))
+
+            return data
+
+        except Exception as e:
+            self.record_notes.append(f"[ERROR: {str(e)[:30]}]")
+            self.record_error = e
+            return {}
+
+    def extract_popup_data_js(self, driver, in_popup=True):
+        """Extract the detail pop-up with one in-browser script (no page_source transfer or re-parse)"""
+        try:
+            if in_popup:
+                with self.timer.phase('popup_wait'):
+                    time.sleep(4)
+                    self.switch_to_popup(driver)
+
+            with self.timer.phase('page_source'):
+                payload = run_popup_extract(driver)
+
+            with self.timer.phase('parse'):
+                data = {}
+                for column, span_id in self.DETAIL_SPAN_FIELDS:
+                    data[column] = self.clean_text(first_span_text(payload['spans'], span_id))
+
+            with self.timer.phase('nested_tables'):
+                data.update(self.extract_nested_tables_js(payload))
+
+            return data
+
+        except Exception as e:
+            self.record_notes.append(f"[ERROR: {str(e)[:30]}]")
+            self.record_error = e
+            return {}
+
+    def js_span_rows(self, payload, grid_id, fields):
+        """Rows of a span-based grid from the popup script payload, mapped with a (column, span id) spec"""
+        grid = find_grid(payload, grid_id)
+        if not grid:
+            return []
+        return [
+            {column: self.clean_text(first_span_text(row['spans'], span_id)) for column, span_id in fields}
+            for row in grid['rows'] if row['id']
+        ]
+
+    def extract_nested_tables(self, soup):
+        """{record key: rows} of every nested table in the parsed detail page"""
+        raise NotImplementedError
+
+    def extract_nested_tables_js(self, payload):
+        """extract_nested_tables() from the popup script payload, with the same row filters"""
+        raise NotImplementedError
+
+    def get_span_text(self, soup, id_contains):
+        """Helper to get text from span by partial ID match"""
+        span = soup.find('span', {'id': lambda x: x and id_contains in x})
+        return span.get_text() if span else None
+
+    def get_span_text_from_element(self, element, id_contains):
+        """Helper to get text from span within an element"""
+        span = element.find('span', {'id': lambda x: x and id_contains in x})
+        return span.get_text() if span else None
+
+    def apply_page_size(self, driver, quiet=False):
+        """Set the requested grid page size; rows_per_page follows whatever the server accepted (unless quiet)"""
+        if not self.page_size:
+            return
+        try:
+            if self.page_size == 'max':
+                paging = maximize_page_size(driver)
+            else:
+                paging = set_page_size(driver, self.page_size)
+        except TimeoutException:
+            paging = None
+        if quiet:
+            return
+        if not paging:
+            print(f"[Worker {self.worker_id}] Could not change page size, keeping {self.rows_per_page}")
+            return
+        if self.page_size != 'max' and paging[0] != self.page_size:
+            print(f"[Worker {self.worker_id}] WARNING: asked for {self.page_size} rows per page, server gave {paging[0]}")
+        self.rows_per_page = paging[0]
+
+    def get_total_pages(self, driver):
+        """Get total number of pages (for the page size in effect) from the grid or the pagination area"""
+        try:
+            paging = grid_paging(driver)
+            if paging:
+                return paging[1]
+        except:
+            pass
+        try:
+            paging_div = driver.find_element(By.CSS_SELECTOR, "div.rgWrap.rgInfoPart")
+            text = paging_div.text
+            import re
+            match = re.search(r'of\s+(\d+),', text)
+            if match:
+                return int(match.group(1))
+        except:
+            pass
+        try:
+            page_source = driver.page_source
+            import re
+            match = re.search(r'of\s+(\d+)\s*,\s*items', page_source)
+            if match:
+                return int(match.group(1))
+        except:
+            pass
+        return 1
+
+    def close_popup(self, driver):
+        """Close the detail popup"""
+        try:
+            main_window = driver.current_window_handle
+            # Our own tabs are not popups - never close them here
+            if len([h for h in driver.window_handles if h not in self.tab_handles]) > 1:
+                driver.close()
+                driver.switch_to.window(main_window)
+                time.sleep(0.5)
+                return
+
+            driver.switch_to.default_content()
+            time.sleep(0.5)
+
+            try:
+                close_btn = WebDriverWait(driver, 3).until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, "a.rwCloseButton, .rwCloseButton"))
+                )
+                close_btn.click()
+                time.sleep(0.5)
+            except:
+                try:
+                    close_btn = driver.find_element(By.XPATH, "//input[@value='ปิด']")
+                    close_btn.click()
+                    time.sleep(0.5)
+                except:
+                    try:
+                        driver.execute_script("""
+                            var radWindow = window.radopen ? window.radopen(null, null) : null;
+                            if (radWindow) radWindow.close();
+                        """)
+                        time.sleep(0.5)
+                    except:
+                        from selenium.webdriver.common.keys import Keys
+                        driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.ESCAPE)
+                        time.sleep(0.5)
+
+            time.sleep(1)
+        except:
+            try:
+                from selenium.webdriver.common.keys import Keys
+                driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.ESCAPE)
+                time.sleep(1)
+            except:
+                pass
+
+    def begin_record(self):
+        """Reset the phase timer, console notes and failure reason before a detail row"""
+        self.timer.reset()
+        self.record_notes = []
+        self.record_failure = None
+        self.record_error = None
+        self.record_error_class = None
+
+    def log_record(self, page_number, idx, grid_row, status, detail_data=None, error=None, error_class=None):
+        """Emit a row's record event, printed as one [W<worker>][<record>] line"""
+        row_num = idx + 1 + (page_number - 1) * self.rows_per_page
+        notes = ''.join(f"{note} " for note in self.record_notes)
+        timings = {key: value for key, value in (detail_data or {}).items() if key.startswith('_t_')}
+        self.events.emit(
+            'record', f"[W{self.worker_id}][{row_num}] {notes}{status}" + (f" [{error_class}]" if error_class else ''),
+            page=page_number, row=idx + 1, record_number=row_num, license_no=grid_row.get('license_no'),
+            status=status, notes=self.record_notes, timings=timings or None, error=error, error_class=error_class,
+        )
+
+    def log_failed_record(self, page_number, idx, grid_row):
+        """Count and log a row whose detail could not be loaded (record_failure/record_error say why)"""
+        self.metrics.inc('records_failed')
+        error = str(self.record_error)[:200] if self.record_error else None
+        status = self.record_failure or (f"ERR:{str(self.record_error)[:20]}" if error else 'FAILED')
+        self.log_record(page_number, idx, grid_row, status, error=error, error_class=self.record_error_class)
+
+    def extract_detail(self, in_popup=True):
+        """Run the configured extractor on the current detail document.
+
+        A detail without a single field filled is an error, not a record: SessionExpired/ServerError
+        on an error page, otherwise the extractor's exception or StructureError.
+        """
+        if self.extract_mode == 'js':
+            data = self.extract_popup_data_js(self.driver, in_popup=in_popup)
+        else:
+            data = self.extract_popup_data(self.driver, in_popup=in_popup)
+        if any(data.get(column) for column, _ in self.DETAIL_SPAN_FIELDS):
+            return data
+        raise_for_error_page(self.driver)
+        raise self.record_error or StructureError("detail fields missing")
+
+    def classify_failure(self, error):
+        """Error class of a failed attempt - an error page on screen makes any failure 'server' or 'session'"""
+        found = error_page(self.driver)
+        return found[0] if found else classify_error(error)
+
+    def retry_wait(self, error_class, attempt, what, error=None):
+        """Back off before retrying `what`; False once the class's attempts are used up"""
+        delay = self.retry_delay(error_class, attempt, what, error)
+        if delay is None:
+            return False
+        time.sleep(delay)
+        return True
+
+    def retry_delay(self, error_class, attempt, what, error=None):
+        """Seconds to back off before retrying `what` (a retry event is emitted), None once the class's
+        attempts are used up - the tab scheduler yields until the deadline instead of sleeping"""
+        if attempt >= self.retry.attempts(error_class):
+            return None
+        delay = self.retry.delay(error_class, attempt)
+        reason = str(error)[:50] if error else self.record_failure or 'no result'
+        self.events.emit('retry', f"[Worker {self.worker_id}] {what}: {error_class} error ({reason}) - "
+                         f"retry {attempt} in {delay:.1f}s",
+                         target=what, error_class=error_class, attempt=attempt, delay_s=round(delay, 2),
+                         error=str(error)[:200] if error else self.record_failure)
+        self.metrics.inc('retries')
+        return delay
+
+    def report_attempt(self, ok):
+        """Feed the shared circuit breaker with the outcome of a row or page attempt"""
+        if not self.breaker:
+            return
+        tripped = self.breaker.record(ok)
+        if tripped:
+            self.events.emit('circuit_open', f"[Worker {self.worker_id}] Error rate {tripped['error_rate']:.0%} over "
+                             f"{tripped['calls']} attempts - pausing all workers for {tripped['cooldown_s']:.0f}s",
+                             **tripped)
+
+    def wait_for_breaker(self):
+        """Pause while the shared breaker is open, with a breaker_wait event (heartbeat) every 30 s"""
+        if not self.breaker or self.breaker.open_for() <= 0:
+            return
+
+        def on_wait(remaining):
+            self.events.emit('breaker_wait', f"[Worker {self.worker_id}] Circuit open - waiting {remaining:.0f}s",
+                             remaining_s=round(remaining, 1))
+
+        self.metrics.inc('circuit_wait_seconds', round(self.breaker.wait(on_wait), 1))
+
+    def load_detail_in_popup(self, grid_row):
+        """Open a row's RadWindow popup, extract it and close it again (None if it didn't open)"""
+        with self.timer.phase('click'):
+            clicked = click_grid_row(self.driver, grid_row)
+        if not clicked:
+            self.record_failure = 'CLICK_FAIL'
+            return None
+
+        # Verify popup
+        try:
+            with self.timer.phase('popup_wait'):
+                time.sleep(3)
+                WebDriverWait(self.driver, 5).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, 'iframe[name="RadWindowManager"]'))
+                )
+        except TimeoutException:
+            self.record_failure = 'NO_POPUP'
+            raise_for_error_page(self.driver)
+            return None
+
+        detail_data = self.extract_detail()
+
+        # Close popup
+        with self.timer.phase('close'):
+            self.close_popup(self.driver)
+            time.sleep(1)
+        return detail_data
+
+    def open_detail_tab(self):
+        """Open the second tab used for detail pages; the grid stays in the current tab"""
+        self.grid_handle = self.driver.current_window_handle
+        self.driver.switch_to.new_window('tab')
+        self.detail_handle = self.driver.current_window_handle
+        self.tab_handles.add(self.detail_handle)
+        self.driver.switch_to.window(self.grid_handle)
+
+    def load_detail_in_tab(self, detail_url):
+        """Navigate the detail tab straight to a detail URL and extract it (None on timeout)"""
+        if not self.detail_handle or self.detail_handle not in self.driver.window_handles:
+            self.open_detail_tab()
+
+        self.driver.switch_to.window(self.detail_handle)
+        try:
+            try:
+                with self.timer.phase('navigate'):
+                    self.driver.get(detail_url)
+                    WebDriverWait(self.driver, 10).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, "span[id*='lblLicensesNo_1']"))
+                    )
+            except TimeoutException:
+                self.record_failure = 'NO_DETAIL'
+                raise_for_error_page(self.driver)
+                return None
+            return self.extract_detail(in_popup=False)
+        finally:
+            self.driver.switch_to.window(self.grid_handle)
+
+    def load_detail(self, grid_row, what):
+        """A row's detail under the retry policy - None once its error class is out of attempts
+        (record_failure/record_error/record_error_class then describe the last failure)"""
+        attempt = 0
+        while True:
+            attempt += 1
+            self.wait_for_breaker()
+            detail_data = self.attempt_detail(grid_row)
+            if detail_data is not None:
+                return detail_data
+            if not self.retry_wait(self.record_error_class, attempt, what, self.record_error):
+                return None
+
+    def attempt_detail(self, grid_row):
+        """One attempt at a row's detail; None on failure, with the grid (or a new session after a
+        session-expired page) restored and record_failure/record_error/record_error_class set"""
+        self.record_failure = self.record_error = None
+        try:
+            # Rows without a detail URL fall back to the popup even in tab mode
+            if self.detail_mode == 'tab' and grid_row['detail_url']:
+                detail_data = self.load_detail_in_tab(grid_row['detail_url'])
+            else:
+                detail_data = self.load_detail_in_popup(grid_row)
+        except Exception as e:
+            detail_data, self.record_error = None, e
+        if detail_data is not None:
+            self.report_attempt(True)
+            return detail_data
+
+        self.record_error_class = self.classify_failure(self.record_error)
+        try:
+            if self.record_error_class == 'session':
+                self.restore_session(self.current_page)
+            else:
+                self.restore_grid_context()
+        except:
+            pass
+        self.report_attempt(False)
+        return None
+
+    def open_page(self, page_number):
+        """go_to_page under the retry policy; the error class of the last failure, or None once the grid is up"""
+        attempt = 0
+        while True:
+            attempt += 1
+            self.wait_for_breaker()
+            error = None
+            try:
+                if self.go_to_page(page_number):
+                    self.report_attempt(True)
+                    return None
+                error = StructureError("list grid missing")
+            except Exception as e:
+                error = e
+            error_class = self.classify_failure(error)
+            self.report_attempt(False)
+            if error_class == 'session':
+                try:
+                    self.restore_session()
+                except Exception:
+                    pass
+            if not self.retry_wait(error_class, attempt, f"page {page_number}", error):
+                return error_class
+
+    def restore_grid_context(self):
+        """Get back to the grid after a failed row, whichever detail mode was in use"""
+        if self.detail_mode == 'tab' and self.grid_handle in self.driver.window_handles:
+            self.driver.switch_to.window(self.grid_handle)
+        else:
+            self.close_popup(self.driver)
+
+    def restore_session(self, page_number=None):
+        """After a session-expired page: load the list grid again (a new session), back on page_number"""
+        self.restore_grid_context()
+        if not self.navigate_to_url(self.driver):
+            return False
+        return not page_number or page_number == 1 or self.go_to_page(page_number)
+
+    def go_to_page(self, page_number):
+        """Put the grid on page_number - RadGrid client-API jump, paging textbox as fallback"""
+        self.current_page = None
+        # A fresh driver (or one left on a detail page) needs the grid loaded first
+        if not self.driver.find_elements(By.ID, LIST_GRID_TABLE_ID):
+            if not self.navigate_to_url(self.driver):
+                return False
+
+        try:
+            if jump_to_page(self.driver, page_number):
+                self.current_page = page_number
+                return True
+        except TimeoutException:
+            print(f"[Worker {self.worker_id}] Page jump to {page_number} timed out, using paging box")
+
+        if page_number == 1:
+            if not self.navigate_to_url(self.driver):
+                return False
+            self.current_page = 1
+            return True
+
+        try:
+            page_input = WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "input[id*='RadGridPagingTemplate2_RadNumericTextBox1']"))
+            )
+        except:
+            page_input = WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "input.rgPageText, input[type='text'][title*='page']"))
+            )
+        page_input.clear()
+        page_input.send_keys(str(page_number))
+        from selenium.webdriver.common.keys import Keys
+        page_input.send_keys(Keys.ENTER)
+        time.sleep(3)
+
+        WebDriverWait(self.driver, 10).until(
+            EC.presence_of_element_located((By.ID, LIST_GRID_TABLE_ID))
+        )
+        time.sleep(2)
+        self.current_page = page_number
+        return True
+
+    def scrape_summary(self, max_pages=None):
+        """Summary mode: harvest the list grid of every page without opening any popup"""
+        if not self.go_to_page(1):
+            print(f"[Worker {self.worker_id}] Failed to load the list grid")
+            return []
+
+        total_pages = self.get_total_pages(self.driver)
+        if max_pages:
+            total_pages = min(total_pages, max_pages)
+
+        summary = []
+        for page_number in range(1, total_pages + 1):
+            # One bad page must not cost the pages already harvested
+            try:
+                if not self.go_to_page(page_number):
+                    print(f"[Worker {self.worker_id}] Failed to navigate to page {page_number}")
+                    continue
+                grid_rows = harvest_grid_rows(self.driver)
+            except Exception as e:
+                self.events.emit('page_failed', f"[Worker {self.worker_id}] Summary page {page_number} error: {str(e)[:60]}",
+                                 page=page_number, error=str(e)[:200], error_class=self.classify_failure(e))
+                continue
+
+            for idx, grid_row in enumerate(grid_rows):
+                record = summary_record(grid_row)
+                record['_page_number'] = page_number
+                record['_row_on_page'] = idx + 1
+                summary.append(record)
+            print(f"[Worker {self.worker_id}] Summary page {page_number}/{total_pages}: {len(grid_rows)} rows")
+
+        return summary
+
+    def scrape_page(self, page_number, first_row=0):
+        """Scrape all detail popups from a single page (from row index first_row on)"""
+        print(f"\n[Worker {self.worker_id}] Page {page_number}")
+        print(f"{'='*60}")
+
+        page_data = []
+        self.last_page_rows = None
+        self.resume_row = None
+
+        try:
+            # Navigate to page
+            nav_start = time.perf_counter()
+            error_class = self.open_page(page_number)
+            if error_class:
+                self.events.emit('page_failed', f"[Worker {self.worker_id}] Failed to navigate to page {page_number} "
+                                 f"[{error_class}]", page=page_number, error='navigation', error_class=error_class)
+                self.metrics.inc('pages_failed')
+                return []
+
+            # Harvest every row's identifiers in one call - rows are then clicked by id,
+            # so there are no element handles to go stale between popups
+            grid_rows = harvest_grid_rows(self.driver)
+            total_buttons = len(grid_rows)
+            self.last_page_rows = total_buttons
+
+            self.events.emit('page_start', f"[Worker {self.worker_id}] Found {total_buttons} records on page {page_number}",
+                             page=page_number, rows=total_buttons)
+
+            # The page load is shared equally by the rows it serves
+            nav_share = (time.perf_counter() - nav_start) / max(total_buttons, 1)
+
+            # Unchanged since the last run - reuse the stored records instead of opening popups
+            grid_hash = page_hash(grid_rows) if self.page_cache else None
+            if self.page_cache and not first_row:
+                cached = self.page_cache.lookup(page_number, grid_hash)
+                if cached is not None:
+                    self.pages_reused += 1
+                    self.metrics.inc('pages_reused')
+                    self.metrics.inc('pages_completed')
+                    self.events.emit('page_done', f"[Worker {self.worker_id}] Page {page_number} unchanged - "
+                                     f"reusing {len(cached)} stored records",
+                                     page=page_number, records=len(cached), reused=True)
+                    return cached
+
+            for idx, grid_row in enumerate(grid_rows):
+                if idx < first_row:
+                    continue
+                if self.watchdog:
+                    try:
+                        recycled = self.recycle_driver(page_number, idx)
+                    except Exception:
+                        recycled = False
+                    if not recycled:
+                        self.events.emit('page_failed', f"[Worker {self.worker_id}] Page {page_number} stopped at row "
+                                         f"{idx + 1}: browser could not be recycled", page=page_number,
+                                         error='recycle', row=idx + 1, records=len(page_data))
+                        self.metrics.inc('pages_failed')
+                        self.metrics.flush(force=True)
+                        # The rows so far are kept; the caller resumes at this row on a new browser
+                        self.resume_row = idx
+                        return page_data
+
+                try:
+                    row_num = idx + 1 + (page_number - 1) * self.rows_per_page
+
+                    self.begin_record()
+                    self.timer.add('navigate', nav_share)
+
+                    detail_data = self.load_detail(grid_row, f"row {row_num}")
+                    if detail_data is None:
+                        self.log_failed_record(page_number, idx, grid_row)
+                        continue
+
+                    detail_data['_record_number'] = row_num
+                    detail_data['_page_number'] = page_number
+                    detail_data['_row_on_page'] = idx + 1
+                    detail_data['_worker_id'] = self.worker_id
+                    self.timer.annotate(detail_data)
+                    self.metrics.observe_record(detail_data)
+                    self.metrics.flush()
+
+                    page_data.append(detail_data)
+                    self.log_record(page_number, idx, grid_row, 'OK', detail_data)
+
+                except Exception as e:
+                    self.metrics.inc('records_failed')
+                    self.log_record(page_number, idx, grid_row, f"ERR:{str(e)[:20]}", error=str(e)[:200])
+                    try:
+                        self.restore_grid_context()
+                    except:
+                        pass
+                    continue
+
+            failed_rows = len(grid_rows) - first_row - len(page_data)
+            if failed_rows:
+                # Rows out of retries - page_failed lets the supervisor / coordinator schedule the page again
+                self.events.emit('page_failed', f"[Worker {self.worker_id}] Page {page_number} incomplete: "
+                                 f"{len(page_data)} records, {failed_rows} rows failed",
+                                 page=page_number, error='rows', records=len(page_data), failed_rows=failed_rows)
+                self.metrics.inc('pages_failed')
+            else:
+                self.events.emit('page_done', f"[Worker {self.worker_id}] Page {page_number} complete: "
+                                 f"{len(page_data)} records", page=page_number, records=len(page_data), reused=False)
+                self.metrics.inc('pages_completed')
+            self.metrics.set('chrome_rss_bytes', chrome_tree_rss(self.driver))
+
+            # Only a complete page may vouch for its grid hash
+            if self.page_cache and grid_rows and not first_row and len(page_data) == len(grid_rows):
+                self.page_cache.store(page_number, grid_hash, page_data)
+
+        except Exception as e:
+            self.events.emit('page_failed', f"[Worker {self.worker_id}] Page {page_number} error: {e}",
+                             page=page_number, error=str(e)[:200])
+            self.metrics.inc('pages_failed')
+
+        self.metrics.flush(force=True)
+        return page_data
+
+
+# ============================================================
+# PARALLEL WORKER WITH PIPELINED DRIVER START-UP
+# ============================================================
+
+def worker_process(args):
+    """Worker process (or thread): start a browser, then scrape pages from the queue.
+
+    Browsers start concurrently, at most as many at a time as the startup semaphore allows;
+    a worker is ready as soon as its grid is present. With spare_driver a second browser warms
+    in the background once the worker is ready and replaces a crashed one without waiting.
+
+    Completed records are packed with the scraper class's RECORD_SCHEMA and pushed to the result
+    sink as each page finishes; only the record count is returned through pool.map.
+    The same function runs as a Pool process or as a ThreadPoolExecutor thread -
+    page_queue/result_queue are Manager queues in process mode and queue.Queue in thread mode.
+    """
+    scraper_class, worker_id, page_queue, result_queue, startup, breaker, scraper_options = args
+    schema = scraper_class.RECORD_SCHEMA
+
+    print(f"\n[Worker {worker_id}] Initializing...")
+
+    scraper = scraper_class(worker_id=worker_id, breaker=breaker, **scraper_options)
+
+    try:
+        # Only a bounded number of Chromes launch at once; the slot is held until the grid is up
+        with startup:
+            start_time = time.time()
+            launched = scraper.launch_ready_driver()
+        if not launched:
+            print(f"[Worker {worker_id}] Failed to start a browser on the list grid")
+            return 0
+        scraper.adopt_driver(launched)
+
+        scraper.events.emit('worker_ready', f"[Worker {worker_id}] Ready to scrape! "
+                            f"({time.time() - start_time:.1f}s start-up)", startup_s=round(time.time() - start_time, 2))
+        if scraper.spare:
+            scraper.spare.gate = startup
+            scraper.spare.prepare()
+
+        records_sent = 0
+
+        if scraper.tabs > 1:
+            # One browser, several tabs each working through its own page
+            def send(record):
+                nonlocal records_sent
+                result_queue.put(schema.pack(record))
+                records_sent += 1
+
+            tab_state = TabSchedulerState()
+            while True:
+                run_tab_scheduler(scraper, page_queue, scraper.tabs, send, state=tab_state)
+                if not tab_state.browser_died:
+                    break
+                # Browser crashed - swap in the spare; pages that were in flight carry over in tab_state
+                if not scraper.replace_driver():
+                    print(f"[Worker {worker_id}] Could not replace the crashed browser "
+                          f"({len(tab_state.retry_pages)} pages not retried)")
+                    break
+        else:
+            # Process pages from queue
+            while True:
+                try:
+                    page_num = page_queue.get(timeout=1)
+                    if page_num is None:  # Poison pill
+                        break
+                    try:
+                        scraper.metrics.set('page_queue_depth', page_queue.qsize())
+                    except NotImplementedError:
+                        pass
+
+                    page_data = scraper.scrape_page(page_num)
+                    browser_lost = False
+                    if scraper.resume_row is not None or (not page_data and not driver_alive(scraper.driver)):
+                        # Recycle failed or browser crashed - swap in the spare and finish the page on it,
+                        # from the row it stopped at
+                        first_row = scraper.resume_row or 0
+                        if scraper.replace_driver():
+                            page_data += scraper.scrape_page(page_num, first_row=first_row)
+                        else:
+                            print(f"[Worker {worker_id}] Could not replace the browser "
+                                  f"(page {page_num} stopped at row {first_row + 1})")
+                            browser_lost = True
+                    for record in page_data:
+                        result_queue.put(schema.pack(record))
+                    records_sent += len(page_data)
+                    if browser_lost:
+                        break
+
+                except queue.Empty:
+                    break
+                except Exception as e:
+                    print(f"[Worker {worker_id}] Error processing page: {e}")
+                    continue
+
+        if scraper.page_cache:
+            print(f"[Worker {worker_id}] Reused {scraper.pages_reused} unchanged pages from the cache")
+        scraper.events.emit('worker_finish', f"[Worker {worker_id}] Finished! Extracted {records_sent} total records",
+                            records=records_sent)
+        return records_sent
+
+    except Exception as e:
+        print(f"[Worker {worker_id}] Fatal error: {e}")
+        return 0
+    finally:
+        scraper.metrics.flush(force=True)
+        scraper.events.close()
+        if scraper.spare:
+            scraper.spare.close()
+        scraper.close_driver()
+
+
+def save_data_to_files(scraper_class, all_data, filename_prefix):
+    """Save flattened data to Excel and CSV (all_data may be any iterable of records)
+
+    Rows of the class's NESTED_TABLES become numbered <prefix>_<n>_<column> columns.
+    """
+    nested_keys = [key for key, _ in scraper_class.NESTED_TABLES]
+    sheet_name = f"{scraper_class.LICENSE_TYPE} Licenses"
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    excel_file = f"{filename_prefix}_{timestamp}.xlsx"
+    csv_file = f"{filename_prefix}_{timestamp}.csv"
+
+    # Flatten nested data
+    flattened_data = []
+    for record in all_data:
+        flat_record = {}
+
+        for key, value in record.items():
+            if key not in nested_keys:
+                flat_record[key] = value
+
+        for key, prefix in scraper_class.NESTED_TABLES:
+            for i, row in enumerate(record.get(key, []), 1):
+                for k, v in row.items():
+                    flat_record[f'{prefix}_{i}_{k}'] = v
+
+        flattened_data.append(flat_record)
+
+    if not flattened_data:
+        print("No data to save!")
+        return
+
+    print(f"\n[SAVE] Saving {len(flattened_data)} records...")
+
+    df = pd.DataFrame(flattened_data)
+
+    if '_record_number' in df.columns:
+        df = df.sort_values('_record_number')
+
+    with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name=sheet_name, index=False)
+        worksheet = writer.sheets[sheet_name]
+
+        for column in worksheet.columns:
+            max_length = 0
+            column_letter = column[0].column_letter
+            for cell in column:
+                try:
+                    if len(str(cell.value)) > max_length:
+                        max_length = len(str(cell.value))
+                except:
+                    pass
+            adjusted_width = min(max_length + 2, 50)
+            worksheet.column_dimensions[column_letter].width = adjusted_width
+
+    df.to_csv(csv_file, index=False, encoding='utf-8-sig')
+
+    print(f"[OK] Excel: {excel_file}")
+    print(f"[OK] CSV: {csv_file}")
+    print(f"     Records: {len(df)}, Columns: {len(df.columns)}")
+
+
+def save_summary_to_files(summary, filename_prefix):
+    """Save list-grid summary records to Excel and CSV with numeric columns typed"""
+    if not summary:
+        print("No summary rows to save!")
+        return
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    excel_file = f"{filename_prefix}_{timestamp}.xlsx"
+    csv_file = f"{filename_prefix}_{timestamp}.csv"
+
+    df = pd.DataFrame(summary)
+    for column in LIST_GRID_NUMERIC_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column].astype(str).str.replace(',', '', regex=False), errors='coerce')
+    if 'ลำดับ' in df.columns:
+        df['ลำดับ'] = df['ลำดับ'].astype('Int64')
+
+    with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='Summary', index=False)
+        worksheet = writer.sheets['Summary']
+        for column in worksheet.columns:
+            max_length = max(len(str(cell.value)) for cell in column if cell.value is not None)
+            worksheet.column_dimensions[column[0].column_letter].width = min(max_length + 2, 50)
+
+    df.to_csv(csv_file, index=False, encoding='utf-8-sig')
+
+    print(f"[OK] Excel: {excel_file}")
+    print(f"[OK] CSV: {csv_file}")
+    print(f"     Rows: {len(df)}, Columns: {len(df.columns)}")
+
+
+def run_summary(scraper_class, scraper_options):
+    """Summary mode: one browser walks the list grid of every page, no popups"""
+    scraper = scraper_class(worker_id=0, **scraper_options)
+    start_time = time.time()
+    scraper.driver = scraper.create_driver()
+    if not scraper.driver:
+        print("[ERROR] Failed to create driver")
+        return
+
+    try:
+        summary = scraper.scrape_summary()
+    finally:
+        scraper.close_driver()
+
+    print(f"\n[COMPLETE] {len(summary)} licenses in {time.time() - start_time:.1f}s")
+    save_summary_to_files(summary, f"{scraper_class.OUTPUT_PREFIX}_SUMMARY")
+
+
+def page_size_arg(value):
+    """--page-size value: a row count or 'max'"""
+    return value if value == 'max' else int(value)
+
+
+def page_list_arg(value):
+    """--pages value: comma-separated pages and ranges, e.g. '1-33' or '3-5,9,12-14'"""
+    pages = set()
+    try:
+        for part in value.split(','):
+            first, _, last = part.strip().partition('-')
+            pages.update(range(int(first), int(last or first) + 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected pages like 1-33 or 3-5,9, got {value!r}")
+    if not pages or min(pages) < 1:
+        raise argparse.ArgumentTypeError(f"no valid pages in {value!r}")
+    return sorted(pages)
+
+
+def format_page_list(pages):
+    """Inverse of page_list_arg: [1, 2, 3, 7] -> '1-3,7'"""
+    ranges = []
+    for page in sorted(pages):
+        if ranges and page == ranges[-1][1] + 1:
+            ranges[-1][1] = page
+        else:
+            ranges.append([page, page])
+    return ','.join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+
+def detect_total_pages(scraper_class, scraper_options):
+    """(total pages, rows per page in effect) from a throwaway browser, or None if the grid didn't load"""
+    temp_scraper = scraper_class(worker_id=999, **scraper_options)
+    # Warm the template profile once so every worker starts with a cached portal
+    temp_scraper.profile_manager.warm_template(temp_scraper.base_url, temp_scraper.driver_profile)
+    temp_scraper.driver = temp_scraper.create_driver()
+
+    try:
+        if not temp_scraper.navigate_to_url(temp_scraper.driver):
+            return None
+        return temp_scraper.get_total_pages(temp_scraper.driver), temp_scraper.rows_per_page
+    finally:
+        temp_scraper.close_driver()
+
+
+def parse_args(scraper_class, argv=None):
+    """Command line options for the parallel scraper of scraper_class's license type"""
+    output_prefix = scraper_class.OUTPUT_PREFIX
+    parser = argparse.ArgumentParser(description=f"ERC {scraper_class.LICENSE_TYPE} License Scraper - PARALLEL V2")
+    parser.add_argument('--workers', type=int, default=4, help="Number of concurrent browsers")
+    parser.add_argument('--summary', action='store_true',
+                        help="Only export the list grid of every page (no popups) - "
+                             "combine with --page-size max for the fastest inventory")
+    parser.add_argument('--mode', choices=['process', 'thread'], default='process',
+                        help="'process': one multiprocessing.Pool worker per browser; "
+                             "'thread': one thread per browser inside this process")
+    parser.add_argument('--driver-profile', choices=DRIVER_PROFILES, default='default',
+                        help="Chrome profile: 'default' (visible browser) or 'fast' "
+                             "(headless, eager load, static assets blocked)")
+    parser.add_argument('--extract', choices=['html', 'js'], default='html',
+                        help="Popup extraction: 'html' (page_source + BeautifulSoup) or "
+                             "'js' (one in-browser script returning compact JSON)")
+    parser.add_argument('--detail-mode', choices=['popup', 'tab'], default='popup',
+                        help="Detail loading: 'popup' (click row, RadWindow) or "
+                             "'tab' (second tab navigates straight to each detail URL)")
+    parser.add_argument('--tabs', type=int, default=1,
+                        help="Tabs per browser; with more than 1, each tab scrapes its own page and "
+                             "the browser's page loads overlap (see erc_tabs)")
+    parser.add_argument('--page-size', type=page_size_arg, default=None,
+                        help="Grid rows per page: a number, or 'max' for the largest the server accepts "
+                             f"(default: the portal's {DEFAULT_PAGE_SIZE})")
+    parser.add_argument('--cache-dir', default=None,
+                        help="Page-hash cache for repeat runs: pages whose list grid is unchanged reuse "
+                             f"the stored records (e.g. {output_prefix}_cache)")
+    parser.add_argument('--portal-url', default=None,
+                        help=f"Portal to scrape (default: {PORTAL_URL}; e.g. http://127.0.0.1:8765 for erc_mock_portal)")
+    parser.add_argument('--fault-profile', choices=list(FAULT_PROFILES), default=None,
+                        help="Inject WebDriver-level faults (slow commands, dropped popups, crashes) "
+                             "from an erc_faults profile - for load tests against erc_mock_portal")
+    parser.add_argument('--metrics-dir', default=None,
+                        help="Write per-worker Prometheus textfiles here (node-exporter textfile collector)")
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help="Serve the workers' metrics on http://127.0.0.1:PORT/metrics "
+                             f"(textfiles go to --metrics-dir, default {output_prefix}_metrics)")
+    parser.add_argument('--pages', type=page_list_arg, default=None,
+                        help="Only scrape these pages, e.g. 1-33 or 3-5,9 (skips page detection; "
+                             "see scripts/supervise_workers.py)")
+    parser.add_argument('--output', default=None,
+                        help=f"Records file to stream to (default: {output_prefix}_<timestamp>.jsonl)")
+    parser.add_argument('--no-export', action='store_true',
+                        help="Leave the records in the streamed JSONL file (no Excel/CSV/timings export)")
+    parser.add_argument('--events-dir', default=None,
+                        help="Directory for the per-worker JSONL event logs "
+                             "(default: <output file>_events next to the streamed records)")
+    parser.add_argument('--startup-concurrency', type=int, default=2,
+                        help="Browsers allowed to launch at the same time (the rest queue until a grid is up)")
+    parser.add_argument('--spare-driver', action='store_true',
+                        help="Keep a second warm browser per worker to replace a crashed one immediately "
+                             "(doubles Chrome memory)")
+    parser.add_argument('--recycle-rss-mb', type=int, default=None,
+                        help="Replace a worker's browser between rows once its Chrome processes use more "
+                             "than this many MB (needs psutil)")
+    parser.add_argument('--recycle-every', type=int, default=None,
+                        help="Replace a worker's browser after this many rows")
+    parser.add_argument('--max-error-rate', type=float, default=0.5,
+                        help="Pause every worker when this share of row/page attempts fails within a minute "
+                             "(circuit breaker, see erc_retry)")
+    parser.add_argument('--breaker-cooldown', type=float, default=60,
+                        help="Seconds the workers pause when the breaker trips (doubles while errors persist)")
+    parser.add_argument('--profile-root', default=None,
+                        help="Directory for per-worker Chrome user-data-dirs "
+                             "(default: /dev/shm/erc_chrome_profiles, or the temp dir)")
+    return parser.parse_args(argv)
+
+
+def drain_queue(task_queue):
+    """Discard every page still waiting in task_queue"""
+    while True:
+        try:
+            task_queue.get_nowait()
+        except queue.Empty:
+            return
+
+
+def exit_on_sigterm(signum, frame):
+    """SIGTERM handler: unwind like Ctrl+C so workers quit their browsers and profiles are removed"""
+    raise SystemExit(128 + signum)
+
+
+def run_workers(scraper_class, pages, num_workers, mode, scraper_options, sink_file, startup_concurrency=2,
+                breaker_options=None):
+    """Scrape pages with num_workers scraper_class browsers and stream records to sink_file; returns the record count
+
+    breaker_options: CircuitBreaker settings (see erc_retry) for the breaker all workers share
+    """
+    manager = None
+    if mode == 'thread':
+        # Each thread owns a WebDriver; queues and sink live in this process
+        task_queue = queue.Queue()
+        startup = threading.BoundedSemaphore(startup_concurrency)
+        breaker = create_breaker(**(breaker_options or {}))
+        result_queue, sink_writer = start_thread_sink(sink_file, schema=scraper_class.RECORD_SCHEMA)
+    else:
+        manager = Manager()
+        task_queue = manager.Queue()
+        startup = manager.BoundedSemaphore(startup_concurrency)
+        breaker = create_breaker(manager, **(breaker_options or {}))
+        result_queue, sink_writer = start_result_sink(manager, sink_file, schema=scraper_class.RECORD_SCHEMA)
+
+    # Fill queue with page numbers
+    for page_num in pages:
+        task_queue.put(page_num)
+
+    # Add poison pills
+    for _ in range(num_workers):
+        task_queue.put(None)
+
+    # Every worker starts at once; the semaphore bounds how many Chromes launch concurrently
+    worker_args = [(scraper_class, i, task_queue, result_queue, startup, breaker, scraper_options)
+                   for i in range(num_workers)]
+
+    try:
+        if mode == 'thread':
+            pool = ThreadPoolExecutor(max_workers=num_workers)
+            try:
+                results = list(pool.map(worker_process, worker_args))
+            except BaseException:
+                # Interrupted (Ctrl+C or SIGTERM) - threads can't be killed, so stop handing out
+                # pages; each worker finishes its current page and quits its browser
+                drain_queue(task_queue)
+                for _ in range(num_workers):
+                    task_queue.put(None)
+                raise
+            finally:
+                pool.shutdown(wait=True)
+        else:
+            with Pool(processes=num_workers) as pool:
+                results = pool.map(worker_process, worker_args)
+    finally:
+        stop_result_sink(result_queue, sink_writer)
+        if manager:
+            manager.shutdown()
+
+    return sum(results)
+
+
+def main(scraper_class, argv=None):
+    """Main execution with pipelined worker start-up"""
+    output_prefix = scraper_class.OUTPUT_PREFIX
+    args = parse_args(scraper_class, argv)
+    # The supervisor stops stalled workers with SIGTERM; pool processes inherit the handler
+    signal.signal(signal.SIGTERM, exit_on_sigterm)
+    scraper_options = {
+        'driver_profile': args.driver_profile,
+        'profile_root': args.profile_root,
+        'extract_mode': args.extract,
+        'detail_mode': args.detail_mode,
+        'tabs': args.tabs,
+        'page_size': args.page_size,
+        'cache_dir': args.cache_dir,
+        'portal_url': args.portal_url,
+        'fault_profile': args.fault_profile,
+        'metrics_dir': args.metrics_dir,
+        'spare_driver': args.spare_driver,
+        'recycle_rss_mb': args.recycle_rss_mb,
+        'recycle_every': args.recycle_every,
+    }
+    if args.metrics_port and not args.metrics_dir:
+        scraper_options['metrics_dir'] = f"{output_prefix}_metrics"
+
+    if args.summary:
+        print("\n[SUMMARY] List-grid summary mode (no popups)")
+        run_summary(scraper_class, scraper_options)
+        return
+
+    print("\n" + "="*70)
+    print(f"  ERC {scraper_class.LICENSE_TYPE} License Scraper - PARALLEL V2")
+    print(f"  Pipelined Start-up ({args.workers} Workers, {args.mode} mode)")
+    print("="*70)
+
+    if args.pages and args.page_size != 'max':
+        # An explicit page list (e.g. from the supervisor) needs no detection browser
+        pages = args.pages
+        rows_per_page = args.page_size or DEFAULT_PAGE_SIZE
+    else:
+        print("\n[INIT] Detecting total pages...")
+        detected = detect_total_pages(scraper_class, scraper_options)
+        if not detected:
+            print("[ERROR] Could not detect total pages")
+            return
+        total_pages, rows_per_page = detected
+        pages = [page for page in args.pages if page <= total_pages] if args.pages else list(range(1, total_pages + 1))
+        # Workers use the size the server actually accepted, so pages partition the same way
+        if args.page_size:
+            scraper_options['page_size'] = rows_per_page
+    total_pages = len(pages)
+
+    print(f"[INFO] Pages: {format_page_list(pages)} ({rows_per_page} rows per page)")
+    print(f"[INFO] Workers: {args.workers} {args.mode}s (up to {args.startup_concurrency} starting at once"
+          f"{', spare driver each' if args.spare_driver else ''})")
+    print(f"[INFO] Driver profile: {args.driver_profile}, extraction: {args.extract}, details: {args.detail_mode}")
+    if args.tabs > 1:
+        print(f"[INFO] Tabs per browser: {args.tabs}")
+    print()
+
+    # Records are streamed to disk by the result sink as they complete
+    sink_file = args.output or f"{output_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    print(f"[INFO] Streaming records to: {sink_file}")
+    scraper_options['events_dir'] = args.events_dir or f"{os.path.splitext(sink_file)[0]}_events"
+    print(f"[INFO] Worker event logs: {scraper_options['events_dir']}")
+
+    # Totals for monitors (scripts/monitor_progress.py) - workers report actual rows per page
+    run_events = EventLog('main', scraper_options['events_dir'])
+    run_events.emit('run_start', total_pages=total_pages, first_page=pages[0], last_page=pages[-1],
+                    rows_per_page=rows_per_page, workers=args.workers, sink_file=sink_file)
+
+    metrics_server = None
+    if args.metrics_port:
+        metrics_server = start_metrics_server(scraper_options['metrics_dir'], args.metrics_port)
+
+    start_time = time.time()
+
+    print(f"[START] Beginning parallel scrape at {datetime.now().strftime('%H:%M:%S')}")
+    print("="*70)
+
+    try:
+        total_records = run_workers(scraper_class, pages, args.workers, args.mode, scraper_options, sink_file,
+                                    args.startup_concurrency, {'max_error_rate': args.max_error_rate,
+                                                               'cooldown_s': args.breaker_cooldown})
+    finally:
+        if metrics_server:
+            metrics_server.shutdown()
+
+    elapsed_time = time.time() - start_time
+    run_events.emit('run_finish', records=total_records, elapsed_s=round(elapsed_time, 1))
+    run_events.close()
+
+    print("\n" + "="*70)
+    print(f"[COMPLETE] Scraping finished!")
+    print(f"  Total records: {total_records}")
+    print(f"  Total time: {elapsed_time/60:.2f} minutes")
+    print(f"  Average: {elapsed_time/total_pages:.1f}s per page")
+    print("="*70)
+
+    if args.no_export:
+        print(f"\n[OK] Records left in {sink_file}")
+    elif total_records:
+        save_data_to_files(scraper_class, load_records(sink_file), output_prefix)
+        save_timing_summary(load_records(sink_file), output_prefix)
+        print("\n[SUCCESS] All data saved successfully!")
+    else:
+        print("\n[WARNING] No data extracted!")
+
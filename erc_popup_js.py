@@ -0,0 +1,78 @@
+"""
+ERC In-Browser Popup Extraction
+One script, run inside the detail popup, that returns every span[id] text and
+the rows of every RadGrid table as compact JSON - instead of shipping the whole
+page_source (with __VIEWSTATE) across the WebDriver wire and re-parsing it
+"""
+
+import json
+
+
+# Returns JSON: {"spans": [[id, text], ...],
+#                "grids": [{"id": ..., "master": bool,
+#                           "rows": [{"id": ..., "text": ..., "cells": [...], "spans": [[id, text], ...]}]}]}
+# Spans keep document order so partial-id lookups pick the same span as soup.find().
+POPUP_EXTRACT_SCRIPT = r"""
+function spanPairs(root) {
+    var out = [];
+    var spans = root.querySelectorAll('span[id]');
+    for (var i = 0; i < spans.length; i++) {
+        out.push([spans[i].id, spans[i].textContent]);
+    }
+    return out;
+}
+
+var result = {spans: spanPairs(document), grids: []};
+var tables = document.querySelectorAll('table');
+for (var t = 0; t < tables.length; t++) {
+    var table = tables[t];
+    var master = (' ' + table.className + ' ').indexOf(' rgMasterTable ') >= 0;
+    if (!master && (table.id || '').indexOf('RadGrid') < 0) {
+        continue;
+    }
+
+    var grid = {id: table.id || '', master: master, rows: []};
+    var tbody = null;
+    for (var c = 0; c < table.children.length; c++) {
+        if (table.children[c].tagName === 'TBODY') { tbody = table.children[c]; break; }
+    }
+    if (tbody) {
+        var rows = tbody.querySelectorAll('tr');
+        for (var r = 0; r < rows.length; r++) {
+            var cells = rows[r].querySelectorAll('td');
+            var cellText = [];
+            for (var k = 0; k < cells.length; k++) { cellText.push(cells[k].textContent); }
+            grid.rows.push({id: rows[r].id || '', text: rows[r].textContent,
+                            cells: cellText, spans: spanPairs(rows[r])});
+        }
+    }
+    result.grids.push(grid);
+}
+return JSON.stringify(result);
+"""
+
+
+def run_popup_extract(driver):
+    """Run the extraction script in the current browsing context and decode the result"""
+    return json.loads(driver.execute_script(POPUP_EXTRACT_SCRIPT))
+
+
+def first_span_text(span_pairs, id_contains):
+    """Text of the first span whose id contains id_contains (same rule as get_span_text)"""
+    for span_id, text in span_pairs:
+        if id_contains in span_id:
+            return text
+    return None
+
+
+def find_grid(payload, id_contains):
+    """First grid table whose id contains id_contains, or None"""
+    for grid in payload['grids']:
+        if id_contains in grid['id']:
+            return grid
+    return None
+
+
+def master_grids(payload):
+    """All rgMasterTable grids in document order (for grids located by position)"""
+    return [grid for grid in payload['grids'] if grid['master']]
@@ -0,0 +1,249 @@
+"""
+ERC RadGrid Client Helpers
+In-browser helpers for the Telerik RadGrid on 504_ListLicensing_Columns_New.aspx:
+harvest every row's identifiers in one call, click detail buttons by id, and
+jump to any page / change the page size through the grid's client-side API
+"""
+
+import json
+import re
+from urllib.parse import urljoin
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+# Portal host and list page path - point PORTAL_URL elsewhere for a local stand-in (see erc_mock_portal)
+PORTAL_URL = "http://app04.erc.or.th"
+LIST_PAGE_PATH = "/ELicense/Licenser/05_Reporting/504_ListLicensing_Columns_New.aspx"
+
+# Client component and master table of the licence list grid
+LIST_GRID_CLIENT_ID = "ctl00_MasterContentPlaceHolder_RadGrid"
+LIST_GRID_TABLE_ID = "ctl00_MasterContentPlaceHolder_RadGrid_ctl00"
+
+# Rows per page the portal renders unless told otherwise
+DEFAULT_PAGE_SIZE = 15
+
+# Page sizes tried, largest first, when asking for the biggest page the server accepts
+PAGE_SIZE_CANDIDATES = (500, 250, 100, 50)
+
+# Cells of a 13-cell list-grid row (cell 0 holds the detail button)
+LIST_GRID_COLUMNS = [
+    '_detail',
+    'ลำดับ',
+    'ชื่อผู้รับใบอนุญาต',
+    'ชื่อสถานประกอบกิจการ',
+    'จังหวัด',
+    'สำนักงานประจำเขต',
+    'เลขทะเบียนใบอนุญาต',
+    'วันที่ออกใบอนุญาต',
+    'ชนิดเชื้อเพลิงหลัก',
+    'ชนิดเชื้อเพลิงเสริม',
+    'กำลังผลิต_MW',
+    'กำลังผลิต_kVA',
+    'วันที่_COD',
+]
+LICENSE_NO_CELL = LIST_GRID_COLUMNS.index('เลขทะเบียนใบอนุญาต')
+
+# List-grid columns converted to numbers in summary exports
+LIST_GRID_NUMERIC_COLUMNS = ['ลำดับ', 'กำลังผลิต_MW', 'กำลังผลิต_kVA']
+
+# Returns JSON: [{"button_id", "button_name", "onclick", "href", "cells": [...]}, ...]
+# for every data row of the grid that has a detail (icon_view) button.
+GRID_ROWS_SCRIPT = r"""
+var table = document.getElementById(arguments[0]);
+var rows = [];
+if (!table) { return JSON.stringify(rows); }
+var tbody = table.tBodies.length ? table.tBodies[0] : null;
+if (!tbody) { return JSON.stringify(rows); }
+for (var r = 0; r < tbody.rows.length; r++) {
+    var tr = tbody.rows[r];
+    var button = tr.querySelector("input[type='image'][src*='icon_view']");
+    if (!button) { continue; }
+    var link = tr.querySelector("a[href*='644_Licensing'], a[href*='LicensingDetail']");
+    var cells = [];
+    for (var c = 0; c < tr.cells.length; c++) { cells.push(tr.cells[c].textContent); }
+    rows.push({button_id: button.id || '', button_name: button.name || '',
+               onclick: button.getAttribute('onclick') || '',
+               href: link ? link.href : '', cells: cells});
+}
+return JSON.stringify(rows);
+"""
+
+CLICK_BUTTON_SCRIPT = r"""
+var el = arguments[0] ? document.getElementById(arguments[0]) : null;
+if (!el && arguments[1]) { el = document.getElementsByName(arguments[1])[0]; }
+if (!el) { return false; }
+el.click();
+return true;
+"""
+
+# Marks the next grid request as in flight: the endRequest hook clears it on AJAX
+# completion, a full postback replaces the document (and the flag) instead.
+_ARM_REQUEST_FLAG_JS = r"""
+var prm = (window.Sys && Sys.WebForms) ? Sys.WebForms.PageRequestManager.getInstance() : null;
+if (prm && !window.__ercEndRequestHooked) {
+    prm.add_endRequest(function () { window.__ercPageJump = 'done'; });
+    window.__ercEndRequestHooked = true;
+}
+window.__ercPageJump = prm ? 'pending' : 'postback';
+"""
+
+_REQUEST_SETTLED_JS = r"""
+if (window.__ercPageJump === 'pending' || window.__ercPageJump === 'postback') { return null; }
+if (document.readyState === 'loading' || !window.$find) { return null; }
+var grid = $find(arguments[0]);
+if (!grid || !document.getElementById(arguments[2])) { return null; }
+var view = grid.get_masterTableView();
+"""
+
+# Asks the grid for page arguments[1] via get_masterTableView().page(N).
+# Returns 'started', 'current' (already on that page) or null when the client API is not there.
+START_PAGE_JUMP_SCRIPT = r"""
+var grid = window.$find ? $find(arguments[0]) : null;
+if (!grid) { return null; }
+var view = grid.get_masterTableView();
+if (view.get_currentPageIndex() + 1 === arguments[1]) { return 'current'; }
+""" + _ARM_REQUEST_FLAG_JS + r"""
+view.page(arguments[1]);
+return 'started';
+"""
+
+PAGE_JUMP_DONE_SCRIPT = _REQUEST_SETTLED_JS + r"""
+return view.get_currentPageIndex() + 1 === arguments[1];
+"""
+
+# Asks the grid for arguments[1] rows per page via set_pageSize(N); same return values as above
+START_PAGE_SIZE_SCRIPT = r"""
+var grid = window.$find ? $find(arguments[0]) : null;
+if (!grid) { return null; }
+var view = grid.get_masterTableView();
+if (view.get_pageSize() === arguments[1]) { return 'current'; }
+""" + _ARM_REQUEST_FLAG_JS + r"""
+view.set_pageSize(arguments[1]);
+return 'started';
+"""
+
+# [page size, page count] once the grid has settled (the server may cap the size), else null
+GRID_PAGING_SCRIPT = _REQUEST_SETTLED_JS + r"""
+return [view.get_pageSize(), view.get_pageCount()];
+"""
+
+# Detail page URL inside an onclick handler, e.g. radopen('644_LicensingDetail.aspx?ID=123', ...)
+DETAIL_URL_PATTERN = re.compile(r"""['"]([^'"]*(?:644_Licensing|LicensingDetail)[^'"]*)['"]""")
+
+
+def list_page_url(license_type, portal_url=None):
+    """List grid URL for a licence type (1 = production, 4 = distribution) on the given portal"""
+    return f"{(portal_url or PORTAL_URL).rstrip('/')}{LIST_PAGE_PATH}?LicenseType={license_type}"
+
+
+def _clean_cell(text):
+    text = re.sub(r'\s+', ' ', (text or '').replace('\xa0', ' ')).strip()
+    return text or None
+
+
+def harvest_grid_rows(driver, table_id=LIST_GRID_TABLE_ID):
+    """Identifiers of every row on the current grid page, in one WebDriver round trip.
+
+    Each row dict has:
+        button_id / button_name - to click the detail button without an element handle
+        detail_url              - absolute detail page URL when the row exposes one, else None
+        license_no              - licence number from the list grid (13-cell rows only)
+        cells                   - cleaned list-grid cell texts
+    """
+    rows = json.loads(driver.execute_script(GRID_ROWS_SCRIPT, table_id))
+    base = driver.current_url
+    for row in rows:
+        row['cells'] = [_clean_cell(text) for text in row['cells']]
+
+        detail_url = None
+        if row['href']:
+            detail_url = row['href']
+        else:
+            match = DETAIL_URL_PATTERN.search(row['onclick'])
+            if match:
+                detail_url = urljoin(base, match.group(1))
+        row['detail_url'] = detail_url
+
+        cells = row['cells']
+        row['license_no'] = cells[LICENSE_NO_CELL] if len(cells) == len(LIST_GRID_COLUMNS) else None
+    return rows
+
+
+def summary_record(row):
+    """Harvested row as a summary record (column -> cell text); cells are numbered for an unknown layout"""
+    cells = row['cells']
+    if len(cells) == len(LIST_GRID_COLUMNS):
+        names = LIST_GRID_COLUMNS
+    else:
+        names = ['_detail'] + [f'cell_{i}' for i in range(1, len(cells))]
+    record = {name: value for name, value in zip(names, cells) if name != '_detail'}
+    record['detail_url'] = row['detail_url']
+    return record
+
+
+def click_grid_row(driver, row):
+    """Click a harvested row's detail button by id/name; False if it is no longer in the page"""
+    return bool(driver.execute_script(CLICK_BUTTON_SCRIPT, row['button_id'], row['button_name']))
+
+
+def start_page_jump(driver, page_number, grid_id=LIST_GRID_CLIENT_ID):
+    """Start moving the grid to page_number; 'started', 'current', or None without the client API"""
+    return driver.execute_script(START_PAGE_JUMP_SCRIPT, grid_id, page_number)
+
+
+def page_jump_done(driver, page_number, grid_id=LIST_GRID_CLIENT_ID, table_id=LIST_GRID_TABLE_ID):
+    """True once the grid has rendered page_number and no request is in flight"""
+    return bool(driver.execute_script(PAGE_JUMP_DONE_SCRIPT, grid_id, page_number, table_id))
+
+
+def grid_paging(driver, grid_id=LIST_GRID_CLIENT_ID, table_id=LIST_GRID_TABLE_ID):
+    """(page size, page count) reported by the grid, or None while a request is in flight / without the API"""
+    paging = driver.execute_script(GRID_PAGING_SCRIPT, grid_id, None, table_id)
+    return tuple(paging) if paging else None
+
+
+def jump_to_page(driver, page_number, timeout=30):
+    """Move the grid to page_number in one operation; False if the client API is not available.
+
+    Raises TimeoutException if the grid does not report the page within timeout.
+    """
+    state = start_page_jump(driver, page_number)
+    if state is None:
+        return False
+    if state == 'started':
+        WebDriverWait(driver, timeout, poll_frequency=0.2).until(
+            lambda d: page_jump_done(d, page_number)
+        )
+    return True
+
+
+def set_page_size(driver, page_size, timeout=60):
+    """Ask the grid for page_size rows per page; returns the (page size, page count) it settled on.
+
+    None if the client API is not available. Raises TimeoutException if the grid does not settle.
+    """
+    state = driver.execute_script(START_PAGE_SIZE_SCRIPT, LIST_GRID_CLIENT_ID, page_size)
+    if state is None:
+        return None
+    return WebDriverWait(driver, timeout, poll_frequency=0.2).until(lambda d: grid_paging(d))
+
+
+def maximize_page_size(driver, candidates=PAGE_SIZE_CANDIDATES, timeout=60):
+    """Largest page size the server accepts, trying candidates in order; returns (page size, page count).
+
+    The first candidate that leaves the grid bigger than DEFAULT_PAGE_SIZE wins - if the server
+    caps the request, the capped size it reports is used. None without the client API.
+    """
+    paging = None
+    for candidate in candidates:
+        try:
+            paging = set_page_size(driver, candidate, timeout)
+        except TimeoutException:
+            continue
+        if paging is None:
+            return None
+        if paging[0] > DEFAULT_PAGE_SIZE:
+            return paging
+    return paging
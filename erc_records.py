@@ -0,0 +1,65 @@
+"""
+ERC Compact Record Layout
+Packs scraped license dicts into plain tuples ordered by a shared schema, so the
+long Thai keys are stored once per schema instead of once per record
+"""
+
+import sys
+
+
+class RecordSchema:
+    """Field-ordinal layout shared by every record of one license type.
+
+    A packed record is a tuple of:
+        - one value per top-level field, in schema order
+        - one tuple of row tuples per nested table, in schema order; a row with keys
+          its table does not know about carries them as a trailing dict
+        - a dict of any keys the schema does not know about (or None)
+    """
+
+    def __init__(self, fields, tables=None):
+        self.fields = tuple(sys.intern(f) for f in fields)
+        self.tables = {
+            sys.intern(name): tuple(sys.intern(k) for k in keys)
+            for name, keys in (tables or {}).items()
+        }
+        self.table_names = tuple(self.tables)
+        self._known = set(self.fields) | set(self.table_names)
+
+    def pack(self, record):
+        """Convert a record dict into a compact tuple"""
+        values = [record.get(f) for f in self.fields]
+
+        for name in self.table_names:
+            values.append(tuple(self._pack_row(self.tables[name], row) for row in record.get(name) or []))
+
+        extras = {k: v for k, v in record.items() if k not in self._known}
+        values.append(extras or None)
+        return tuple(values)
+
+    def unpack(self, packed):
+        """Convert a packed tuple back into the dict shape used by the exporters"""
+        n_fields = len(self.fields)
+        record = dict(zip(self.fields, packed[:n_fields]))
+
+        for i, name in enumerate(self.table_names):
+            keys = self.tables[name]
+            record[name] = [self._unpack_row(keys, row) for row in packed[n_fields + i]]
+
+        extras = packed[-1]
+        if extras:
+            record.update(extras)
+        return record
+
+    @staticmethod
+    def _pack_row(keys, row):
+        values = tuple(row.get(k) for k in keys)
+        extras = {k: v for k, v in row.items() if k not in keys}
+        return values + (extras,) if extras else values
+
+    @staticmethod
+    def _unpack_row(keys, row):
+        unpacked = dict(zip(keys, row))
+        if len(row) > len(keys):
+            unpacked.update(row[-1])
+        return unpacked
@@ -0,0 +1,74 @@
+"""
+ERC Scraper Result Sink
+Workers push finished records onto a bounded queue; a dedicated writer process
+appends them to a JSONL file so results never travel back through pool.map.
+Records may be sent packed with an erc_records.RecordSchema; the writer unpacks
+them back into the regular dict shape before writing.
+"""
+
+import json
+import os
+import queue
+import threading
+from multiprocessing import Process
+
+
+# Workers block on put() once this many records are waiting for the writer
+SINK_QUEUE_SIZE = 200
+
+
+def result_writer_process(result_queue, output_path, schema=None):
+    """Drain records from the queue and append one JSON line per record"""
+    written = 0
+    with open(output_path, 'a', encoding='utf-8') as f:
+        while True:
+            record = result_queue.get()
+            if record is None:  # Poison pill
+                break
+            if schema is not None:
+                record = schema.unpack(record)
+
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            # Flush every record so the file is usable while the run is going
+            f.flush()
+            written += 1
+
+    print(f"\n[SINK] Wrote {written} records to {output_path}")
+
+
+def start_result_sink(manager, output_path, schema=None):
+    """Create the bounded result queue and start the writer process"""
+    result_queue = manager.Queue(maxsize=SINK_QUEUE_SIZE)
+    writer = Process(target=result_writer_process, args=(result_queue, output_path, schema))
+    writer.start()
+    return result_queue, writer
+
+
+def start_thread_sink(output_path, schema=None):
+    """Same sink for thread-mode workers: an in-process bounded queue drained by a writer thread"""
+    result_queue = queue.Queue(maxsize=SINK_QUEUE_SIZE)
+    writer = threading.Thread(target=result_writer_process, args=(result_queue, output_path, schema),
+                              daemon=True)
+    writer.start()
+    return result_queue, writer
+
+
+def stop_result_sink(result_queue, writer):
+    """Send the poison pill and wait for the writer to finish flushing"""
+    result_queue.put(None)
+    writer.join()
+
+
+def load_records(output_path):
+    """Yield records back from a JSONL sink file (skips a truncated last line)"""
+    if not os.path.exists(output_path):
+        return
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
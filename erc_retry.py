@@ -0,0 +1,182 @@
+"""
+ERC Retry Policy and Circuit Breaker
+Failed rows and page loads are classified before they are retried:
+    transient   timeouts, stale elements, intercepted clicks, popups that didn't open
+    structural  an expected element (list grid, detail fields) is missing from a loaded page
+    server      the portal answered with an error page (5xx, ASP.NET runtime error)
+    session     the portal answered with its session-expired page - the grid is loaded again
+                (a new session) before the retry
+Each class has its own attempt budget and exponential backoff (RETRY_POLICIES).
+
+A CircuitBreaker shared by all workers watches the error rate over a time window; when it
+spikes, every worker pauses for a cooldown (doubling while the site stays unhealthy) and
+then resumes on its own instead of burning through the remaining pages.
+"""
+
+import random
+import threading
+import time
+
+from selenium.common.exceptions import (ElementClickInterceptedException, ElementNotInteractableException,
+                                        NoSuchElementException, NoSuchFrameException, NoSuchWindowException,
+                                        StaleElementReferenceException, TimeoutException, WebDriverException)
+
+
+ERROR_CLASSES = ('transient', 'structural', 'server', 'session')
+
+# Attempts include the first try; delay doubles per retry from base_delay up to max_delay (+-20% jitter)
+RETRY_POLICIES = {
+    'transient': {'attempts': 3, 'base_delay': 2.0, 'max_delay': 10.0},
+    'structural': {'attempts': 2, 'base_delay': 1.0, 'max_delay': 1.0},
+    'server': {'attempts': 4, 'base_delay': 15.0, 'max_delay': 120.0},
+    'session': {'attempts': 3, 'base_delay': 1.0, 'max_delay': 5.0},
+}
+
+# Titles/opening text of IIS and ASP.NET error pages
+SERVER_ERROR_MARKERS = (
+    'Server Error in', 'Runtime Error', 'Internal Server Error', 'Service Unavailable',
+    'Bad Gateway', 'Gateway Time-out', 'Gateway Timeout', 'HTTP Error 5', '502 -', '503 -',
+)
+
+# Title/text of the portal's session-expired page
+SESSION_EXPIRED_MARKERS = ('Session expired', 'session has timed out')
+
+
+class ServerError(Exception):
+    """The portal answered with an error page"""
+
+
+class StructureError(Exception):
+    """A loaded page lacks an element the scraper depends on"""
+
+
+class SessionExpired(Exception):
+    """The portal answered with its session-expired page"""
+
+
+def error_page(driver):
+    """(error class, marker) of an error page in the current document's title or opening text, or None"""
+    try:
+        text = driver.execute_script(
+            "return document.title + '\\n' + (document.body ? document.body.innerText.slice(0, 500) : '');"
+        ) or ''
+    except Exception:
+        return None
+    for error_class, markers in (('session', SESSION_EXPIRED_MARKERS), ('server', SERVER_ERROR_MARKERS)):
+        for marker in markers:
+            if marker in text:
+                return error_class, marker
+    return None
+
+
+def raise_for_error_page(driver):
+    """Raise SessionExpired or ServerError if the current document is an error page"""
+    found = error_page(driver)
+    if found:
+        error_class, marker = found
+        raise (SessionExpired if error_class == 'session' else ServerError)(f"error page ({marker})")
+
+
+def classify_error(error):
+    """Error class of an exception (None - a step that just returned no result - counts as transient)"""
+    if isinstance(error, ServerError):
+        return 'server'
+    if isinstance(error, SessionExpired):
+        return 'session'
+    if isinstance(error, (StructureError, NoSuchElementException, NoSuchFrameException,
+                          KeyError, IndexError, AttributeError)):
+        return 'structural'
+    if isinstance(error, (TimeoutException, StaleElementReferenceException, ElementClickInterceptedException,
+                          ElementNotInteractableException, NoSuchWindowException, WebDriverException)):
+        return 'transient'
+    return 'transient' if error is None else 'structural'
+
+
+class RetryPolicy:
+    """Per-class attempt budgets and jittered exponential backoff"""
+
+    def __init__(self, policies=None, seed=None):
+        self.policies = policies or RETRY_POLICIES
+        self.rng = random.Random(seed)
+
+    def attempts(self, error_class):
+        return self.policies[error_class]['attempts']
+
+    def delay(self, error_class, attempt):
+        """Seconds to wait before retry number `attempt` (1 = first retry)"""
+        policy = self.policies[error_class]
+        delay = min(policy['base_delay'] * 2 ** (attempt - 1), policy['max_delay'])
+        return delay * self.rng.uniform(0.8, 1.2)
+
+
+class CircuitBreaker:
+    """Error-rate breaker shared by every worker of a run.
+
+    state/lock are a dict and threading.Lock for thread workers, or Manager().dict() and
+    Manager().Lock() for process workers - the breaker itself pickles into Pool arguments.
+    """
+
+    def __init__(self, state=None, lock=None, window_s=60.0, min_calls=10, max_error_rate=0.5,
+                 cooldown_s=60.0, max_cooldown_s=600.0):
+        self.state = state if state is not None else {}
+        self.lock = lock or threading.Lock()
+        self.window_s = window_s
+        self.min_calls = min_calls
+        self.max_error_rate = max_error_rate
+        self.cooldown_s = cooldown_s
+        self.max_cooldown_s = max_cooldown_s
+        with self.lock:
+            if 'window_start' not in self.state:
+                self.state.update({'window_start': time.time(), 'calls': 0, 'errors': 0,
+                                   'open_until': 0.0, 'trips': 0})
+
+    def record(self, ok):
+        """Count one attempt; returns {cooldown_s, error_rate, calls} if this attempt tripped the breaker"""
+        with self.lock:
+            state = self.state.copy()
+            now = time.time()
+            if now - state['window_start'] > self.window_s:
+                # A healthy full window ends a run of trips
+                if state['calls'] >= self.min_calls and state['errors'] / state['calls'] < self.max_error_rate:
+                    state['trips'] = 0
+                state.update({'window_start': now, 'calls': 0, 'errors': 0})
+            state['calls'] += 1
+            state['errors'] += 0 if ok else 1
+
+            tripped = None
+            error_rate = state['errors'] / state['calls']
+            if now >= state['open_until'] and state['calls'] >= self.min_calls and error_rate >= self.max_error_rate:
+                cooldown = min(self.cooldown_s * 2 ** state['trips'], self.max_cooldown_s)
+                tripped = {'cooldown_s': cooldown, 'error_rate': round(error_rate, 3), 'calls': state['calls']}
+                state.update({'open_until': now + cooldown, 'trips': state['trips'] + 1,
+                              'window_start': now + cooldown, 'calls': 0, 'errors': 0})
+            self.state.update(state)
+        return tripped
+
+    def open_for(self):
+        """Seconds until the breaker closes again (0 when closed)"""
+        return max(self.state['open_until'] - time.time(), 0.0)
+
+    def wait(self, on_wait=None, interval=30.0):
+        """Block while the breaker is open; returns the seconds waited.
+
+        on_wait(remaining_s) is called before every sleep of at most `interval` seconds,
+        so a long cooldown still shows signs of life (see scripts/supervise_workers.py).
+        """
+        waited = 0.0
+        remaining = self.open_for()
+        while remaining > 0:
+            if on_wait:
+                on_wait(remaining)
+            pause = min(remaining, interval)
+            time.sleep(pause)
+            waited += pause
+            remaining = self.open_for()
+        return waited
+
+
+def create_breaker(manager=None, **options):
+    """CircuitBreaker with in-process state for thread workers, or Manager-backed state for process workers"""
+    if manager is None:
+        return CircuitBreaker(**options)
+    return CircuitBreaker(manager.dict(), manager.Lock(), **options)
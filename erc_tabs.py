@@ -0,0 +1,361 @@
+"""
+ERC Multi-Tab Scheduler
+Drives N tabs of a single Chrome concurrently. Each tab owns one grid page at a time;
+every wait on the browser is a yield, and the scheduler round-robins over the tabs so
+page loads in one tab overlap with extraction in the others.
+
+WebDriver commands are still serialized - the concurrency comes from never blocking
+on a navigation: navigations are started with JavaScript and polled for completion.
+"""
+
+import queue
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+
+from erc_driver import driver_alive
+from erc_radgrid import (LIST_GRID_CLIENT_ID, LIST_GRID_TABLE_ID, START_PAGE_SIZE_SCRIPT, harvest_grid_rows,
+                         start_page_jump, page_jump_done, grid_paging)
+from erc_page_cache import page_hash
+
+
+# Start a navigation without waiting for it; the marker disappears with the old document
+START_NAVIGATION_SCRIPT = "window.__ercStale = true; window.location.href = arguments[0];"
+
+GRID_READY_SCRIPT = """
+return !window.__ercStale && document.readyState !== 'loading' && !!document.getElementById(arguments[0]);
+"""
+
+DETAIL_READY_SCRIPT = """
+return !window.__ercStale && document.readyState !== 'loading'
+    && !!document.querySelector("span[id*='lblLicensesNo_1']");
+"""
+
+# Text of the first grid row - changes once a page jump has been rendered
+GRID_SIGNATURE_SCRIPT = """
+var table = document.getElementById(arguments[0]);
+if (!table || !table.tBodies.length || !table.tBodies[0].rows.length) { return null; }
+return table.tBodies[0].rows[0].textContent;
+"""
+
+
+def wait_until(driver, script, *args, timeout=30):
+    """Yield until script returns true in the current tab (raises TimeoutException)"""
+    deadline = time.time() + timeout
+    while not driver.execute_script(script, *args):
+        if time.time() > deadline:
+            raise TimeoutException(f"Tab wait timed out after {timeout}s")
+        yield
+
+
+def load_grid_page(scraper, page_number):
+    """Load the list grid in the current tab and move it to page_number"""
+    driver = scraper.driver
+    driver.execute_script(START_NAVIGATION_SCRIPT, scraper.base_url)
+    yield from wait_until(driver, GRID_READY_SCRIPT, LIST_GRID_TABLE_ID)
+
+    # A fresh grid is back at the default page size - restore the one the scraper settled on
+    if scraper.page_size:
+        state = driver.execute_script(START_PAGE_SIZE_SCRIPT, LIST_GRID_CLIENT_ID, scraper.rows_per_page)
+        if state == 'started':
+            deadline = time.time() + 60
+            while not grid_paging(driver):
+                if time.time() > deadline:
+                    raise TimeoutException(f"Page size {scraper.rows_per_page} was not applied")
+                yield
+
+    # RadGrid client-API jump; polled without blocking so other tabs keep working
+    state = start_page_jump(driver, page_number)
+    if state == 'current' or (state is None and page_number == 1):
+        return
+    if state == 'started':
+        deadline = time.time() + 30
+        while not page_jump_done(driver, page_number):
+            if time.time() > deadline:
+                raise TimeoutException(f"Page {page_number} did not render")
+            yield
+        return
+
+    # No client API - fall back to the paging textbox
+    before = driver.execute_script(GRID_SIGNATURE_SCRIPT, LIST_GRID_TABLE_ID)
+    page_input = driver.find_element(
+        By.CSS_SELECTOR, "input[id*='RadGridPagingTemplate2_RadNumericTextBox1'], input.rgPageText"
+    )
+    page_input.clear()
+    page_input.send_keys(str(page_number))
+    page_input.send_keys(Keys.ENTER)
+
+    deadline = time.time() + 30
+    while True:
+        current = driver.execute_script(GRID_SIGNATURE_SCRIPT, LIST_GRID_TABLE_ID)
+        if current is not None and current != before and driver.execute_script(
+                GRID_READY_SCRIPT, LIST_GRID_TABLE_ID):
+            return
+        if time.time() > deadline:
+            raise TimeoutException(f"Page {page_number} did not render")
+        yield
+
+
+def load_detail_url(scraper, detail_url, nav_share):
+    """One attempt at a detail URL in the current tab - the detail, or None with the scraper's
+    record_failure/record_error/record_error_class describing the failure"""
+    driver = scraper.driver
+    detail_start = time.perf_counter()
+    driver.execute_script(START_NAVIGATION_SCRIPT, detail_url)
+    try:
+        yield from wait_until(driver, DETAIL_READY_SCRIPT, timeout=15)
+    except TimeoutException:
+        scraper.begin_record()
+        scraper.record_failure = 'NO_DETAIL'
+    else:
+        # The timer and notes are shared by every tab - only touch them between yields
+        scraper.begin_record()
+        scraper.timer.add('navigate', nav_share + time.perf_counter() - detail_start)
+        try:
+            detail_data = scraper.extract_detail(in_popup=False)
+            scraper.report_attempt(True)
+            return detail_data
+        except Exception as e:
+            scraper.record_error = e
+    scraper.record_error_class = scraper.classify_failure(scraper.record_error)
+    scraper.report_attempt(False)
+    return None
+
+
+def load_row(scraper, page_number, idx, grid_row, nav_share):
+    """Tab task step: one row's detail under the retry policy, the same as scraper.load_detail but
+    the backoff between attempts yields until its deadline instead of sleeping.
+
+    Returns the row's outcome, (detail or None, record notes, failure, error, error_class).
+    """
+    what = f"row {idx + 1} of page {page_number}"
+    attempt = 0
+    while True:
+        attempt += 1
+        if grid_row['detail_url']:
+            detail_data = yield from load_detail_url(scraper, grid_row['detail_url'], nav_share)
+        else:
+            # The popup is opened, extracted and closed (or the grid restored) without a yield
+            scraper.begin_record()
+            scraper.timer.add('navigate', nav_share)
+            scraper.current_page = page_number
+            detail_data = scraper.attempt_detail(grid_row)
+        if detail_data is not None:
+            scraper.timer.annotate(detail_data)
+            return detail_data, list(scraper.record_notes), None, None, None
+        outcome = (None, list(scraper.record_notes), scraper.record_failure, scraper.record_error,
+                   scraper.record_error_class)
+
+        delay = scraper.retry_delay(scraper.record_error_class, attempt, what, scraper.record_error)
+        if delay is None:
+            return outcome
+        if scraper.record_error_class == 'session' and grid_row['detail_url']:
+            # A new session starts on the list page
+            scraper.driver.execute_script(START_NAVIGATION_SCRIPT, scraper.base_url)
+            yield from wait_until(scraper.driver, GRID_READY_SCRIPT, LIST_GRID_TABLE_ID)
+        deadline = time.time() + delay
+        while time.time() < deadline:
+            yield
+
+
+def scrape_page_in_tab(scraper, page_number, on_record):
+    """Tab task: scrape one grid page, calling on_record(record) for each detail once the page is done.
+
+    Returns (as StopIteration.value) True if every row was scraped.
+    """
+    driver = scraper.driver
+    nav_start = time.perf_counter()
+    yield from load_grid_page(scraper, page_number)
+
+    grid_rows = harvest_grid_rows(driver)
+    scraper.events.emit('page_start', f"[Worker {scraper.worker_id}] Tab found {len(grid_rows)} records on page {page_number}",
+                        page=page_number, rows=len(grid_rows))
+    # Wall time of the page load, including turns given to other tabs while it was pending
+    nav_share = (time.perf_counter() - nav_start) / max(len(grid_rows), 1)
+
+    # Unchanged since the last run - reuse the stored records
+    grid_hash = page_hash(grid_rows) if scraper.page_cache else None
+    if scraper.page_cache:
+        cached = scraper.page_cache.lookup(page_number, grid_hash)
+        if cached is not None:
+            scraper.pages_reused += 1
+            scraper.metrics.inc('pages_reused')
+            for record in cached:
+                on_record(record)
+            scraper.events.emit('page_done', f"[Worker {scraper.worker_id}] Page {page_number} unchanged - "
+                                f"reusing {len(cached)} stored records",
+                                page=page_number, records=len(cached), reused=True)
+            return True
+
+    # Rows without a detail URL need the popup, so handle them while the grid is still loaded
+    # (a session-expired popup reloads this page in this tab - see scraper.restore_session)
+    rows = sorted(enumerate(grid_rows), key=lambda row: row[1]['detail_url'] is not None)
+    outcomes = {}
+    for idx, grid_row in rows:
+        outcomes[idx] = yield from load_row(scraper, page_number, idx, grid_row, nav_share)
+
+    page_data = []
+    for idx, grid_row in enumerate(grid_rows):
+        detail_data = outcomes[idx][0]
+        if detail_data is not None:
+            detail_data['_record_number'] = idx + 1 + (page_number - 1) * scraper.rows_per_page
+            detail_data['_page_number'] = page_number
+            detail_data['_row_on_page'] = idx + 1
+            detail_data['_worker_id'] = scraper.worker_id
+            page_data.append(detail_data)
+
+    if scraper.page_cache and grid_rows and len(page_data) == len(grid_rows):
+        scraper.page_cache.store(page_number, grid_hash, page_data)
+
+    # Logged and handed over only now, so a page that fails midway and is retried (after a browser
+    # crash, say) sends and counts no duplicates; nothing below yields, so the shared notes are safe
+    for idx, grid_row in enumerate(grid_rows):
+        detail_data, scraper.record_notes, scraper.record_failure, scraper.record_error, \
+            scraper.record_error_class = outcomes[idx]
+        if detail_data is not None:
+            scraper.metrics.observe_record(detail_data)
+            scraper.log_record(page_number, idx, grid_row, 'OK', detail_data)
+            on_record(detail_data)
+        else:
+            scraper.log_failed_record(page_number, idx, grid_row)
+    failed_rows = len(grid_rows) - len(page_data)
+    if failed_rows:
+        # Rows out of retries - page_failed lets the supervisor / coordinator schedule the page again
+        scraper.events.emit('page_failed', f"[Worker {scraper.worker_id}] Page {page_number} incomplete (tab): "
+                            f"{len(page_data)} records, {failed_rows} rows failed",
+                            page=page_number, error='rows', records=len(page_data), failed_rows=failed_rows)
+        return False
+    scraper.events.emit('page_done', f"[Worker {scraper.worker_id}] Page {page_number} complete (tab): {len(page_data)} records",
+                        page=page_number, records=len(page_data), reused=False)
+    return True
+
+
+class TabSchedulerState:
+    """What one run_tab_scheduler() call leaves for the next after the browser died"""
+
+    def __init__(self):
+        # (page, attempt, not_before) of failed pages waiting for a retry
+        self.retry_pages = []
+        # A poison pill (or an empty queue) was seen - the queue is never polled again, or a
+        # restarted scheduler would take the pill meant for another worker
+        self.queue_closed = False
+        self.browser_died = False
+
+
+def run_tab_scheduler(scraper, page_queue, num_tabs, on_record, poll_interval=0.1, state=None):
+    """Scrape pages from page_queue with num_tabs tabs of scraper.driver; returns pages completed.
+
+    A None on the queue (poison pill) or an empty queue stops new assignments;
+    tabs that are still working finish their current page.
+
+    A failed page is classified like a failed row, counted by the circuit breaker and handed
+    to the next idle tab once its class's backoff has passed, until its attempts are used up.
+    If the browser dies the scheduler moves its unfinished pages to state.retry_pages, sets
+    state.browser_died and returns early, so the caller can replace the driver and call it
+    again with the same state.
+    """
+    driver = scraper.driver
+    handles = [driver.current_window_handle]
+    for _ in range(num_tabs - 1):
+        driver.switch_to.new_window('tab')
+        handles.append(driver.current_window_handle)
+
+    state = state if state is not None else TabSchedulerState()
+    state.browser_died = False
+    retry_pages = state.retry_pages
+    active = {}
+    pages_done = 0
+
+    def page_failed(page_number, attempt, error_class, error):
+        """Queue a retry of a failed page, or give up on it once the class's attempts are spent"""
+        attempt += 1
+        if attempt < scraper.retry.attempts(error_class):
+            # A dead browser is replaced before the retry - no point in backing off
+            delay = 0.0 if state.browser_died else scraper.retry.delay(error_class, attempt)
+            retry_pages.append((page_number, attempt, time.time() + delay))
+            scraper.events.emit('retry', f"[Worker {scraper.worker_id}] Page {page_number} (tab): {error_class} error "
+                                f"({str(error)[:50]}) - retry {attempt} in {delay:.1f}s",
+                                target=f"page {page_number}", error_class=error_class, attempt=attempt,
+                                delay_s=round(delay, 2), error=str(error)[:200])
+            scraper.metrics.inc('retries')
+            return
+        scraper.metrics.inc('pages_failed')
+        scraper.events.emit('page_failed', f"[Worker {scraper.worker_id}] Page {page_number} error in tab: {str(error)[:60]}",
+                            page=page_number, error=str(error)[:200], error_class=error_class)
+
+    while True:
+        # An open circuit breaker pauses every tab
+        scraper.wait_for_breaker()
+
+        # Give every idle tab a page - retries that are due first, then new pages from the queue
+        for handle in handles:
+            if handle in active:
+                continue
+            due = [entry for entry in retry_pages if entry[2] <= time.time()]
+            if due:
+                retry_pages.remove(due[0])
+                page_number, attempt, _ = due[0]
+            elif state.queue_closed:
+                continue
+            else:
+                try:
+                    page_number = page_queue.get_nowait()
+                except queue.Empty:
+                    page_number = None
+                if page_number is None:
+                    state.queue_closed = True
+                    continue
+                attempt = 0
+                try:
+                    scraper.metrics.set('page_queue_depth', page_queue.qsize())
+                except NotImplementedError:
+                    pass
+            active[handle] = (page_number, attempt, scrape_page_in_tab(scraper, page_number, on_record))
+
+        if not active and not retry_pages:
+            break
+
+        # Advance each tab until it has to wait on the browser again
+        for handle, (page_number, attempt, task) in list(active.items()):
+            try:
+                driver.switch_to.window(handle)
+                # Sibling tabs must not be mistaken for (and closed as) detail popups
+                scraper.tab_handles = set(handles) - {handle}
+                next(task)
+            except StopIteration as stop:
+                del active[handle]
+                pages_done += 1
+                scraper.metrics.inc('pages_completed' if stop.value else 'pages_failed')
+                scraper.report_attempt(True)
+            except Exception as e:
+                del active[handle]
+                error_class = scraper.classify_failure(e)
+                scraper.report_attempt(False)
+                state.browser_died = not driver_alive(driver)
+                page_failed(page_number, attempt, error_class, e)
+            scraper.metrics.flush()
+            if state.browser_died:
+                break
+
+        if state.browser_died:
+            # Every tab went down with the browser - their pages are retried on the next one
+            for page_number, attempt, task in active.values():
+                task.close()
+                page_failed(page_number, attempt, 'transient', 'browser crashed')
+            scraper.tab_handles = set()
+            return pages_done
+
+        time.sleep(poll_interval)
+
+    # Leave only the first tab open
+    for handle in handles[1:]:
+        try:
+            driver.switch_to.window(handle)
+            driver.close()
+        except Exception:
+            pass
+    driver.switch_to.window(handles[0])
+    scraper.tab_handles = set()
+    return pages_done
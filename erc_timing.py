@@ -0,0 +1,105 @@
+"""
+ERC Per-Phase Timing
+Splits the time spent on each detail record into phases and aggregates them into
+p50/p95/p99 per phase and per worker at the end of a run.
+
+Phases (seconds, stored on each record as _t_<phase>):
+    navigate       - grid page load/jump, shared equally by the page's rows,
+                     plus the detail-page load in tab mode
+    click          - clicking the row's detail button
+    popup_wait     - waiting for the RadWindow popup and switching into it
+    page_source    - fetching the detail document (page_source, or the popup script in js mode)
+    parse          - building the soup and reading the detail spans
+    nested_tables  - extracting the nested grids
+    close          - closing the popup and getting back to the grid
+"""
+
+import csv
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+PHASES = ['navigate', 'click', 'popup_wait', 'page_source', 'parse', 'nested_tables', 'close']
+TIMING_FIELDS = [f'_t_{phase}' for phase in PHASES] + ['_t_total']
+PERCENTILES = [50, 95, 99]
+
+
+class RecordTimer:
+    """Accumulates phase durations for the record currently being scraped"""
+
+    def __init__(self):
+        self.timings = {}
+
+    def reset(self):
+        self.timings = {}
+
+    def add(self, phase, seconds):
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t0)
+
+    def annotate(self, record):
+        """Write the accumulated phases onto record as _t_* fields"""
+        for phase in PHASES:
+            record[f'_t_{phase}'] = round(self.timings.get(phase, 0.0), 4)
+        record['_t_total'] = round(sum(self.timings.values()), 4)
+        return record
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def timing_summary(records):
+    """Rows of (worker, phase, count, mean, p50, p95, p99) - worker 'all' aggregates every worker"""
+    samples = {}
+    for record in records:
+        if record.get('_t_total') is None:
+            continue
+        for worker in ('all', record.get('_worker_id')):
+            for phase in PHASES + ['total']:
+                samples.setdefault((worker, phase), []).append(record.get(f'_t_{phase}') or 0.0)
+
+    rows = []
+    for (worker, phase), values in samples.items():
+        values.sort()
+        row = {'worker': worker, 'phase': phase, 'count': len(values),
+               'mean_s': round(sum(values) / len(values), 4)}
+        for pct in PERCENTILES:
+            row[f'p{pct}_s'] = round(percentile(values, pct), 4)
+        rows.append(row)
+
+    phase_order = {phase: i for i, phase in enumerate(PHASES + ['total'])}
+    rows.sort(key=lambda row: (row['worker'] != 'all', str(row['worker']), phase_order[row['phase']]))
+    return rows
+
+
+def save_timing_summary(records, filename_prefix):
+    """Export the per-phase percentiles to CSV and print the all-worker breakdown; returns the path"""
+    rows = timing_summary(records)
+    if not rows:
+        print("[TIMING] No timed records")
+        return None
+
+    csv_file = f"{filename_prefix}_TIMINGS_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    with open(csv_file, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print(f"\n[TIMING] Per-record phases (all workers)")
+    print(f"  {'Phase':<15}{'p50':>9}{'p95':>9}{'p99':>9}{'Mean':>9}")
+    for row in rows:
+        if row['worker'] == 'all':
+            print(f"  {row['phase']:<15}{row['p50_s']:>8.2f}s{row['p95_s']:>8.2f}s{row['p99_s']:>8.2f}s{row['mean_s']:>8.2f}s")
+    print(f"[OK] Timings: {csv_file}")
+    return csv_file
@@ -2,31 +2,13 @@ import requests
 import pandas as pd
 import json
 
-def scrape_erc_rooftop_pv():
-    """
-    Scrape the ERC Rooftop PV System license table.
-    All data is returned in a single POST request to the API endpoint.
-    """
+# Same host as erc_radgrid.PORTAL_URL - kept here so this requests-only script needs no selenium
+PORTAL_URL = "http://app04.erc.or.th"
+ROOFTOP_API_PATH = "/ElicenseRooftop/Data/PV/get_list_importdata.ashx"
 
-    url = "http://app04.erc.or.th/ElicenseRooftop/Data/PV/get_list_importdata.ashx"
 
-    headers = {
-        "Content-Type": "application/json; charset=utf-8",
-        "Accept": "application/json, text/javascript, */*; q=0.01",
-        "X-Requested-With": "XMLHttpRequest",
-        "Referer": "http://app04.erc.or.th/ElicenseRooftop/PV/Public/",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                      "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    }
-
-    print("Fetching data from ERC Rooftop PV API...")
-    response = requests.post(url, headers=headers)
-    response.raise_for_status()
-
-    data = response.json()
-    print(f"Total records fetched: {len(data)}")
-
-    # Define the columns we want to extract (matching the website's table)
+def map_rooftop_rows(data):
+    """Map the API's JSON rows to records with the columns of the website's table"""
     records = []
     for i, row in enumerate(data, start=1):
         record = {
@@ -51,6 +33,36 @@ def scrape_erc_rooftop_pv():
             "ปรับปรุงล่าสุด เมื่อ (Last Update)": row.get("txtUpdateDate", ""),
         }
         records.append(record)
+    return records
+
+
+def scrape_erc_rooftop_pv(portal_url=None):
+    """
+    Scrape the ERC Rooftop PV System license table.
+    All data is returned in a single POST request to the API endpoint.
+    portal_url overrides the ERC portal host (e.g. a local erc_mock_portal).
+    """
+
+    portal_url = (portal_url or PORTAL_URL).rstrip('/')
+    url = f"{portal_url}{ROOFTOP_API_PATH}"
+
+    headers = {
+        "Content-Type": "application/json; charset=utf-8",
+        "Accept": "application/json, text/javascript, */*; q=0.01",
+        "X-Requested-With": "XMLHttpRequest",
+        "Referer": f"{portal_url}/ElicenseRooftop/PV/Public/",
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    }
+
+    print("Fetching data from ERC Rooftop PV API...")
+    response = requests.post(url, headers=headers)
+    response.raise_for_status()
+
+    data = response.json()
+    print(f"Total records fetched: {len(data)}")
+
+    records = map_rooftop_rows(data)
 
     # Create DataFrame
     df = pd.DataFrame(records)
@@ -12,13 +12,17 @@ import pandas as pd
 import time
 from datetime import datetime
 from bs4 import BeautifulSoup
+from erc_radgrid import harvest_grid_rows, list_page_url
+from erc_page_cache import PageCache, page_hash
 
 
 class ERCLicenseScraper:
 
-    def __init__(self):
-        """Initialize scraper"""
-        self.base_url = "http://app04.erc.or.th/ELicense/Licenser/05_Reporting/504_ListLicensing_Columns_New.aspx?LicenseType=4"
+    def __init__(self, cache_dir=None, portal_url=None):
+        """Initialize scraper (cache_dir: page-hash cache so unchanged pages reuse stored records,
+        portal_url: portal host, default the ERC portal - e.g. a local erc_mock_portal)"""
+        self.page_cache = PageCache(cache_dir) if cache_dir else None
+        self.base_url = list_page_url(4, portal_url)
         self.all_data = []
         self.driver = None
 
@@ -506,6 +510,15 @@ class ERCLicenseScraper:
             )
             time.sleep(2)
 
+            # Unchanged since the last run - reuse the stored records instead of opening popups
+            grid_hash = None
+            if self.page_cache and not max_records:
+                grid_hash = page_hash(harvest_grid_rows(self.driver))
+                cached = self.page_cache.lookup(page_number, grid_hash)
+                if cached is not None:
+                    print(f"  Page {page_number} unchanged - reusing {len(cached)} stored records")
+                    return cached
+
             # Find all detail buttons (paper icons)
             detail_buttons = self.driver.find_elements(By.CSS_SELECTOR, "input[type='image'][src*='icon_view']")
             total_buttons = len(detail_buttons)
@@ -594,6 +607,10 @@ class ERCLicenseScraper:
 
             print(f"  Completed page {page_number}: {len(page_data)} records extracted")
 
+            # Only a complete page may vouch for its grid hash
+            if grid_hash and total_buttons and len(page_data) == total_buttons:
+                self.page_cache.store(page_number, grid_hash, page_data)
+
         except Exception as e:
             print(f"  Error processing page {page_number}: {e}")
 
@@ -621,6 +638,8 @@ class ERCLicenseScraper:
             print(f"   Pages to scrape: {total_pages}")
             if max_records_per_page:
                 print(f"   Max records per page: {max_records_per_page}")
+            if self.page_cache:
+                print(f"   Page cache: {self.page_cache.root}")
             print()
 
             # Scrape each page
@@ -799,8 +818,14 @@ def main():
 
     # For full scrape, use: MAX_PAGES = None, MAX_RECORDS = None
 
+    # Page-hash cache for repeat runs (None to always open every popup)
+    CACHE_DIR = None        # e.g. "erc_page_cache"
+
+    # Portal to scrape (None for the ERC portal, e.g. "http://127.0.0.1:8765" for erc_mock_portal.py)
+    PORTAL_URL = None
+
     # Create scraper
-    scraper = ERCLicenseScraper()
+    scraper = ERCLicenseScraper(cache_dir=CACHE_DIR, portal_url=PORTAL_URL)
 
     try:
         # Scrape data
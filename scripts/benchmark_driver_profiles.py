@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark Chrome driver profiles
+Scrapes the same page with each profile and compares startup time,
+per-record latency and Chrome process-tree RSS (peak and final)
+
+Usage:
+    python scripts/benchmark_driver_profiles.py
+    python scripts/benchmark_driver_profiles.py --scraper distribution --page 5 --profiles default fast
+    python scripts/benchmark_driver_profiles.py --warm-template   # clone workers from a pre-warmed profile
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from erc_driver import DRIVER_PROFILES, chrome_tree_rss
+
+
+def load_scraper_class(name):
+    """Import ERCLicenseScraper from the parallel V2 scraper for the given license type"""
+    if name == 'distribution':
+        from scrape_erc_distribution_parallel_v2 import ERCLicenseScraper
+    else:
+        from scrape_erc_production_parallel_v2 import ERCLicenseScraper
+    return ERCLicenseScraper
+
+
+class RSSSampler(threading.Thread):
+    """Sample the driver's Chrome tree RSS in the background and keep the peak"""
+
+    def __init__(self, driver, interval=0.5):
+        super().__init__(daemon=True)
+        self.driver = driver
+        self.interval = interval
+        self.peak = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            rss = chrome_tree_rss(self.driver)
+            if rss is not None and (self.peak is None or rss > self.peak):
+                self.peak = rss
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def format_mb(value):
+    return f"{value / 1024 / 1024:.0f} MB" if value is not None else "n/a"
+
+
+def benchmark_profile(scraper_class, profile, page_number, warm_template=False):
+    """Run one page with the given profile and return a result dict"""
+    print(f"\n[BENCH] Profile '{profile}' - page {page_number}")
+    scraper = scraper_class(worker_id=0, driver_profile=profile)
+    if warm_template:
+        scraper.profile_manager.warm_template(scraper.base_url, profile)
+
+    t0 = time.time()
+    scraper.driver = scraper.create_driver()
+    startup = time.time() - t0
+
+    sampler = RSSSampler(scraper.driver)
+    sampler.start()
+    try:
+        t0 = time.time()
+        if not scraper.navigate_to_url(scraper.driver):
+            print(f"[BENCH] Profile '{profile}' could not load the grid")
+            return None
+        first_page = time.time() - t0
+
+        t0 = time.time()
+        records = scraper.scrape_page(page_number)
+        elapsed = time.time() - t0
+        final_rss = chrome_tree_rss(scraper.driver)
+    finally:
+        sampler.stop()
+        scraper.close_driver()
+
+    return {
+        'profile': profile,
+        'startup_s': startup,
+        'first_page_s': first_page,
+        'records': len(records),
+        'per_record_s': elapsed / len(records) if records else None,
+        'peak_rss': sampler.peak,
+        'final_rss': final_rss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Chrome driver profiles on one grid page")
+    parser.add_argument('--scraper', choices=['production', 'distribution'], default='production')
+    parser.add_argument('--page', type=int, default=1, help="Grid page to scrape with each profile")
+    parser.add_argument('--profiles', nargs='+', choices=DRIVER_PROFILES, default=list(DRIVER_PROFILES))
+    parser.add_argument('--warm-template', action='store_true',
+                        help="Clone the worker profile from a pre-warmed template (cold profile otherwise)")
+    args = parser.parse_args()
+
+    scraper_class = load_scraper_class(args.scraper)
+    results = []
+    for profile in args.profiles:
+        result = benchmark_profile(scraper_class, profile, args.page, args.warm_template)
+        if result:
+            results.append(result)
+
+    print("\n" + "="*78)
+    print("  DRIVER PROFILE BENCHMARK")
+    print("="*78)
+    print(f"  {'Profile':<10}{'Startup':>10}{'1st page':>10}{'Records':>9}{'s/record':>10}{'Peak RSS':>13}{'Final RSS':>13}")
+    for r in results:
+        per_record = f"{r['per_record_s']:.2f}" if r['per_record_s'] is not None else "n/a"
+        print(f"  {r['profile']:<10}{r['startup_s']:>9.1f}s{r['first_page_s']:>9.1f}s{r['records']:>9}"
+              f"{per_record:>10}{format_mb(r['peak_rss']):>13}{format_mb(r['final_rss']):>13}")
+    print("="*78)
+    if any(r['peak_rss'] is None for r in results):
+        print("  (install psutil to measure RSS)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark process vs thread execution modes
+Runs the same page range through run_workers() in each mode and compares wall time,
+throughput and peak memory of the whole process tree (Python workers, Manager, Chrome)
+
+Usage:
+    python scripts/benchmark_execution_modes.py --pages 1 8 --workers 4
+    python scripts/benchmark_execution_modes.py --scraper distribution --modes thread --workers 8 --driver-profile fast
+    python scripts/benchmark_execution_modes.py --modes thread --workers 1 --tabs 4   # one browser, four tabs
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from erc_driver import DRIVER_PROFILES
+
+
+def load_scraper_module(name):
+    """Import the parallel V2 scraper module for the given license type"""
+    if name == 'distribution':
+        import scrape_erc_distribution_parallel_v2 as module
+    else:
+        import scrape_erc_production_parallel_v2 as module
+    return module
+
+
+class TreeRSSSampler(threading.Thread):
+    """Sample RSS of this process and all of its descendants, keeping the peak"""
+
+    def __init__(self, interval=1.0):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            import psutil
+        except ImportError:
+            return
+        root = psutil.Process()
+        while not self._stop_event.is_set():
+            total = 0
+            for proc in [root] + root.children(recursive=True):
+                try:
+                    total += proc.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            if self.peak is None or total > self.peak:
+                self.peak = total
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def benchmark_mode(module, mode, pages, workers, scraper_options):
+    """Run one mode and return a result dict"""
+    print(f"\n[BENCH] Mode '{mode}' - pages {pages[0]}-{pages[-1]}, {workers} workers")
+    sink_file = f"bench_{mode}_{int(time.time())}.jsonl"
+
+    sampler = TreeRSSSampler()
+    sampler.start()
+    t0 = time.time()
+    try:
+        records = module.run_workers(pages, workers, mode, scraper_options, sink_file)
+    finally:
+        elapsed = time.time() - t0
+        sampler.stop()
+        if os.path.exists(sink_file):
+            os.remove(sink_file)
+
+    return {
+        'mode': mode,
+        'records': records,
+        'elapsed_s': elapsed,
+        'records_per_min': records / elapsed * 60 if elapsed else 0,
+        'peak_rss': sampler.peak,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare process and thread execution modes")
+    parser.add_argument('--scraper', choices=['production', 'distribution'], default='production')
+    parser.add_argument('--pages', type=int, nargs=2, default=[1, 4], metavar=('START', 'END'))
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--modes', nargs='+', choices=['process', 'thread'], default=['process', 'thread'])
+    parser.add_argument('--driver-profile', choices=DRIVER_PROFILES, default='fast')
+    parser.add_argument('--tabs', type=int, default=1, help="Tabs per browser (multi-tab scheduler when > 1)")
+    args = parser.parse_args()
+
+    module = load_scraper_module(args.scraper)
+    pages = list(range(args.pages[0], args.pages[1] + 1))
+    scraper_options = {'driver_profile': args.driver_profile, 'tabs': args.tabs}
+
+    results = [benchmark_mode(module, mode, pages, args.workers, scraper_options) for mode in args.modes]
+
+    print("\n" + "="*70)
+    print("  EXECUTION MODE BENCHMARK")
+    print("="*70)
+    print(f"  {'Mode':<10}{'Records':>10}{'Wall time':>12}{'Records/min':>14}{'Peak RSS':>14}")
+    for r in results:
+        rss = f"{r['peak_rss'] / 1024 / 1024:.0f} MB" if r['peak_rss'] is not None else "n/a"
+        print(f"  {r['mode']:<10}{r['records']:>10}{r['elapsed_s']:>11.1f}s{r['records_per_min']:>14.1f}{rss:>14}")
+    print("="*70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark the parallel V2 scrapers under fault-injection profiles
+Runs each profile against a local mock portal (erc_mock_portal) and reports completed
+records/hour and completeness (distinct licences extracted / licences served)
+
+Usage:
+    python scripts/benchmark_fault_profiles.py
+    python scripts/benchmark_fault_profiles.py --profiles none flaky hostile --layer both --licenses 150
+    python scripts/benchmark_fault_profiles.py --scraper distribution --layer driver --workers 2 --mode thread
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from erc_driver import DRIVER_PROFILES
+from erc_faults import FAULT_PROFILES, FAULT_KINDS
+from erc_mock_portal import start_mock_portal
+from erc_radgrid import DEFAULT_PAGE_SIZE
+from erc_result_sink import load_records
+
+
+def load_scraper_module(name):
+    """Import the parallel V2 scraper module for the given license type"""
+    if name == 'distribution':
+        import scrape_erc_distribution_parallel_v2 as module
+    else:
+        import scrape_erc_production_parallel_v2 as module
+    return module
+
+
+def benchmark_profile(module, profile, args):
+    """Scrape the whole mock portal under one profile and return a result dict"""
+    print(f"\n[BENCH] Profile '{profile}' ({args.layer} layer)")
+    server = start_mock_portal(licenses=args.licenses, latency=args.latency,
+                               fault_profile=profile if args.layer in ('server', 'both') else None)
+    scraper_options = {
+        'driver_profile': args.driver_profile,
+        'portal_url': server.url,
+        'fault_profile': profile if args.layer in ('driver', 'both') else None,
+    }
+    pages = list(range(1, math.ceil(args.licenses / DEFAULT_PAGE_SIZE) + 1))
+    sink_file = f"bench_faults_{profile}_{int(time.time())}.jsonl"
+
+    t0 = time.time()
+    try:
+        module.run_workers(pages, args.workers, args.mode, scraper_options, sink_file)
+        elapsed = time.time() - t0
+        licences = {record.get('เลขทะเบียนใบอนุญาต') for record in load_records(sink_file)}
+        licences.discard(None)
+    finally:
+        server.shutdown()
+        server.server_close()
+        if os.path.exists(sink_file):
+            os.remove(sink_file)
+
+    return {
+        'profile': profile,
+        'complete': len(licences),
+        'elapsed_s': elapsed,
+        'records_per_hour': len(licences) / elapsed * 3600 if elapsed else 0,
+        'completeness': len(licences) / args.licenses,
+        'server_faults': dict(server.faults.counts) if server.faults else {},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Records/hour and completeness under injected faults")
+    parser.add_argument('--scraper', choices=['production', 'distribution'], default='production')
+    parser.add_argument('--profiles', nargs='+', choices=list(FAULT_PROFILES), default=list(FAULT_PROFILES))
+    parser.add_argument('--layer', choices=['server', 'driver', 'both'], default='server',
+                        help="Inject faults in the mock portal, around the WebDriver, or both")
+    parser.add_argument('--licenses', type=int, default=60, help="Licences served by the mock portal")
+    parser.add_argument('--latency', type=float, default=0.05, help="Mock portal latency per request (s)")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--mode', choices=['process', 'thread'], default='thread')
+    parser.add_argument('--driver-profile', choices=DRIVER_PROFILES, default='fast')
+    args = parser.parse_args()
+
+    module = load_scraper_module(args.scraper)
+    results = [benchmark_profile(module, profile, args) for profile in args.profiles]
+
+    print("\n" + "="*78)
+    print(f"  FAULT PROFILE BENCHMARK ({args.licenses} licences, {args.workers} {args.mode} workers)")
+    print("="*78)
+    print(f"  {'Profile':<10}{'Complete':>10}{'Completeness':>14}{'Wall time':>12}{'Records/h':>12}  Server faults")
+    for r in results:
+        faults = ', '.join(f"{kind}={r['server_faults'][kind]}" for kind in FAULT_KINDS
+                           if r['server_faults'].get(kind)) or '-'
+        print(f"  {r['profile']:<10}{r['complete']:>10}{r['completeness']:>13.1%}{r['elapsed_s']:>11.1f}s"
+              f"{r['records_per_hour']:>12.0f}  {faults}")
+    print("="*78)
+
+
+if __name__ == '__main__':
+    main()
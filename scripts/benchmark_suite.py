@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark suite with per-commit history (asv-style, no extra dependencies)
+Times the offline stages of the pipeline on fixtures generated by erc_mock_portal:
+popup parse per record, flatten+save at several sizes, the pivots, the capacity split,
+validation and the rooftop JSON mapping.
+
+Results are stored as benchmark_results/<machine>/<commit>.json (<commit>.quick.json for
+--quick runs; machine-local, git-ignored) and compared with the run of the same mode of the
+closest ancestor commit that has one - HEAD itself when the tree is dirty; a benchmark whose
+time per unit grew by more than its threshold is a regression and makes the run exit with
+status 1.
+
+Usage:
+    python scripts/benchmark_suite.py
+    python scripts/benchmark_suite.py --quick
+    python scripts/benchmark_suite.py --bench pivot --baseline 93e02e1
+    python scripts/benchmark_suite.py --sizes 2000 20000 --no-save
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import scrape_erc_distribution_parallel_v2 as distribution
+from erc_mock_portal import MockDataset, render_detail_page
+from pivot_by_electricity_users import pivot_by_electricity_users
+from rooftop_scrape import map_rooftop_rows
+from validate_final_data import validate_final_data
+from pivot_by_machines import pivot_by_machines
+from split_capacity_column import split_capacity_column
+
+RESULTS_DIR = os.path.join(REPO_ROOT, 'benchmark_results')
+DEFAULT_SIZES = [2000, 20000, 200000]
+DEFAULT_THRESHOLD = 0.2
+
+
+class FixtureDriver:
+    """Stands in for the WebDriver: the detail page is already the current document"""
+
+    def __init__(self, html):
+        self.page_source = html
+
+
+def build_corpus(count):
+    """Detail pages of count mock distribution licences (every nested table is exercised)"""
+    dataset = MockDataset(licenses=count)
+    return [render_detail_page(dataset, 4, index) for index in range(count)]
+
+
+def parse_corpus(scraper, corpus):
+    return [scraper.extract_popup_data(FixtureDriver(html), in_popup=False) for html in corpus]
+
+
+def replicate(records, size):
+    """size records cycled from the parsed corpus, numbered like a real run"""
+    return [dict(records[i % len(records)], _record_number=i + 1) for i in range(size)]
+
+
+def latest_output(pattern):
+    return max(glob.glob(pattern), key=os.path.getmtime)
+
+
+def clean_outputs(*patterns):
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            os.remove(path)
+
+
+def define_benchmarks(args):
+    """Benchmark specs: name, units per run, unit name, setup() -> arg, run(arg), threshold, repeat"""
+    scraper = distribution.ERCLicenseScraper()
+    corpus = build_corpus(args.corpus)
+    records = parse_corpus(scraper, corpus)
+    base_size = min(args.sizes)
+
+    def flattened_input():
+        clean_outputs('BENCH_BASE_*')
+        distribution.save_data_to_files(replicate(records, base_size), 'BENCH_BASE')
+        return latest_output('BENCH_BASE_*.xlsx')
+
+    def machines_input():
+        return pivot_by_machines(flattened_input())[0]
+
+    def save(data):
+        distribution.save_data_to_files(data, 'BENCH_SAVE')
+        clean_outputs('BENCH_SAVE_*')
+
+    benchmarks = [{
+        'name': 'popup_parse',
+        'units': len(corpus), 'unit': 'record',
+        'setup': lambda: corpus,
+        'run': lambda pages: parse_corpus(scraper, pages),
+        'threshold': 0.25,
+    }]
+    for size in args.sizes:
+        benchmarks.append({
+            'name': f'flatten_save[{size}]',
+            'units': size, 'unit': 'record',
+            'setup': lambda size=size: replicate(records, size),
+            'run': save,
+            # Large saves take minutes; one run is enough to catch a regression
+            'repeat': 1 if size > 20000 else None,
+        })
+    benchmarks += [{
+        'name': f'pivot_by_electricity_users[{base_size}]',
+        'units': base_size, 'unit': 'licence',
+        'setup': flattened_input,
+        'run': pivot_by_electricity_users,
+    }, {
+        'name': f'pivot_by_machines[{base_size}]',
+        'units': base_size, 'unit': 'licence',
+        'setup': flattened_input,
+        'run': pivot_by_machines,
+    }, {
+        'name': f'split_capacity_column[{base_size}]',
+        'units': base_size, 'unit': 'licence',
+        'setup': machines_input,
+        'run': split_capacity_column,
+    }, {
+        'name': f'validate_final_data[{base_size}]',
+        'units': base_size, 'unit': 'licence',
+        'setup': flattened_input,
+        'run': validate_final_data,
+    }, {
+        'name': f'rooftop_mapping[{args.rooftop}]',
+        'units': args.rooftop, 'unit': 'record',
+        'setup': lambda: MockDataset(rooftop=args.rooftop).rooftop_rows(),
+        'run': map_rooftop_rows,
+    }]
+    return benchmarks
+
+
+def run_benchmark(bench, args):
+    """Time bench['run'] repeat times (scripts' console output is discarded); returns a result dict"""
+    repeat = bench.get('repeat') or args.repeat
+    with contextlib.redirect_stdout(io.StringIO()):
+        arg = bench['setup']()
+        timings = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            bench['run'](arg)
+            timings.append(time.perf_counter() - t0)
+    return {
+        'min_s': min(timings),
+        'median_s': statistics.median(timings),
+        'repeat': repeat,
+        'units': bench['units'],
+        'unit': bench['unit'],
+        'per_unit_s': min(timings) / bench['units'],
+        'threshold': args.threshold if args.threshold is not None else bench.get('threshold', DEFAULT_THRESHOLD),
+    }
+
+
+def git_commit():
+    """(short commit hash, working tree dirty) of the repository, or ('unknown', False)"""
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                         stderr=subprocess.DEVNULL, text=True).strip()
+        status = subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                         cwd=REPO_ROOT, stderr=subprocess.DEVNULL, text=True)
+        return commit, bool(status.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+
+def ancestor_commits(dirty):
+    """Full hashes of HEAD's ancestors, nearest first - from HEAD~1, or from HEAD for a dirty tree"""
+    try:
+        return subprocess.check_output(['git', 'rev-list', 'HEAD' if dirty else 'HEAD~1'], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).split()
+    except (OSError, subprocess.CalledProcessError):
+        return []
+
+
+def results_path(machine_dir, commit, quick):
+    """File of a commit's run - quick runs are kept apart, their sizes are not comparable"""
+    return os.path.join(machine_dir, f"{commit}.quick.json" if quick else f"{commit}.json")
+
+
+def load_baseline(machine_dir, dirty, baseline, quick):
+    """Results to compare with: --baseline (commit or file), else the closest ancestor's run of the
+    same mode (or None)"""
+    if baseline:
+        path = baseline if os.path.isfile(baseline) else results_path(machine_dir, baseline, quick)
+        with open(path, encoding='utf-8') as f:
+            run = json.load(f)
+        if run.get('quick', False) != quick:
+            sys.exit(f"[BENCH] {baseline} is a {'quick' if run.get('quick') else 'full'} run - "
+                     f"compare {'--quick' if quick else 'full'} runs with runs of the same mode")
+        return run
+
+    # Runs are named by short hash (plus .quick)
+    suffix = '.quick.json' if quick else '.json'
+    saved = {os.path.basename(path)[:-len(suffix)]: path
+             for path in glob.glob(os.path.join(machine_dir, '*' + suffix))}
+    saved = {short_hash: path for short_hash, path in saved.items() if '.' not in short_hash}
+    for full_hash in ancestor_commits(dirty) if saved else []:
+        for short_hash, path in saved.items():
+            if full_hash.startswith(short_hash):
+                with open(path, encoding='utf-8') as f:
+                    run = json.load(f)
+                # Quick runs saved before the split share the full runs' names
+                if run.get('quick', False) == quick:
+                    return run
+    return None
+
+
+def compare(results, baseline):
+    """Print the results table; returns the names of the regressed benchmarks"""
+    regressions = []
+    previous = baseline['results'] if baseline else {}
+
+    print("\n" + "="*92)
+    print(f"  BENCHMARK SUITE" + (f" (vs {baseline['commit']})" if baseline else " (no baseline)"))
+    print("="*92)
+    print(f"  {'Benchmark':<36}{'Min':>10}{'Per unit':>14}{'Units/s':>12}{'Change':>10}  Status")
+    for name, r in results.items():
+        change, status = '', ''
+        if name in previous:
+            ratio = r['per_unit_s'] / previous[name]['per_unit_s'] - 1
+            change = f"{ratio:+.1%}"
+            if ratio > r['threshold']:
+                status = f"REGRESSION (>{r['threshold']:.0%})"
+                regressions.append(name)
+            elif ratio < -r['threshold']:
+                status = 'improved'
+        print(f"  {name:<36}{r['min_s']:>9.3f}s{r['per_unit_s'] * 1000:>11.3f}ms"
+              f"{1 / r['per_unit_s']:>12.0f}{change:>10}  {status}")
+    print("="*92)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmarks with per-commit regression tracking")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Record counts for flatten+save (the smallest also sizes the pivot/validation input)")
+    parser.add_argument('--corpus', type=int, default=300, help="Detail pages in the popup parse fixture corpus")
+    parser.add_argument('--rooftop', type=int, default=20000, help="Rooftop API rows to map")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per benchmark (the minimum is kept)")
+    parser.add_argument('--threshold', type=float, default=None,
+                        help="Allowed slowdown per unit for every benchmark (default: per benchmark, 0.2)")
+    parser.add_argument('--bench', nargs='+', default=None, help="Only run benchmarks whose name contains one of these")
+    parser.add_argument('--baseline', default=None, help="Commit (or results file) to compare with")
+    parser.add_argument('--quick', action='store_true', help="Small sizes and one run each, for a smoke test")
+    parser.add_argument('--no-save', action='store_true', help="Do not store this run's results")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.sizes, args.corpus, args.rooftop, args.repeat = [200, 2000], 50, 2000, 1
+
+    commit, dirty = git_commit()
+    machine_dir = os.path.join(RESULTS_DIR, platform.node() or 'unknown')
+    print(f"[BENCH] Commit {commit}{' (dirty)' if dirty else ''} on {platform.node()}")
+
+    # Scripts write their outputs to the current directory - keep them out of the repo
+    work_dir = tempfile.mkdtemp(prefix='erc_bench_')
+    os.chdir(work_dir)
+    results = {}
+    try:
+        benchmarks = define_benchmarks(args)
+        for bench in benchmarks:
+            if args.bench and not any(pattern in bench['name'] for pattern in args.bench):
+                continue
+            print(f"[BENCH] {bench['name']}...", flush=True)
+            results[bench['name']] = run_benchmark(bench, args)
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    baseline = (load_baseline(machine_dir, dirty, args.baseline, args.quick)
+                if os.path.isdir(machine_dir) or args.baseline else None)
+    regressions = compare(results, baseline)
+
+    if not args.no_save:
+        os.makedirs(machine_dir, exist_ok=True)
+        path = results_path(machine_dir, commit, args.quick)
+        run = {
+            'commit': commit,
+            'dirty': dirty,
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'machine': platform.node(),
+            'python': platform.python_version(),
+            'quick': args.quick,
+            'results': results,
+        }
+        # Merge with an earlier run of the same commit (e.g. a --bench subset)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                run['results'] = dict(json.load(f).get('results', {}), **results)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+        print(f"[BENCH] Results saved: {os.path.relpath(path, REPO_ROOT)}")
+
+    if regressions:
+        print(f"[BENCH] {len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Distributed V2 scraping: a lease coordinator and scraper agents on any number of machines
+The coordinator keeps page leases and reported records in one SQLite file (see erc_coordinator).
+Agents lease a page, scrape it with ERCLicenseScraper.scrape_page, renew the lease while they
+work and post the page's records back; pages of dead agents return to the pool when their
+lease expires. Agents reach the coordinator over HTTP, or open the SQLite file directly
+when it sits on a shared mount.
+
+Usage:
+    # coordinator host (exports to Excel/CSV once every page is done or failed)
+    python scripts/coordinate_agents.py serve --db erc_run.db --pages 1-133 --host 0.0.0.0 --port 8770
+    # each scraping machine (one browser per agent - start several for more)
+    python scripts/coordinate_agents.py agent --coordinator http://coordinator-host:8770 --driver-profile fast
+    python scripts/coordinate_agents.py agent --coordinator /mnt/shared/erc_run.db
+    # everything on one box, e.g. against erc_mock_portal
+    python scripts/coordinate_agents.py local --agents 3 --pages 1-20 --portal-url http://127.0.0.1:8765
+    python scripts/coordinate_agents.py status --coordinator http://coordinator-host:8770
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from erc_coordinator import LeaseStore, open_coordinator, run_agent, start_coordinator
+from erc_driver import DRIVER_PROFILES
+from erc_events import EventLog
+from erc_faults import FAULT_PROFILES
+from erc_timing import save_timing_summary
+
+
+def load_scraper_module(name):
+    """Import the parallel V2 scraper module for the given license type"""
+    if name == 'distribution':
+        import scrape_erc_distribution_parallel_v2 as module
+    else:
+        import scrape_erc_production_parallel_v2 as module
+    return module
+
+
+def scraper_options(module, args):
+    """ERCLicenseScraper keyword arguments from the agent options"""
+    return {
+        'driver_profile': args.driver_profile,
+        'extract_mode': args.extract,
+        'detail_mode': args.detail_mode,
+        'page_size': module.page_size_arg(args.page_size) if args.page_size else None,
+        'portal_url': args.portal_url,
+        'fault_profile': args.fault_profile,
+        'metrics_dir': args.metrics_dir,
+        'events_dir': args.events_dir,
+        'spare_driver': args.spare_driver,
+        'recycle_rss_mb': args.recycle_rss_mb,
+        'recycle_every': args.recycle_every,
+    }
+
+
+def resolve_pages(module, args):
+    """The page list to register: --pages, or every page of a detected grid"""
+    if args.pages:
+        return module.page_list_arg(args.pages)
+    print("[COORDINATOR] Detecting total pages...")
+    detected = module.detect_total_pages({'driver_profile': args.driver_profile, 'portal_url': args.portal_url,
+                                          'page_size': module.page_size_arg(args.page_size) if args.page_size else None})
+    if not detected:
+        return None
+    return list(range(1, detected[0] + 1))
+
+
+def wait_until_finished(store, poll_interval, processes=()):
+    """Print progress until no page is pending or leased (or every local agent has exited)"""
+    while True:
+        status = store.status()
+        print(f"[COORDINATOR] {status['done']} done, {status['leased']} leased, {status['pending']} pending, "
+              f"{status['failed']} failed - {len(status['agents'])} active agents")
+        if status['finished']:
+            return status
+        if processes and all(process.poll() is not None for process in processes):
+            print("[COORDINATOR] Every agent has exited with pages left")
+            return status
+        time.sleep(poll_interval)
+
+
+def export(module, store, no_export):
+    records = store.records()
+    print(f"[COORDINATOR] {len(records)} records in {store.path}")
+    if not no_export and records:
+        module.save_data_to_files(records, module.OUTPUT_PREFIX)
+        save_timing_summary(records, module.OUTPUT_PREFIX)
+
+
+def cmd_serve(module, args):
+    store = LeaseStore(args.db, max_attempts=args.max_page_attempts)
+    pages = resolve_pages(module, args)
+    if pages is None:
+        print("[ERROR] Could not detect total pages")
+        return
+    store.add_pages(pages)
+    server = start_coordinator(store, args.host, args.port)
+    try:
+        wait_until_finished(store, args.poll_interval)
+    except KeyboardInterrupt:
+        print("\n[COORDINATOR] Interrupted - leases stay in the database, serve again to resume")
+        return
+    finally:
+        server.shutdown()
+    export(module, store, args.no_export)
+
+
+def cmd_agent(module, args):
+    coordinator = open_coordinator(args.coordinator)
+    run_agent(module, coordinator, scraper_options(module, args), agent=args.agent, worker_id=args.worker_id,
+              lease_s=args.lease)
+
+
+def cmd_status(module, args):
+    status = open_coordinator(args.coordinator).status()
+    print(f"{status['done']} done, {status['leased']} leased, {status['pending']} pending, {status['failed']} failed")
+    for agent in status['agents']:
+        print(f"  active: {agent}")
+
+
+def cmd_local(module, args):
+    run_name = f"{module.OUTPUT_PREFIX}_AGENTS_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    db = args.db or f"{run_name}.db"
+    events_dir = args.events_dir or f"{os.path.splitext(db)[0]}_events"
+    store = LeaseStore(db, max_attempts=args.max_page_attempts)
+    pages = resolve_pages(module, args)
+    if pages is None:
+        print("[ERROR] Could not detect total pages")
+        return
+    store.add_pages(pages)
+    server = start_coordinator(store, '127.0.0.1', args.port)
+
+    run_events = EventLog('main', events_dir)
+    run_events.emit('run_start', total_pages=len(pages), first_page=pages[0], last_page=pages[-1],
+                    rows_per_page=int(args.page_size) if (args.page_size or '').isdigit() else module.DEFAULT_PAGE_SIZE,
+                    workers=args.agents, sink_file=db)
+
+    command = [sys.executable, os.path.abspath(__file__), '--scraper', args.scraper, 'agent',
+               '--coordinator', server.url, '--lease', str(args.lease), '--events-dir', events_dir,
+               '--driver-profile', args.driver_profile, '--extract', args.extract, '--detail-mode', args.detail_mode]
+    for option, value in [('--page-size', args.page_size), ('--portal-url', args.portal_url),
+                          ('--fault-profile', args.fault_profile), ('--metrics-dir', args.metrics_dir),
+                          ('--recycle-rss-mb', args.recycle_rss_mb), ('--recycle-every', args.recycle_every)]:
+        if value is not None:
+            command += [option, str(value)]
+    if args.spare_driver:
+        command.append('--spare-driver')
+
+    print(f"[COORDINATOR] {len(pages)} pages, {args.agents} local agents, database {db}")
+    start_time = time.time()
+    processes = []
+    try:
+        for i in range(args.agents):
+            log_file = open(f"{os.path.splitext(db)[0]}_agent_{i}.log", 'w', encoding='utf-8')
+            processes.append(subprocess.Popen(command + ['--worker-id', str(i), '--agent', f"local-{i}"],
+                                              stdout=log_file, stderr=subprocess.STDOUT, cwd=REPO_ROOT))
+            log_file.close()
+        wait_until_finished(store, args.poll_interval, processes)
+    except KeyboardInterrupt:
+        print("\n[COORDINATOR] Interrupted - stopping agents")
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        server.shutdown()
+
+    elapsed = time.time() - start_time
+    run_events.emit('run_finish', records=len(store.records()), elapsed_s=round(elapsed, 1))
+    run_events.close()
+    print(f"[COMPLETE] {elapsed/60:.1f} min")
+    export(module, store, args.no_export)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lease coordinator and scraper agents for distributed V2 runs")
+    parser.add_argument('--scraper', choices=['production', 'distribution'], default='production')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help="Register pages and serve leases over HTTP")
+    local = commands.add_parser('local', help="Coordinator plus several agents on this machine")
+    agent = commands.add_parser('agent', help="Scrape leased pages with one browser")
+    status = commands.add_parser('status', help="Page counts of a running coordinator")
+
+    for sub in (serve, local):
+        sub.add_argument('--db', default=None if sub is local else 'erc_coordinator.db',
+                         help="SQLite file holding leases and records")
+        sub.add_argument('--pages', default=None, help="Pages to scrape, e.g. 1-133 (default: detect all)")
+        sub.add_argument('--port', type=int, default=8770 if sub is serve else 0)
+        sub.add_argument('--max-page-attempts', type=int, default=3,
+                         help="Give up on a page after this many leases")
+        sub.add_argument('--poll-interval', type=float, default=30, help="Seconds between progress lines")
+        sub.add_argument('--no-export', action='store_true',
+                         help="Leave the records in the database (no Excel/CSV/timings export)")
+    serve.add_argument('--host', default='127.0.0.1', help="Interface to listen on (0.0.0.0 for other machines)")
+    local.add_argument('--agents', type=int, default=3, help="Agent processes to start (one browser each)")
+
+    agent.add_argument('--coordinator', required=True, help="http://host:port of a coordinator, or its SQLite file")
+    agent.add_argument('--agent', default=None, help="Agent id (default: hostname-pid)")
+    agent.add_argument('--worker-id', type=int, default=0, help="Worker id for logs, events and the Chrome profile")
+    status.add_argument('--coordinator', required=True)
+
+    for sub in (local, agent):
+        sub.add_argument('--lease', type=float, default=600,
+                         help="Lease length in seconds; a dead agent's page is reassigned after this")
+        sub.add_argument('--metrics-dir', default=None)
+        sub.add_argument('--events-dir', default=None)
+        sub.add_argument('--spare-driver', action='store_true',
+                         help="Keep a second warm browser per agent to replace a crashed one immediately")
+        sub.add_argument('--recycle-rss-mb', type=int, default=None,
+                         help="Replace the browser between rows above this Chrome RSS")
+        sub.add_argument('--recycle-every', type=int, default=None, help="Replace the browser after this many rows")
+    for sub in (serve, local, agent):
+        sub.add_argument('--driver-profile', choices=DRIVER_PROFILES, default='default')
+        sub.add_argument('--extract', choices=['html', 'js'], default='html')
+        sub.add_argument('--detail-mode', choices=['popup', 'tab'], default='popup')
+        sub.add_argument('--page-size', default=None, help="A row count (every agent must use the same size)")
+        sub.add_argument('--portal-url', default=None)
+        sub.add_argument('--fault-profile', choices=list(FAULT_PROFILES), default=None)
+    args = parser.parse_args()
+
+    module = load_scraper_module(args.scraper)
+    {'serve': cmd_serve, 'local': cmd_local, 'agent': cmd_agent, 'status': cmd_status}[args.command](module, args)
+
+
+if __name__ == '__main__':
+    main()
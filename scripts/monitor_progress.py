@@ -1,83 +1,237 @@
 """
 Monitor scraping progress and report completion
+Tails the per-worker JSONL event logs of the V2 scrapers (see erc_events): each check reads
+only the bytes appended since the last one, and progress, throughput, ETA and stalls are
+computed from the totals the scrapers report. Any number of runs and workers can be followed;
+plain-text logs of the legacy batch scrapers (counted by '[OK]') are supported too.
+
+Usage:
+    python scripts/monitor_progress.py                                  # newest *_events directory here
+    python scripts/monitor_progress.py RUN_A_events RUN_B_events --interval 30
+    python scripts/monitor_progress.py --log batch_1_33.log:1-33 --log batch_34_66.log:34-66
 """
-import time
+import argparse
+import glob
 import os
+import sys
+import time
 from datetime import datetime
 
-workers = [
-    ("batch_1_33.log", 1, 33, 495),
-    ("batch_34_66.log", 34, 66, 495),
-    ("batch_67_99.log", 67, 99, 495),
-    ("batch_100_133.log", 100, 133, 510)
-]
-
-print("\n" + "="*70)
-print("  SCRAPING PROGRESS MONITOR")
-print("="*70)
-print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-
-completed = set()
-last_progress = {}
-
-while len(completed) < 4:
-    time.sleep(60)  # Check every minute
-
-    print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Progress Update:")
-    print("-" * 70)
-
-    for log_file, start_page, end_page, expected_records in workers:
-        worker_num = workers.index((log_file, start_page, end_page, expected_records)) + 1
-
-        if log_file in completed:
-            print(f"Worker {worker_num} (Pages {start_page}-{end_page}): COMPLETE ✓")
-            continue
-
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from erc_events import EventTailer
+
+
+class WorkerProgress:
+    """Counters of one worker, updated from its events"""
+
+    def __init__(self, name):
+        self.name = name
+        self.records = 0
+        self.failed = 0
+        self.pages_done = 0
+        self.current_page = None
+        self.first_ts = None
+        self.last_ts = None
+        self.finished = False
+
+    def seen(self, ts):
+        self.first_ts = self.first_ts or ts
+        self.last_ts = ts
+
+    def rate_per_hour(self):
+        if not self.first_ts or self.last_ts <= self.first_ts:
+            return 0.0
+        return self.records / (self.last_ts - self.first_ts) * 3600
+
+
+class EventRun:
+    """One scraper run: the worker_*.jsonl files of an events directory"""
+
+    def __init__(self, events_dir):
+        self.label = events_dir
+        self.events_dir = events_dir
+        self.tailers = {}
+        self.workers = {}
+        self.total_pages = None
+        self.rows_per_page = None
+        self.page_rows = {}
+        self.finished = False
+
+    def poll(self):
+        for path in sorted(glob.glob(os.path.join(self.events_dir, 'worker_*.jsonl'))):
+            tailer = self.tailers.setdefault(path, EventTailer(path))
+            for event in tailer.poll():
+                self.apply(event)
+
+    def apply(self, event):
+        kind = event.get('event')
+        if kind == 'run_start':
+            self.total_pages = event['total_pages']
+            self.rows_per_page = event['rows_per_page']
+            return
+        if kind == 'run_finish':
+            self.finished = True
+            return
+
+        worker = self.workers.setdefault(event['worker'], WorkerProgress(f"Worker {event['worker']}"))
+        worker.seen(event['ts'])
+        if kind == 'page_start':
+            worker.current_page = event['page']
+            self.page_rows[event['page']] = event['rows']
+        elif kind == 'record':
+            if event['status'] == 'OK':
+                worker.records += 1
+            else:
+                worker.failed += 1
+        elif kind == 'page_done':
+            worker.pages_done += 1
+            if event.get('reused'):
+                worker.records += event.get('records', 0)
+        elif kind == 'worker_finish':
+            worker.finished = True
+
+    def expected(self):
+        """Rows reported by started pages plus a full page for every page not started yet"""
+        if self.total_pages is None:
+            return None
+        return sum(self.page_rows.values()) + (self.total_pages - len(self.page_rows)) * self.rows_per_page
+
+
+class TextLogRun:
+    """A legacy batch scraper log covering a fixed page range"""
+
+    def __init__(self, path, start_page, end_page, page_size):
+        self.label = f"{path} (pages {start_page}-{end_page})"
+        self.path = path
+        self.offset = 0
+        self._partial = b''
+        self.workers = {path: WorkerProgress(os.path.basename(path))}
+        self.start_page = start_page
+        self.total_records = (end_page - start_page + 1) * page_size
+        self.page_size = page_size
+        self.finished = False
+
+    def poll(self):
         try:
-            # Count records extracted
-            with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                extracted_count = content.count('[OK]')
-
-            # Check if completed
-            if 'COMPLETE' in content or 'SUCCESS' in content:
-                completed.add(log_file)
-                print(f"Worker {worker_num} (Pages {start_page}-{end_page}): COMPLETE ✓ ({extracted_count} records)")
-                continue
-
-            # Calculate progress
-            progress_pct = (extracted_count / expected_records * 100) if expected_records > 0 else 0
-            current_page = start_page + (extracted_count // 15)
-
-            # Show progress
-            status = f"{extracted_count}/{expected_records} records ({progress_pct:.1f}%)"
-            print(f"Worker {worker_num} (Pages {start_page}-{end_page}): Page ~{current_page} - {status}")
-
-            # Check if stalled
-            if log_file in last_progress and last_progress[log_file] == extracted_count:
-                print(f"         WARNING: No progress in last minute!")
-
-            last_progress[log_file] = extracted_count
-
-        except FileNotFoundError:
-            print(f"Worker {worker_num} (Pages {start_page}-{end_page}): NOT STARTED")
-        except Exception as e:
-            print(f"Worker {worker_num} (Pages {start_page}-{end_page}): ERROR - {e}")
-
-    if len(completed) > 0:
-        print(f"\nCompleted: {len(completed)}/4 workers")
-
-print("\n" + "="*70)
-print("  ALL WORKERS COMPLETE!")
-print(f"  Finished: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-print("="*70)
-
-# List output files
-print("\nOutput files:")
-for f in os.listdir('.'):
-    if f.startswith('batch_pages_') and (f.endswith('.xlsx') or f.endswith('.csv')):
-        size = os.path.getsize(f) / 1024 / 1024  # MB
-        print(f"  {f} ({size:.2f} MB)")
-
-print("\nAll data extracted successfully!")
-print("You can now merge the Excel files if needed.\n")
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                chunk = f.read()
+        except OSError:
+            return
+        self.offset += len(chunk)
+        lines = (self._partial + chunk).split(b'\n')
+        self._partial = lines.pop()
+
+        worker = self.workers[self.path]
+        new_records = sum(line.count(b'[OK]') for line in lines)
+        if new_records:
+            worker.records += new_records
+            worker.seen(time.time())
+            worker.current_page = self.start_page + worker.records // self.page_size
+        if any(b'COMPLETE' in line or b'SUCCESS' in line for line in lines):
+            worker.finished = self.finished = True
+
+    def expected(self):
+        return self.total_records
+
+
+def log_source(value):
+    """FILE:START-END for a legacy batch log"""
+    try:
+        path, pages = value.rsplit(':', 1)
+        start, end = (int(p) for p in pages.split('-'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected FILE:START-END, got {value!r}")
+    return path, start, end
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return '-'
+    hours, rest = divmod(int(seconds), 3600)
+    return f"{hours}h{rest // 60:02d}m"
+
+
+def report(runs, previous, interval, stall_after):
+    """Print one progress update; previous maps (run, worker) to its record count at the last update"""
+    now = time.time()
+    print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Progress Update:")
+    print("-" * 78)
+
+    for run in runs:
+        records = sum(w.records for w in run.workers.values())
+        expected = run.expected()
+        recent = sum(w.records - previous.get((run.label, name), 0) for name, w in run.workers.items())
+        rate = recent / interval * 3600
+        remaining = max(expected - records, 0) if expected else None
+        eta = remaining / rate * 3600 if remaining is not None and rate > 0 else None
+        status = 'COMPLETE' if run.finished else f"ETA {format_eta(eta)}"
+        total = f"{records}/{expected} ({records / expected:.1%})" if expected else f"{records}/?"
+        print(f"{run.label}: {total} records, {rate:.0f}/h now - {status}")
+
+        for name, worker in sorted(run.workers.items(), key=lambda item: str(item[0])):
+            previous[(run.label, name)] = worker.records
+            if worker.finished or run.finished:
+                state = 'done'
+            elif worker.last_ts and now - worker.last_ts > stall_after:
+                state = f"WARNING: no activity for {(now - worker.last_ts) / 60:.1f} min"
+            else:
+                state = f"page {worker.current_page}" if worker.current_page else 'starting'
+            print(f"  {worker.name:<18}{worker.records:>7} ok{worker.failed:>5} failed"
+                  f"{worker.pages_done:>6} pages{worker.rate_per_hour():>9.0f}/h  {state}")
+
+
+def newest_events_dir():
+    dirs = [d for d in glob.glob('*_events') if os.path.isdir(d)]
+    return max(dirs, key=os.path.getmtime) if dirs else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monitor scraping progress")
+    parser.add_argument('events_dirs', nargs='*',
+                        help="Event log directories of V2 runs (default: the newest *_events directory here)")
+    parser.add_argument('--log', type=log_source, action='append', default=[],
+                        help="Legacy batch log as FILE:START-END (repeatable)")
+    parser.add_argument('--page-size', type=int, default=15,
+                        help="Grid rows per page of legacy batch logs")
+    parser.add_argument('--interval', type=float, default=60, help="Seconds between updates")
+    parser.add_argument('--stall-after', type=float, default=300,
+                        help="Warn when a worker has logged nothing for this many seconds")
+    args = parser.parse_args()
+
+    runs = [EventRun(d) for d in args.events_dirs]
+    runs += [TextLogRun(path, start, end, args.page_size) for path, start, end in args.log]
+    if not runs:
+        events_dir = newest_events_dir()
+        if not events_dir:
+            parser.error("no *_events directory here - pass event directories or --log FILE:START-END")
+        runs = [EventRun(events_dir)]
+
+    print("\n" + "="*70)
+    print("  SCRAPING PROGRESS MONITOR")
+    print("="*70)
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Following: {', '.join(run.label for run in runs)}")
+
+    # Rates are measured from here on, not over what was already logged
+    previous = {}
+    for run in runs:
+        run.poll()
+        previous.update({(run.label, name): w.records for name, w in run.workers.items()})
+    while True:
+        time.sleep(args.interval)
+        for run in runs:
+            run.poll()
+        report(runs, previous, args.interval, args.stall_after)
+        if all(run.finished for run in runs):
+            break
+
+    print("\n" + "="*70)
+    print("  ALL RUNS COMPLETE!")
+    print(f"  Finished: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    main()
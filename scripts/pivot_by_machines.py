@@ -8,7 +8,10 @@ import numpy as np
 from datetime import datetime
 import re
 
-def pivot_by_machines():
+DEFAULT_INPUT_FILE = "ERC_Licenses_COMPLETE_ALL_PAGES_20260213_085640.xlsx"
+
+
+def pivot_by_machines(input_file=DEFAULT_INPUT_FILE):
     """Transform data so each row represents one machine"""
 
     print("="*70)
@@ -17,7 +20,6 @@ def pivot_by_machines():
     print("="*70)
 
     # Read the complete dataset
-    input_file = "ERC_Licenses_COMPLETE_ALL_PAGES_20260213_085640.xlsx"
     print(f"\n[1] Reading input file...")
     print(f"  File: {input_file}")
 
@@ -158,4 +160,5 @@ def pivot_by_machines():
     return output_excel, output_csv
 
 if __name__ == '__main__':
-    pivot_by_machines()
+    import sys
+    pivot_by_machines(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_INPUT_FILE)
@@ -8,7 +8,10 @@ import pandas as pd
 import re
 from datetime import datetime
 
-def split_capacity_column():
+DEFAULT_INPUT_FILE = "ERC_Licenses_PIVOTED_BY_MACHINES_20260213_090442.xlsx"
+
+
+def split_capacity_column(input_file=DEFAULT_INPUT_FILE):
     """Extract number and unit from capacity column"""
 
     print("="*70)
@@ -16,7 +19,6 @@ def split_capacity_column():
     print("="*70)
 
     # Read the pivoted file
-    input_file = "ERC_Licenses_PIVOTED_BY_MACHINES_20260213_090442.xlsx"
     print(f"\n[1] Reading input file...")
     print(f"  File: {input_file}")
 
@@ -128,4 +130,5 @@ def split_capacity_column():
     return output_excel, output_csv
 
 if __name__ == '__main__':
-    split_capacity_column()
+    import sys
+    split_capacity_column(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_INPUT_FILE)
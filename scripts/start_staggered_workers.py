@@ -1,9 +1,14 @@
 """
 Start workers with staggered delays to avoid Chrome conflicts
+Fixed page ranges, no supervision - supervise_workers.py partitions pages and restarts workers
 """
 import subprocess
 import time
 import sys
+import os
+
+# batch_scraper.py lives next to this script
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 workers = [
     (34, 66, "Worker 2"),
@@ -24,7 +29,7 @@ for start, end, name in workers:
         [sys.executable, "batch_scraper.py", str(start), str(end)],
         stdout=open(log_file, 'w'),
         stderr=subprocess.STDOUT,
-        cwd=r"D:\workspace\banpu"
+        cwd=SCRIPT_DIR
     )
 
     print(f"[{time.strftime('%H:%M:%S')}] {name} started, waiting 60 seconds before next...\n")
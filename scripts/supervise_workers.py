@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Supervise single-browser V2 scraper processes over the page range
+Replaces the fixed ranges and 60 s gaps of start_staggered_workers.py: pages are handed out
+in chunks sized from each worker's measured throughput (guided self-scheduling - chunks shrink
+as the work runs out, so workers finish together), a worker is only launched once the previous
+one reported ready, and dead or stalled workers are killed and their unfinished pages reassigned.
+
+Heartbeats and readiness come from each worker's event log (see erc_events); the records of
+every chunk are merged and exported once at the end.
+
+Usage:
+    python scripts/supervise_workers.py --workers 4
+    python scripts/supervise_workers.py --scraper distribution --workers 6 --pages 1-120 --driver-profile fast
+    python scripts/supervise_workers.py --workers 3 --portal-url http://127.0.0.1:8765 --stall-after 120
+"""
+import argparse
+import itertools
+import math
+import os
+import signal
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from erc_driver import DRIVER_PROFILES
+from erc_events import EventTailer
+from erc_faults import FAULT_PROFILES
+from erc_result_sink import load_records
+from erc_timing import save_timing_summary
+
+
+def load_scraper_module(name):
+    """Import the parallel V2 scraper module for the given license type"""
+    if name == 'distribution':
+        import scrape_erc_distribution_parallel_v2 as module
+    else:
+        import scrape_erc_production_parallel_v2 as module
+    return module
+
+
+class WorkerSlot:
+    """One scraper process working through one chunk of pages"""
+
+    def __init__(self, slot_id, chunk_id, pages, command, run_dir):
+        self.slot_id = slot_id
+        self.pages = pages
+        name = f"chunk_{chunk_id:03d}"
+        self.sink_file = os.path.join(run_dir, f"{name}.jsonl")
+        self.events_dir = os.path.join(run_dir, f"{name}_events")
+        self.log_file = os.path.join(run_dir, f"{name}.log")
+        self.tailer = EventTailer(os.path.join(self.events_dir, 'worker_0.jsonl'))
+        self.done_pages = set()
+        self.failed_pages = set()
+        self.launched = time.time()
+        self.ready_at = None
+        self.heartbeat = self.launched
+
+        with open(self.log_file, 'w', encoding='utf-8') as log:
+            self.process = subprocess.Popen(
+                command + ['--pages', self.page_spec(), '--output', self.sink_file, '--events-dir', self.events_dir],
+                stdout=log, stderr=subprocess.STDOUT, cwd=REPO_ROOT,
+                # Own process group, so a kill also takes its chromedriver and Chrome processes
+                start_new_session=True,
+            )
+
+    def page_spec(self):
+        return ','.join(map(str, self.pages))
+
+    def poll(self):
+        """Apply new events; heartbeat is the time of the latest one"""
+        for event in self.tailer.poll():
+            self.heartbeat = max(self.heartbeat, event['ts'])
+            kind = event.get('event')
+            if kind == 'worker_ready':
+                self.ready_at = event['ts']
+            elif kind == 'page_done':
+                self.done_pages.add(event['page'])
+            elif kind == 'page_failed':
+                self.failed_pages.add(event['page'])
+
+    def pages_per_second(self):
+        """Measured throughput since the browser became ready (None before the first page)"""
+        if not self.ready_at or not self.done_pages:
+            return None
+        return len(self.done_pages) / max(time.time() - self.ready_at, 1e-6)
+
+    def remaining_pages(self):
+        return [page for page in self.pages if page not in self.done_pages]
+
+    def stop(self):
+        """SIGTERM the worker (it quits its browser); after 15 s kill its whole process group"""
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                pass
+        try:
+            # Browsers left behind by a worker that died or had to be killed
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        self.process.wait()
+
+
+class Supervisor:
+    """Chunked page scheduler over at most `workers` concurrent scraper processes"""
+
+    def __init__(self, pages, workers, command, run_dir, stall_after=300, ready_timeout=180,
+                 max_page_attempts=3, poll_interval=2.0):
+        self.pending = sorted(pages)
+        self.workers = workers
+        self.command = command
+        self.run_dir = run_dir
+        self.stall_after = stall_after
+        self.ready_timeout = ready_timeout
+        self.max_page_attempts = max_page_attempts
+        self.poll_interval = poll_interval
+        self.slots = {}
+        self.finished_slots = []
+        self.rates = {}
+        self.attempts = {}
+        self.abandoned = []
+        self.restarts = 0
+        self.chunk_ids = itertools.count(1)
+
+    def chunk_size(self, slot_id):
+        """Guided self-scheduling weighted by the slot's share of the measured throughput"""
+        known = [rate for rate in self.rates.values() if rate]
+        if self.rates.get(slot_id) and known:
+            share = self.rates[slot_id] / (sum(known) + self.rates[slot_id] * (self.workers - len(known)))
+        else:
+            share = 1 / self.workers
+        return max(1, math.ceil(len(self.pending) * share / 2))
+
+    def launch(self, slot_id):
+        size = self.chunk_size(slot_id)
+        pages, self.pending = self.pending[:size], self.pending[size:]
+        for page in pages:
+            self.attempts[page] = self.attempts.get(page, 0) + 1
+        slot = WorkerSlot(slot_id, next(self.chunk_ids), pages, self.command, self.run_dir)
+        self.slots[slot_id] = slot
+        print(f"[SUPERVISOR] Slot {slot_id}: pages {slot.page_spec()} ({len(pages)} pages, {len(self.pending)} left)")
+
+    def requeue(self, slot, reason):
+        """Put a finished/killed chunk's unfinished (and failed) pages back on the queue"""
+        # A page that failed once and was then completed on a retry is not scraped again
+        retry = sorted((set(slot.remaining_pages()) | slot.failed_pages) - slot.done_pages)
+        requeued = [page for page in retry if self.attempts.get(page, 0) < self.max_page_attempts]
+        self.abandoned += [page for page in retry if page not in requeued]
+        if requeued:
+            self.pending = sorted(self.pending + requeued)
+            print(f"[SUPERVISOR] Slot {slot.slot_id} {reason}: reassigning {len(requeued)} pages")
+
+    def check(self, slot_id, slot):
+        """Retire the slot's process if it exited, died or stalled; True when the slot is free"""
+        slot.poll()
+        rate = slot.pages_per_second()
+        if rate:
+            self.rates[slot_id] = rate
+
+        now = time.time()
+        exit_code = slot.process.poll()
+        if exit_code is None:
+            if slot.ready_at is None and now - slot.launched > self.ready_timeout:
+                reason = f"not ready after {self.ready_timeout:.0f}s"
+            elif slot.ready_at is not None and now - slot.heartbeat > self.stall_after:
+                reason = f"stalled ({now - slot.heartbeat:.0f}s without a heartbeat)"
+            else:
+                return False
+            slot.stop()
+            slot.poll()
+            self.restarts += 1
+        elif exit_code != 0:
+            reason = f"died (exit code {exit_code})"
+            self.restarts += 1
+        elif slot.remaining_pages() or slot.failed_pages - slot.done_pages:
+            reason = "finished with pages left"
+        else:
+            reason = None
+
+        if reason:
+            self.requeue(slot, reason)
+        self.finished_slots.append(slot)
+        del self.slots[slot_id]
+        return True
+
+    def run(self):
+        """Schedule until every page is done or abandoned; returns the retired slots"""
+        while self.pending or self.slots:
+            for slot_id in list(self.slots):
+                self.check(slot_id, self.slots[slot_id])
+
+            # Readiness-gated start: only one browser may be starting at a time
+            starting = any(slot.ready_at is None for slot in self.slots.values())
+            free = [slot_id for slot_id in range(self.workers) if slot_id not in self.slots]
+            if self.pending and free and not starting:
+                self.launch(free[0])
+                continue
+
+            time.sleep(self.poll_interval)
+        return self.finished_slots
+
+
+def scraper_command(module, args):
+    """Command line of one single-browser scraper process (without its pages/output)"""
+    command = [sys.executable, os.path.abspath(module.__file__), '--workers', '1', '--mode', 'thread',
+               '--no-export', '--driver-profile', args.driver_profile, '--extract', args.extract,
+               '--detail-mode', args.detail_mode, '--tabs', str(args.tabs)]
+    for option, value in [('--page-size', args.page_size), ('--cache-dir', args.cache_dir),
+                          ('--portal-url', args.portal_url), ('--fault-profile', args.fault_profile),
+                          ('--recycle-rss-mb', args.recycle_rss_mb), ('--recycle-every', args.recycle_every)]:
+        if value is not None:
+            command += [option, str(value)]
+    return command
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Supervised, auto-partitioned V2 scraper workers")
+    parser.add_argument('--scraper', choices=['production', 'distribution'], default='production')
+    parser.add_argument('--workers', type=int, default=4, help="Concurrent scraper processes (one browser each)")
+    parser.add_argument('--pages', default=None, help="Pages to scrape, e.g. 1-133 (default: detect all)")
+    parser.add_argument('--stall-after', type=float, default=300,
+                        help="Kill a worker whose event log is silent for this many seconds "
+                             "(a worker paused by the circuit breaker logs breaker_wait every 30 s)")
+    parser.add_argument('--ready-timeout', type=float, default=180,
+                        help="Kill a worker that has not reported ready after this many seconds")
+    parser.add_argument('--max-page-attempts', type=int, default=3,
+                        help="Give up on a page after this many chunks containing it")
+    parser.add_argument('--run-dir', default=None, help="Directory for chunk records, event logs and worker logs")
+    parser.add_argument('--driver-profile', choices=DRIVER_PROFILES, default='default')
+    parser.add_argument('--extract', choices=['html', 'js'], default='html')
+    parser.add_argument('--detail-mode', choices=['popup', 'tab'], default='popup')
+    parser.add_argument('--tabs', type=int, default=1)
+    parser.add_argument('--page-size', default=None, help="A row count or 'max' (resolved once before launching)")
+    parser.add_argument('--cache-dir', default=None)
+    parser.add_argument('--portal-url', default=None)
+    parser.add_argument('--fault-profile', choices=list(FAULT_PROFILES), default=None)
+    parser.add_argument('--recycle-rss-mb', type=int, default=None,
+                        help="Workers replace their browser between rows above this Chrome RSS")
+    parser.add_argument('--recycle-every', type=int, default=None,
+                        help="Workers replace their browser after this many rows")
+    args = parser.parse_args()
+
+    module = load_scraper_module(args.scraper)
+    page_size = module.page_size_arg(args.page_size) if args.page_size else None
+    pages = module.page_list_arg(args.pages) if args.pages else None
+
+    if pages is None or page_size == 'max':
+        print("[SUPERVISOR] Detecting total pages...")
+        detected = module.detect_total_pages({'driver_profile': args.driver_profile, 'page_size': page_size,
+                                              'portal_url': args.portal_url})
+        if not detected:
+            print("[ERROR] Could not detect total pages")
+            return
+        total_pages, rows_per_page = detected
+        pages = [page for page in pages if page <= total_pages] if pages else list(range(1, total_pages + 1))
+        # Every chunk must partition the grid the same way
+        if page_size:
+            page_size = rows_per_page
+    args.page_size = page_size
+
+    run_dir = args.run_dir or f"{module.OUTPUT_PREFIX}_SUPERVISED_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    os.makedirs(run_dir, exist_ok=True)
+    print(f"[SUPERVISOR] {len(pages)} pages, {args.workers} workers, run directory {run_dir}")
+
+    supervisor = Supervisor(pages, args.workers, scraper_command(module, args), run_dir,
+                            stall_after=args.stall_after, ready_timeout=args.ready_timeout,
+                            max_page_attempts=args.max_page_attempts)
+    start_time = time.time()
+    try:
+        slots = supervisor.run()
+    except KeyboardInterrupt:
+        print("\n[SUPERVISOR] Interrupted - stopping workers")
+        for slot in supervisor.slots.values():
+            slot.stop()
+        slots = supervisor.finished_slots + list(supervisor.slots.values())
+    elapsed = time.time() - start_time
+
+    # Ideal wall time: all browser-busy time spread evenly over the workers
+    busy = sum(slot.heartbeat - slot.launched for slot in slots)
+    print("\n" + "="*70)
+    print(f"[COMPLETE] {len(slots)} chunks, {supervisor.restarts} restarts, {len(supervisor.abandoned)} pages abandoned")
+    print(f"  Wall time: {elapsed/60:.1f} min (ideal {busy / args.workers / 60:.1f} min)")
+    if supervisor.abandoned:
+        print(f"  Abandoned pages: {module.format_page_list(supervisor.abandoned)}")
+    print("="*70)
+
+    # A reassigned page may have left partial records in the chunk that lost it - the later chunk wins
+    records = {}
+    for slot in slots:
+        if os.path.exists(slot.sink_file):
+            for record in load_records(slot.sink_file):
+                records[(record.get('_page_number'), record.get('_row_on_page'))] = record
+
+    module.save_data_to_files(records.values(), module.OUTPUT_PREFIX)
+    save_timing_summary(records.values(), module.OUTPUT_PREFIX)
+
+
+if __name__ == '__main__':
+    main()
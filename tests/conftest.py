@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The erc_* modules live at the repository root, like the scripts expect
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+# scripts/ is not a package - its tools are imported by module name
+sys.path.append(os.path.join(REPO_ROOT, 'scripts'))
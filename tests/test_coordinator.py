@@ -0,0 +1,174 @@
+import types
+import urllib.error
+import urllib.request
+
+import pytest
+
+import erc_coordinator
+from erc_coordinator import CoordinatorClient, LeaseStore, run_agent, start_coordinator
+from erc_events import EventLog
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(erc_coordinator, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    store = LeaseStore(str(tmp_path / 'leases.db'), max_attempts=2)
+    store.add_pages([1, 2])
+    return store
+
+
+def records(page, rows):
+    return [{'_page_number': page, '_row_on_page': row, 'license_no': f'L{page}-{row}'} for row in range(1, rows + 1)]
+
+
+def test_acquire_hands_out_each_page_once(store):
+    assert store.acquire('a', lease_s=60) == 1
+    assert store.acquire('b', lease_s=60) == 2
+    assert store.acquire('c', lease_s=60) is None
+
+    status = store.status()
+    assert status['leased'] == 2
+    assert sorted(status['agents']) == ['a', 'b']
+    assert not status['finished']
+
+
+def test_expired_lease_is_taken_over(store, clock):
+    assert store.acquire('a', lease_s=60) == 1
+    clock.now += 61
+
+    assert store.acquire('b', lease_s=60) == 1
+    assert store.status()['agents'] == ['b']
+    # The original owner lost the page
+    assert not store.renew('a', 1, lease_s=60)
+    assert store.renew('b', 1, lease_s=60)
+
+
+def test_renew_by_a_non_owner_is_refused(store, clock):
+    assert store.acquire('a', lease_s=60) == 1
+    assert not store.renew('b', 1, lease_s=60)
+
+    clock.now += 50
+    assert store.renew('a', 1, lease_s=60)
+    clock.now += 50
+    # Renewed at 50 s, so the lease still holds at 100 s
+    assert store.acquire('b', lease_s=60) == 2
+
+
+def test_failed_page_gives_up_after_max_attempts(store):
+    store.add_pages([3])
+    for _ in range(2):
+        assert store.acquire('a', lease_s=60) == 1
+        store.release('a', 1, failed=True)
+
+    assert store.acquire('a', lease_s=60) == 2
+    store.complete('a', 2, records(2, 3))
+    assert store.acquire('a', lease_s=60) == 3
+    store.complete('a', 3, records(3, 1))
+
+    status = store.status()
+    assert (status['done'], status['failed']) == (2, 1)
+    assert status['finished']
+
+
+def test_short_page_keeps_its_rows_after_the_last_attempt(store):
+    # Page 1 has 3 grid rows; each attempt gets a different subset of them
+    assert store.acquire('a', lease_s=60) == 1
+    store.release('a', 1, failed=True, records=records(1, 2)[:1])
+    assert store.status()['failed'] == 0
+    assert store.acquire('b', lease_s=60) == 1
+    store.release('b', 1, failed=True, records=records(1, 2))
+
+    status = store.status()
+    assert status['failed'] == 1
+    assert [record['license_no'] for record in store.records()] == ['L1-1', 'L1-2']
+    assert store.acquire('a', lease_s=60) == 2
+
+
+class ShortPageScraper:
+    """Stands in for ERCLicenseScraper: every page has 3 grid rows, page 2 only ever yields 2"""
+
+    def __init__(self, worker_id=0, breaker=None, **options):
+        self.events = EventLog(worker_id)
+        self.spare = None
+        self.last_page_rows = None
+        self.resume_row = None
+
+    def launch_ready_driver(self):
+        return object(), None
+
+    def adopt_driver(self, launched):
+        pass
+
+    def scrape_page(self, page):
+        self.last_page_rows = 3
+        return records(page, 2 if page == 2 else 3)
+
+    def close_driver(self):
+        pass
+
+
+def test_agent_keeps_a_short_page_when_it_runs_out_of_attempts(store):
+    module = types.SimpleNamespace(ERCLicenseScraper=ShortPageScraper)
+
+    assert run_agent(module, store, {}, agent='a', idle_poll=0) == 3
+
+    status = store.status()
+    assert (status['done'], status['failed'], status['finished']) == (1, 1, True)
+    assert [record['license_no'] for record in store.records()] == ['L1-1', 'L1-2', 'L1-3', 'L2-1', 'L2-2']
+
+
+def test_release_by_a_non_owner_keeps_no_records(store, clock):
+    assert store.acquire('a', lease_s=60) == 1
+    clock.now += 61
+    assert store.acquire('b', lease_s=60) == 1
+
+    store.release('a', 1, failed=True, records=records(1, 1))
+    assert store.records() == []
+    assert store.status()['agents'] == ['b']
+
+
+def test_first_completion_wins(store):
+    assert store.acquire('a', lease_s=60) == 1
+    assert store.complete('a', 1, records(1, 3))
+    assert not store.complete('b', 1, records(1, 2))
+
+    assert [record['license_no'] for record in store.records()] == ['L1-1', 'L1-2', 'L1-3']
+
+
+def test_server_rejects_bad_json(store):
+    server = start_coordinator(store)
+    try:
+        assert CoordinatorClient(server.url).acquire('a', 60) == 1
+        request = urllib.request.Request(f"{server.url}/status", data=b'{not json', method='POST')
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request, timeout=10)
+        assert error.value.code == 400
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_client_release_carries_partial_records(store):
+    server = start_coordinator(store)
+    try:
+        client = CoordinatorClient(server.url)
+        assert client.acquire('a', 60) == 1
+        client.release('a', 1, failed=True, records=records(1, 2))
+        assert store.records() == records(1, 2)
+    finally:
+        server.shutdown()
+        server.server_close()
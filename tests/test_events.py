@@ -0,0 +1,70 @@
+import json
+
+from erc_events import EventLog, EventTailer
+
+
+def line(**event):
+    return (json.dumps(event) + '\n').encode('utf-8')
+
+
+def test_tailer_reads_only_new_events(tmp_path):
+    log = EventLog(1, str(tmp_path))
+    tailer = EventTailer(log.path)
+    assert tailer.poll() == []
+
+    log.emit('page_start', page=1, rows=15)
+    log.emit('record', page=1, row=1)
+    assert [event['event'] for event in tailer.poll()] == ['page_start', 'record']
+    assert tailer.poll() == []
+
+    log.emit('page_done', page=1, records=1, reused=False)
+    events = tailer.poll()
+    assert [(event['event'], event['worker'], event['page']) for event in events] == [('page_done', 1, 1)]
+    log.close()
+
+
+def test_half_written_line_waits_for_the_next_poll(tmp_path):
+    path = tmp_path / 'worker_1.jsonl'
+    whole = line(event='record', page=2, row=3)
+    path.write_bytes(line(event='page_start', page=2) + whole[:10])
+    tailer = EventTailer(str(path))
+
+    assert [event['event'] for event in tailer.poll()] == ['page_start']
+    # The offset moved past the fragment, which is kept until its line ends
+    assert tailer.offset == path.stat().st_size
+
+    with open(path, 'ab') as f:
+        f.write(whole[10:])
+    assert tailer.poll() == [{'event': 'record', 'page': 2, 'row': 3}]
+    assert tailer.poll() == []
+
+
+def test_line_split_inside_a_multibyte_character(tmp_path):
+    path = tmp_path / 'worker_1.jsonl'
+    whole = (json.dumps({'event': 'record', 'license_no': 'กกพ-1'}, ensure_ascii=False) + '\n').encode('utf-8')
+    split = whole.index('ก'.encode('utf-8')) + 1
+    path.write_bytes(whole[:split])
+    tailer = EventTailer(str(path))
+
+    assert tailer.poll() == []
+    with open(path, 'ab') as f:
+        f.write(whole[split:])
+    assert tailer.poll() == [{'event': 'record', 'license_no': 'กกพ-1'}]
+
+
+def test_truncated_log_is_read_from_the_start(tmp_path):
+    path = tmp_path / 'worker_1.jsonl'
+    path.write_bytes(line(event='page_start', page=1) + line(event='page_done', page=1))
+    tailer = EventTailer(str(path))
+    assert len(tailer.poll()) == 2
+
+    path.write_bytes(line(event='run_start', total_pages=3))
+    assert tailer.poll() == [{'event': 'run_start', 'total_pages': 3}]
+    assert tailer.offset == path.stat().st_size
+
+
+def test_bad_lines_are_skipped_and_missing_files_are_empty(tmp_path):
+    path = tmp_path / 'worker_1.jsonl'
+    path.write_bytes(b'{not json\n' + line(event='record', page=1))
+    assert EventTailer(str(path)).poll() == [{'event': 'record', 'page': 1}]
+    assert EventTailer(str(tmp_path / 'missing.jsonl')).poll() == []
@@ -0,0 +1,45 @@
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from erc_driver import driver_alive
+from erc_faults import FaultInjector, FaultyDriver
+
+
+class StubDriver:
+    window_handles = ['main']
+    current_url = 'http://127.0.0.1/list'
+
+    def __init__(self):
+        self.quit_called = False
+
+    def get(self, url):
+        self.current_url = url
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_healthy_faulty_driver_is_alive():
+    driver = FaultyDriver(StubDriver(), FaultInjector('none'))
+    driver.get('http://127.0.0.1/other')
+    assert driver_alive(driver)
+    assert driver.current_url == 'http://127.0.0.1/other'
+
+
+def test_crashed_faulty_driver_is_reported_dead():
+    driver = FaultyDriver(StubDriver(), FaultInjector({'crash_rate': 1.0}))
+    with pytest.raises(WebDriverException):
+        driver.get('http://127.0.0.1/other')
+
+    assert not driver_alive(driver)
+    with pytest.raises(WebDriverException):
+        driver.current_url
+
+
+def test_crashed_faulty_driver_can_still_quit():
+    stub = StubDriver()
+    driver = FaultyDriver(stub, FaultInjector({'crash_rate': 1.0}))
+    with pytest.raises(WebDriverException):
+        driver.get('http://127.0.0.1/other')
+    driver.quit()
+    assert stub.quit_called
@@ -0,0 +1,65 @@
+from erc_metrics import PHASE_BUCKETS, WorkerMetrics, merge_textfiles
+
+
+def samples(text):
+    """{sample name with labels: value} of a Prometheus exposition"""
+    return {line.rsplit(' ', 1)[0]: line.rsplit(' ', 1)[1]
+            for line in text.splitlines() if line and not line.startswith('#')}
+
+
+def bucket(phase, bound):
+    return f'erc_phase_seconds_bucket{{worker="1",phase="{phase}",le="{bound}"}}'
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = WorkerMetrics(1)
+    for seconds in (0.01, 0.3, 0.3, 7.0, 120.0):
+        metrics.observe_record({'_t_parse': seconds})
+
+    rendered = samples(metrics.render())
+    counts = [int(rendered[bucket('parse', bound)]) for bound in PHASE_BUCKETS]
+    assert counts == sorted(counts)
+    assert rendered[bucket('parse', 0.05)] == '1'
+    assert rendered[bucket('parse', 0.25)] == '1'
+    assert rendered[bucket('parse', 0.5)] == '3'
+    assert rendered[bucket('parse', 10.0)] == '4'
+    assert rendered[bucket('parse', 60.0)] == '4'
+    # The 120 s record only shows up in +Inf
+    assert rendered[bucket('parse', '+Inf')] == '5'
+    assert rendered['erc_phase_seconds_count{worker="1",phase="parse"}'] == '5'
+    assert rendered['erc_phase_seconds_sum{worker="1",phase="parse"}'] == '127.6100'
+
+
+def test_phases_missing_from_a_record_are_not_observed():
+    metrics = WorkerMetrics(1)
+    metrics.observe_record({'_t_parse': 0.1})
+
+    rendered = samples(metrics.render())
+    assert rendered[bucket('click', '+Inf')] == '0'
+    assert rendered['erc_records_scraped_total{worker="1"}'] == '1'
+
+
+def test_counters_and_gauges_render_with_their_types():
+    metrics = WorkerMetrics(1)
+    metrics.inc('retries', 2)
+    metrics.set('page_queue_depth', 7)
+    metrics.set('page_queue_depth', None)
+
+    text = metrics.render()
+    assert '# TYPE erc_retries_total counter' in text
+    assert '# TYPE erc_page_queue_depth gauge' in text
+    assert samples(text)['erc_retries_total{worker="1"}'] == '2'
+    assert samples(text)['erc_page_queue_depth{worker="1"}'] == '7'
+
+
+def test_merged_textfiles_group_each_family(tmp_path):
+    for worker_id in (1, 2):
+        metrics = WorkerMetrics(worker_id, textfile_dir=str(tmp_path))
+        metrics.inc('retries', worker_id)
+        metrics.flush(force=True)
+
+    lines = merge_textfiles(str(tmp_path)).splitlines()
+    start = lines.index('# HELP erc_retries_total Row and page attempts retried after a classified error (see erc_retry)')
+    assert lines[start + 1] == '# TYPE erc_retries_total counter'
+    assert lines[start + 2:start + 4] == ['erc_retries_total{worker="1"} 1', 'erc_retries_total{worker="2"} 2']
+    assert lines.count('# TYPE erc_retries_total counter') == 1
@@ -0,0 +1,66 @@
+from erc_page_cache import PageCache, page_hash
+from erc_timing import timing_summary
+
+
+def grid(*licenses):
+    return [{'license_no': license_no, 'detail_url': None, 'cells': [license_no, 'ok']} for license_no in licenses]
+
+
+def record(license_no):
+    return {'license_no': license_no, 'plans': [{'plan': 'A'}], '_page_number': 1, '_worker_id': 3,
+            '_t_navigate': 0.5, '_t_total': 1.25}
+
+
+def test_page_hash_follows_the_visible_grid():
+    assert page_hash(grid('L1', 'L2')) == page_hash(grid('L1', 'L2'))
+    assert page_hash(grid('L1', 'L2')) != page_hash(grid('L2', 'L1'))
+
+    changed = grid('L1', 'L2')
+    changed[1]['cells'][1] = 'revoked'
+    assert page_hash(changed) != page_hash(grid('L1', 'L2'))
+
+
+def test_lookup_returns_the_records_of_an_unchanged_page(tmp_path):
+    cache = PageCache(str(tmp_path))
+    current = page_hash(grid('L1', 'L2'))
+    assert cache.lookup(1, current) is None
+
+    cache.store(1, current, [record('L1'), record('L2')])
+
+    cached = cache.lookup(1, current)
+    assert [r['license_no'] for r in cached] == ['L1', 'L2']
+    assert cached[0]['plans'] == [{'plan': 'A'}]
+    assert cache.lookup(2, current) is None
+
+
+def test_changed_grid_invalidates_the_page(tmp_path):
+    cache = PageCache(str(tmp_path))
+    cache.store(1, page_hash(grid('L1', 'L2')), [record('L1'), record('L2')])
+
+    assert cache.lookup(1, page_hash(grid('L1', 'L3'))) is None
+    # A new store replaces the page's hash and records
+    cache.store(1, page_hash(grid('L1', 'L3')), [record('L1'), record('L3')])
+    assert cache.lookup(1, page_hash(grid('L1', 'L2'))) is None
+    assert [r['license_no'] for r in cache.lookup(1, page_hash(grid('L1', 'L3')))] == ['L1', 'L3']
+
+
+def test_records_without_a_hash_are_not_trusted(tmp_path):
+    cache = PageCache(str(tmp_path))
+    current = page_hash(grid('L1'))
+    cache.store(1, current, [record('L1')])
+    (tmp_path / 'page_00001.hash').unlink()
+
+    assert cache.stored_hash(1) is None
+    assert cache.lookup(1, current) is None
+
+
+def test_reused_records_leave_the_timing_summary_alone(tmp_path):
+    cache = PageCache(str(tmp_path))
+    current = page_hash(grid('L1'))
+    cache.store(1, current, [record('L1')])
+
+    cached = cache.lookup(1, current)
+    assert '_worker_id' not in cached[0]
+    assert not [key for key in cached[0] if key.startswith('_t_')]
+    assert cached[0]['_page_number'] == 1
+    assert timing_summary(cached) == []
@@ -0,0 +1,50 @@
+import json
+import os
+
+from erc_driver import ChromeProfileManager, portal_origin
+from erc_radgrid import list_page_url
+
+LIVE = list_page_url(1)
+MOCK = list_page_url(1, 'http://127.0.0.1:8765')
+
+
+def warmed(tmp_path, marker):
+    manager = ChromeProfileManager(str(tmp_path))
+    os.makedirs(manager.template_dir)
+    with open(os.path.join(manager.template_dir, '.warm'), 'w', encoding='utf-8') as f:
+        f.write(marker if isinstance(marker, str) else json.dumps(marker))
+    return manager
+
+
+def test_portal_origin():
+    assert portal_origin(LIVE) == 'http://app04.erc.or.th'
+    assert portal_origin(MOCK) == 'http://127.0.0.1:8765'
+
+
+def test_template_is_only_reused_for_its_portal_and_profile(tmp_path):
+    manager = warmed(tmp_path, {'portal': 'http://127.0.0.1:8765', 'profile': 'fast'})
+
+    assert manager.has_template()
+    assert manager.has_template(MOCK, 'fast')
+    assert not manager.has_template(LIVE, 'fast')
+    assert not manager.has_template(MOCK, 'default')
+    # Another list page of the same portal shares the cache
+    assert manager.has_template(list_page_url(4, 'http://127.0.0.1:8765'), 'fast')
+
+
+def test_mismatched_template_is_not_cloned(tmp_path):
+    manager = warmed(tmp_path, {'portal': 'http://127.0.0.1:8765', 'profile': 'default'})
+
+    cold = manager.create(0, LIVE, 'default')
+    warm = manager.create(1, MOCK, 'default')
+    assert not os.path.exists(os.path.join(cold, '.warm'))
+    assert os.path.exists(os.path.join(warm, '.warm'))
+    manager.cleanup()
+
+
+def test_url_only_marker_is_warmed_again(tmp_path):
+    manager = warmed(tmp_path, LIVE)
+
+    assert manager.template_marker() == {'portal': 'http://app04.erc.or.th', 'profile': None}
+    assert not manager.has_template(LIVE, 'default')
+    assert not ChromeProfileManager(str(tmp_path / 'empty')).has_template()
@@ -0,0 +1,55 @@
+from erc_records import RecordSchema
+
+
+SCHEMA = RecordSchema(
+    ['เลขที่ใบอนุญาต', 'ชื่อผู้รับใบอนุญาต', 'กำลังการผลิต'],
+    {'machines': ['ชนิดเครื่องจักร', 'ขนาด']},
+)
+
+
+def test_full_record_round_trips():
+    record = {
+        'เลขที่ใบอนุญาต': 'กกพ.01-1234',
+        'ชื่อผู้รับใบอนุญาต': 'บริษัท ตัวอย่าง จำกัด',
+        'กำลังการผลิต': '9.9',
+        'machines': [{'ชนิดเครื่องจักร': 'Turbine', 'ขนาด': '5'}, {'ชนิดเครื่องจักร': 'Boiler', 'ขนาด': '2'}],
+    }
+    packed = SCHEMA.pack(record)
+
+    assert isinstance(packed, tuple)
+    assert packed[-1] is None
+    assert SCHEMA.unpack(packed) == record
+
+
+def test_missing_fields_unpack_as_none_and_empty_tables():
+    packed = SCHEMA.pack({'เลขที่ใบอนุญาต': 'กกพ.01-1234', 'machines': [{'ชนิดเครื่องจักร': 'Turbine'}]})
+
+    assert SCHEMA.unpack(packed) == {
+        'เลขที่ใบอนุญาต': 'กกพ.01-1234',
+        'ชื่อผู้รับใบอนุญาต': None,
+        'กำลังการผลิต': None,
+        'machines': [{'ชนิดเครื่องจักร': 'Turbine', 'ขนาด': None}],
+    }
+    assert SCHEMA.unpack(SCHEMA.pack({}))['machines'] == []
+
+
+def test_unknown_keys_travel_as_extras():
+    record = {'เลขที่ใบอนุญาต': 'กกพ.01-1234', '_page_number': 3, '_row_on_page': 7}
+    packed = SCHEMA.pack(record)
+
+    assert packed[-1] == {'_page_number': 3, '_row_on_page': 7}
+    unpacked = SCHEMA.unpack(packed)
+    assert unpacked['_page_number'] == 3
+    assert unpacked['_row_on_page'] == 7
+
+
+def test_unknown_nested_columns_round_trip():
+    record = {
+        'เลขที่ใบอนุญาต': 'กกพ.01-1234',
+        'machines': [{'ชนิดเครื่องจักร': 'Turbine', 'ขนาด': '5', 'หน่วย': 'MW'}, {'ชนิดเครื่องจักร': 'Boiler', 'ขนาด': '2'}],
+    }
+    packed = SCHEMA.pack(record)
+
+    # Only the row with the unexpected column carries a trailing dict
+    assert packed[3] == (('Turbine', '5', {'หน่วย': 'MW'}), ('Boiler', '2'))
+    assert SCHEMA.unpack(packed)['machines'] == record['machines']
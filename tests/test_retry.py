@@ -0,0 +1,156 @@
+import pytest
+from selenium.common.exceptions import (NoSuchElementException, StaleElementReferenceException, TimeoutException,
+                                        WebDriverException)
+
+import erc_retry
+from erc_faults import SESSION_EXPIRED_PAGE
+from erc_retry import (CircuitBreaker, RetryPolicy, ServerError, SessionExpired, StructureError, classify_error,
+                       error_page, raise_for_error_page)
+
+
+class FakeClock:
+    """Stands in for the time module inside erc_retry; sleep() just moves the clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(erc_retry, 'time', clock)
+    return clock
+
+
+def make_breaker():
+    return CircuitBreaker(window_s=60, min_calls=4, max_error_rate=0.5, cooldown_s=10, max_cooldown_s=35)
+
+
+def fail_until_trip(breaker, limit=10):
+    for _ in range(limit):
+        tripped = breaker.record(False)
+        if tripped:
+            return tripped
+    return None
+
+
+def test_breaker_trips_once_the_error_rate_is_reached(clock):
+    breaker = make_breaker()
+    assert breaker.record(True) is None
+    assert breaker.record(False) is None
+    assert breaker.record(True) is None
+    assert breaker.open_for() == 0
+
+    tripped = breaker.record(False)
+    assert tripped == {'cooldown_s': 10, 'error_rate': 0.5, 'calls': 4}
+    assert breaker.open_for() == pytest.approx(10)
+
+
+def test_breaker_ignores_errors_below_min_calls(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        assert breaker.record(False) is None
+    assert breaker.open_for() == 0
+
+
+def test_breaker_cooldown_doubles_up_to_the_maximum(clock):
+    breaker = make_breaker()
+    cooldowns = []
+    for _ in range(4):
+        tripped = fail_until_trip(breaker)
+        cooldowns.append(tripped['cooldown_s'])
+        clock.sleep(breaker.open_for())
+
+    assert cooldowns == [10, 20, 35, 35]
+
+
+def test_breaker_recovers_after_a_healthy_window(clock):
+    breaker = make_breaker()
+    fail_until_trip(breaker)
+    clock.sleep(breaker.open_for())
+    assert breaker.open_for() == 0
+
+    # Half-open: attempts go through again, and a healthy full window ends the run of trips
+    for _ in range(6):
+        assert breaker.record(True) is None
+    clock.sleep(61)
+    assert breaker.record(True) is None
+    assert fail_until_trip(breaker)['cooldown_s'] == 10
+
+
+def test_breaker_wait_reports_progress_while_open(clock):
+    breaker = make_breaker()
+    fail_until_trip(breaker)
+    remaining = []
+
+    waited = breaker.wait(on_wait=remaining.append, interval=4)
+
+    assert waited == pytest.approx(10)
+    assert remaining == pytest.approx([10, 6, 2])
+    assert breaker.open_for() == 0
+
+
+def test_breaker_state_is_shared_between_instances(clock):
+    state = {}
+    first = CircuitBreaker(state, min_calls=2, cooldown_s=10)
+    second = CircuitBreaker(state, min_calls=2, cooldown_s=10)
+    first.record(False)
+    second.record(False)
+    assert first.open_for() == second.open_for() == pytest.approx(10)
+
+
+@pytest.mark.parametrize('error, error_class', [
+    (ServerError('error page'), 'server'),
+    (SessionExpired('error page'), 'session'),
+    (StructureError('detail fields missing'), 'structural'),
+    (NoSuchElementException('grid'), 'structural'),
+    (KeyError('spans'), 'structural'),
+    (TimeoutException('popup'), 'transient'),
+    (StaleElementReferenceException('row'), 'transient'),
+    (WebDriverException('chrome not reachable'), 'transient'),
+    (None, 'transient'),
+    (ValueError('unexpected'), 'structural'),
+])
+def test_classify_error(error, error_class):
+    assert classify_error(error) == error_class
+
+
+def test_retry_policy_backoff_doubles_with_jitter_and_cap():
+    policy = RetryPolicy({'server': {'attempts': 4, 'base_delay': 10.0, 'max_delay': 30.0}}, seed=1)
+    assert policy.attempts('server') == 4
+    for attempt, base in [(1, 10.0), (2, 20.0), (3, 30.0), (4, 30.0)]:
+        assert base * 0.8 <= policy.delay('server', attempt) <= base * 1.2
+
+
+class PageDriver:
+    """Answers the error-page probe with the title and text of an HTML document"""
+
+    def __init__(self, title, text):
+        self.title, self.text = title, text
+
+    def execute_script(self, script):
+        return f"{self.title}\n{self.text}"
+
+
+@pytest.mark.parametrize('driver, expected', [
+    (PageDriver('Session expired', 'Your session has timed out. Please reload the page.'), ('session', 'Session expired')),
+    (PageDriver('Runtime Error', "Server Error in '/' Application."), ('server', 'Server Error in')),
+    (PageDriver('ERC', 'ใบอนุญาตผลิตไฟฟ้า'), None),
+])
+def test_error_page(driver, expected):
+    assert error_page(driver) == expected
+
+
+def test_session_expired_page_raises_session_expired():
+    assert 'Session expired' in SESSION_EXPIRED_PAGE
+    with pytest.raises(SessionExpired):
+        raise_for_error_page(PageDriver('Session expired', ''))
+    with pytest.raises(ServerError):
+        raise_for_error_page(PageDriver('Service Unavailable', ''))
+    raise_for_error_page(PageDriver('ERC', ''))
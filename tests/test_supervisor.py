@@ -0,0 +1,108 @@
+import argparse
+import types
+
+import pytest
+
+import supervise_workers
+from erc_parallel import format_page_list, page_list_arg
+from supervise_workers import Supervisor
+
+
+class FakeSlot:
+    """Stands in for WorkerSlot without starting a scraper process"""
+
+    def __init__(self, slot_id, chunk_id, pages, command, run_dir):
+        self.slot_id = slot_id
+        self.pages = pages
+
+    def page_spec(self):
+        return format_page_list(self.pages)
+
+
+@pytest.fixture
+def supervisor(monkeypatch, tmp_path):
+    monkeypatch.setattr(supervise_workers, 'WorkerSlot', FakeSlot)
+    return Supervisor(range(1, 101), workers=4, command=['scraper'], run_dir=str(tmp_path), max_page_attempts=2)
+
+
+def finished_slot(slot_id, pages, done=(), failed=()):
+    return types.SimpleNamespace(slot_id=slot_id, done_pages=set(done), failed_pages=set(failed),
+                                 remaining_pages=lambda: [page for page in pages if page not in done])
+
+
+def test_chunks_shrink_as_the_pages_run_out(supervisor):
+    sizes = []
+    for slot_id in range(4):
+        supervisor.launch(slot_id)
+        sizes.append(len(supervisor.slots[slot_id].pages))
+
+    # Half of an equal share of what is left each time
+    assert sizes == [13, 11, 10, 9]
+    assert supervisor.slots[0].pages == list(range(1, 14))
+    assert len(supervisor.pending) == 100 - sum(sizes)
+
+
+def test_chunk_size_follows_the_measured_throughput(supervisor):
+    supervisor.rates = {0: 3.0, 1: 1.0}
+
+    # The two unmeasured slots count as fast as the slot asking: 3 of 4 + 2 * 3 pages/s
+    assert supervisor.chunk_size(0) == 15
+    assert supervisor.chunk_size(1) == 9
+    # No measurement yet - an equal share
+    assert supervisor.chunk_size(2) == 13
+
+    supervisor.pending = [1]
+    assert supervisor.chunk_size(1) == 1
+
+
+def test_requeue_returns_unfinished_and_failed_pages(supervisor):
+    supervisor.pending = [50]
+    supervisor.attempts = {page: 1 for page in range(1, 6)}
+    # 2 failed and was then completed on a retry, 4 failed, 5 was never reached
+    slot = finished_slot(0, [1, 2, 3, 4, 5], done=[1, 2, 3], failed=[2, 4])
+
+    supervisor.requeue(slot, 'finished')
+
+    assert supervisor.pending == [4, 5, 50]
+    assert supervisor.abandoned == []
+
+
+def test_requeue_abandons_pages_out_of_attempts(supervisor):
+    supervisor.pending = []
+    supervisor.attempts = {1: 2, 2: 1}
+
+    supervisor.requeue(finished_slot(0, [1, 2]), 'died')
+
+    assert supervisor.pending == [2]
+    assert supervisor.abandoned == [1]
+
+
+@pytest.mark.parametrize('value, pages', [
+    ('1-33', list(range(1, 34))),
+    ('3-5,9,12-14', [3, 4, 5, 9, 12, 13, 14]),
+    (' 7 , 2-3,3', [2, 3, 7]),
+    ('4', [4]),
+])
+def test_page_list_arg(value, pages):
+    assert page_list_arg(value) == pages
+
+
+@pytest.mark.parametrize('value', ['', 'a-3', '0-4', '5-2', '1,,2'])
+def test_page_list_arg_rejects_bad_lists(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        page_list_arg(value)
+
+
+@pytest.mark.parametrize('pages, expected', [
+    ([1, 2, 3, 7], '1-3,7'),
+    ([9, 3, 4, 5, 12, 13, 14], '3-5,9,12-14'),
+    ([4], '4'),
+    ([], ''),
+])
+def test_format_page_list(pages, expected):
+    assert format_page_list(pages) == expected
+
+
+def test_page_list_round_trip():
+    pages = [1, 2, 5, 6, 7, 10, 40, 41]
+    assert page_list_arg(format_page_list(pages)) == pages
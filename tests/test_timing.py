@@ -0,0 +1,54 @@
+import pytest
+
+from erc_timing import PHASES, RecordTimer, percentile, timing_summary
+
+
+@pytest.mark.parametrize('pct, expected', [(50, 5), (95, 10), (99, 10), (10, 1), (11, 2)])
+def test_percentile_is_nearest_rank(pct, expected):
+    assert percentile(list(range(1, 11)), pct) == expected
+
+
+def test_percentile_of_a_single_value():
+    assert percentile([0.3], 50) == percentile([0.3], 99) == 0.3
+
+
+def timed(worker, total, navigate=0.0):
+    timer = RecordTimer()
+    timer.add('navigate', navigate)
+    timer.add('parse', total - navigate)
+    return timer.annotate({'_worker_id': worker})
+
+
+def test_timer_annotates_every_phase():
+    record = timed(1, 1.5, navigate=1.0)
+    assert record['_t_navigate'] == 1.0
+    assert record['_t_parse'] == 0.5
+    assert record['_t_click'] == 0.0
+    assert record['_t_total'] == 1.5
+    assert len([key for key in record if key.startswith('_t_')]) == len(PHASES) + 1
+
+
+def test_summary_per_worker_and_overall():
+    records = [timed(1, total) for total in (1.0, 2.0, 3.0)] + [timed(2, 10.0), {'license_no': 'untimed'}]
+    rows = {(row['worker'], row['phase']): row for row in timing_summary(records)}
+
+    overall = rows[('all', 'total')]
+    assert overall['count'] == 4
+    assert overall['mean_s'] == 4.0
+    assert (overall['p50_s'], overall['p95_s'], overall['p99_s']) == (2.0, 10.0, 10.0)
+
+    assert rows[(1, 'total')]['count'] == 3
+    assert rows[(1, 'total')]['p50_s'] == 2.0
+    assert rows[(2, 'parse')]['mean_s'] == 10.0
+    assert rows[(2, 'click')]['p99_s'] == 0.0
+
+
+def test_summary_lists_all_workers_first_in_phase_order():
+    rows = timing_summary([timed(2, 1.0), timed(1, 1.0)])
+    assert [row['worker'] for row in rows[:len(PHASES) + 1]] == ['all'] * (len(PHASES) + 1)
+    assert [row['phase'] for row in rows[:len(PHASES) + 1]] == PHASES + ['total']
+    assert [row['worker'] for row in rows[len(PHASES) + 1:]][::len(PHASES) + 1] == [1, 2]
+
+
+def test_summary_of_untimed_records_is_empty():
+    assert timing_summary([{'license_no': 'L1'}]) == []